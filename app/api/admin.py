@@ -1,5 +1,16 @@
 from fastapi import APIRouter
 from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.services.proposal_cache import get_proposal_cache
+from app.auth.token_cache import get_token_cache
+from app.services.user_service import get_approved_user_cache, get_login_recorder
+from app.services.answer_queue import get_answer_queue
+from app.services.answer_cache import get_answer_cache
+from app.services.index_store import get_index_store
+from app.services.rag_service import get_vector_store_cache, get_embedding_stats, get_stream_stats
+from app.services.structured_answers import get_structured_answerer
+from app.services.prompt_builder import get_prompt_builder
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,4 +21,41 @@ async def admin_health():
     return {
         "status": "admin endpoints working",
         "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    }
+
+@router.get("/admin/cache-stats")
+async def cache_stats():
+    """Hit/miss counters for the in-process caches"""
+    return {
+        "proposal_payloads": get_proposal_cache().stats(),
+        "auth_tokens": get_token_cache().stats(),
+        "approved_users": get_approved_user_cache().stats(),
+        "last_login_batches": get_login_recorder().stats(),
+        "answer_queue": get_answer_queue().stats(),
+        "rag_vector_stores": get_vector_store_cache().stats(),
+        "rag_answers": get_answer_cache().stats(),
+        "structured_answers": get_structured_answerer().stats(),
+        "rag_prompts": get_prompt_builder().stats(),
+        "rag_streaming": get_stream_stats(),
+        "rag_index_store": get_index_store().stats() if get_index_store() else None,
+        "embedding_service": get_embedding_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.post("/admin/auth-cache/invalidate")
+async def invalidate_auth_cache(email: Optional[str] = None):
+    """
+    Drop cached pre-approved lookups after the approved list changes
+
+    The cache is per process, so this only clears the worker that serves the
+    request. Other workers keep their entries until AUTH_USER_CACHE_TTL_SECONDS
+    expires: a revocation takes effect everywhere within that TTL.
+    """
+    get_approved_user_cache().invalidate(email)
+    logger.info(f"Invalidated approved-user cache for {email or 'all users'} in this worker")
+    return {
+        "message": f"Approved-user cache cleared for {email or 'all users'} in this worker only",
+        "scope": "worker",
+        "other_workers_expire_within_seconds": settings.AUTH_USER_CACHE_TTL_SECONDS,
+        "timestamp": datetime.utcnow().isoformat()
+    }
@@ -2,16 +2,22 @@
 """Questions API endpoints for proposal equipment questions"""
 
 from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from app.database import get_db
+from app.database import get_db, get_read_db, run_db
 from app.models.proposals import ProposalQuestion, Proposal
 from app.services.rag_service import get_rag_service
+from app.services.answer_queue import get_answer_queue
+from app.services.batch_answering import answer_question_batch, BatchRequestError
+from app.services.proposal_cache import ainvalidate_proposal_cache
+from app.services.proposal_service import load_proposal_graph
 from app.config import settings
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 import uuid
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +45,12 @@ class AIAnswerRequest(BaseModel):
     use_rag: Optional[bool] = True
     auto_save: Optional[bool] = False
 
+class BatchAIAnswerRequest(BaseModel):
+    question_ids: Optional[List[str]] = None
+    proposal_id: Optional[str] = None  # UUID or job number: all of its pending questions
+    use_rag: Optional[bool] = True
+    auto_save: Optional[bool] = True
+
 def get_proposal_by_id_or_job_number(db: Session, proposal_id: str):
     """Helper to get proposal by UUID or job_number"""
     # First try as UUID
@@ -54,9 +66,82 @@ def get_proposal_by_id_or_job_number(db: Session, proposal_id: str):
     proposal = db.query(Proposal).filter(Proposal.job_number == proposal_id).first()
     return proposal
 
+# Sync query/commit helpers; routes run them through run_db so the event
+# loop isn't blocked on the database
+
+def _rollback(db: Session):
+    db.rollback()
+
+def _find_question(db: Session, question_uuid: uuid.UUID) -> Optional[ProposalQuestion]:
+    return db.query(ProposalQuestion).filter(
+        ProposalQuestion.id == question_uuid
+    ).first()
+
+def _save_question(db: Session, question: ProposalQuestion) -> ProposalQuestion:
+    """Add (or keep) a question in the session, commit and reload it"""
+    db.add(question)
+    db.commit()
+    db.refresh(question)
+    return question
+
+def _record_answer(
+    db: Session,
+    question: ProposalQuestion,
+    answer: str,
+    answered_by: str
+) -> ProposalQuestion:
+    question.answer_text = answer
+    question.status = 'answered'
+    question.answered_by = answered_by
+    question.answered_at = datetime.utcnow()
+    return _save_question(db, question)
+
 # ============================================================================
 # SHARED HANDLER FUNCTION
 # ============================================================================
+def _list_proposal_questions(
+    db: Session,
+    proposal_id: str,
+    status: Optional[str] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """Questions for a proposal in frontend format, or None if the proposal doesn't exist"""
+    # Get proposal by UUID or job_number
+    proposal = get_proposal_by_id_or_job_number(db, proposal_id)
+    
+    if not proposal:
+        return None
+    
+    # Build query
+    query = db.query(ProposalQuestion).filter(
+        ProposalQuestion.proposal_id == proposal.id
+    )
+    
+    # Filter by status if provided
+    if status:
+        query = query.filter(ProposalQuestion.status == status)
+    
+    # Get questions ordered by most recent first
+    questions = query.order_by(desc(ProposalQuestion.asked_at)).all()
+    
+    # Transform to frontend format
+    questions_data = []
+    for q in questions:
+        questions_data.append({
+            "id": str(q.id),
+            "itemId": str(q.line_item_id) if q.line_item_id else "",
+            "itemName": q.question_text[:50] + "..." if len(q.question_text) > 50 else q.question_text,
+            "sectionName": "General",
+            "question": q.question_text,
+            "answer": q.answer_text,
+            "status": q.status,
+            "askedBy": q.asked_by_name or q.asked_by_email or "Unknown",
+            "askedAt": q.asked_at.isoformat() if q.asked_at else datetime.utcnow().isoformat(),
+            "answeredBy": q.answered_by,
+            "answeredAt": q.answered_at.isoformat() if q.answered_at else None
+        })
+    
+    return questions_data
+
 async def _get_proposal_questions_handler(
     proposal_id: str,
     request: Request,
@@ -67,41 +152,11 @@ async def _get_proposal_questions_handler(
     user = getattr(request.state, 'user', None)
     
     try:
-        # Get proposal by UUID or job_number
-        proposal = get_proposal_by_id_or_job_number(db, proposal_id)
+        questions_data = await run_db(db, _list_proposal_questions, proposal_id, status)
         
-        if not proposal:
+        if questions_data is None:
             raise HTTPException(status_code=404, detail=f"Proposal {proposal_id} not found")
         
-        # Build query
-        query = db.query(ProposalQuestion).filter(
-            ProposalQuestion.proposal_id == proposal.id
-        )
-        
-        # Filter by status if provided
-        if status:
-            query = query.filter(ProposalQuestion.status == status)
-        
-        # Get questions ordered by most recent first
-        questions = query.order_by(desc(ProposalQuestion.asked_at)).all()
-        
-        # Transform to frontend format
-        questions_data = []
-        for q in questions:
-            questions_data.append({
-                "id": str(q.id),
-                "itemId": str(q.line_item_id) if q.line_item_id else "",
-                "itemName": q.question_text[:50] + "..." if len(q.question_text) > 50 else q.question_text,
-                "sectionName": "General",
-                "question": q.question_text,
-                "answer": q.answer_text,
-                "status": q.status,
-                "askedBy": q.asked_by_name or q.asked_by_email or "Unknown",
-                "askedAt": q.asked_at.isoformat() if q.asked_at else datetime.utcnow().isoformat(),
-                "answeredBy": q.answered_by,
-                "answeredAt": q.answered_at.isoformat() if q.answered_at else None
-            })
-        
         return {
             "questions": questions_data,
             "total_count": len(questions_data),
@@ -124,7 +179,7 @@ async def _get_proposal_questions_handler(
 async def get_proposal_questions(
     proposal_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     status: Optional[str] = None
 ):
     """Get all questions for a proposal (without trailing slash)"""
@@ -134,7 +189,7 @@ async def get_proposal_questions(
 async def get_proposal_questions_trailing_slash(
     proposal_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     status: Optional[str] = None
 ):
     """Get all questions for a proposal (with trailing slash)"""
@@ -157,7 +212,7 @@ async def _create_question_handler(
         logger.info(f"Question data: {question_data.dict()}")
 
         # Get proposal by UUID or job_number
-        proposal = get_proposal_by_id_or_job_number(db, proposal_id)
+        proposal = await run_db(db, get_proposal_by_id_or_job_number, proposal_id)
 
         if not proposal:
             logger.error(f"Proposal not found: {proposal_id}")
@@ -185,50 +240,18 @@ async def _create_question_handler(
             ai_generated=False  # Question itself is not AI-generated
         )
 
-        db.add(new_question)
-        db.commit()
-        db.refresh(new_question)
+        await run_db(db, _save_question, new_question)
+        await ainvalidate_proposal_cache(proposal.id)
 
         logger.info(f"Created question {new_question.id} for proposal {proposal_id}")
 
-        # Auto-answer if appropriate (simple or T&C questions)
+        # Auto-answer if appropriate (simple or T&C questions) in the background
         # Only if RAG auto-answering is enabled via ENABLE_RAG_AUTO_ANSWER flag
-        ai_answer_data = None
+        auto_answer_queued = False
         if ENABLE_RAG_AUTO_ANSWER and classification['should_auto_answer'] and classification['use_ai']:
-            try:
-                logger.info(f"Auto-answering {classification['category']} question")
-
-                # Generate AI answer
-                answer_result = await rag_service.answer_question(
-                    question=question_data.question,
-                    proposal=proposal,
-                    db=db,
-                    use_rag=True
-                )
-
-                if answer_result.get('answer'):
-                    # Update question with AI answer
-                    new_question.answer_text = answer_result['answer']
-                    new_question.status = 'answered'
-                    new_question.answered_by = 'AI Assistant'
-                    new_question.answered_at = datetime.utcnow()
-                    new_question.ai_generated = True  # Mark answer as AI-generated
-
-                    db.commit()
-                    db.refresh(new_question)
-
-                    logger.info(f"Question {new_question.id} auto-answered by AI")
-
-                    ai_answer_data = {
-                        'ai_answer': answer_result['answer'],
-                        'confidence': answer_result.get('confidence'),
-                        'method': answer_result.get('method'),
-                        'sources': answer_result.get('sources', [])
-                    }
-
-            except Exception as e:
-                logger.error(f"Failed to auto-answer question: {e}")
-                # Continue without auto-answer - question remains pending
+            auto_answer_queued = get_answer_queue().enqueue(new_question.id)
+            if auto_answer_queued:
+                logger.info(f"Queued {classification['category']} question {new_question.id} for auto-answering")
 
         # Return in frontend format
         response_data = {
@@ -247,15 +270,13 @@ async def _create_question_handler(
             "classification": {
                 "category": classification['category'],
                 "reasoning": classification['reasoning'],
-                "auto_answered": classification['should_auto_answer'] and ENABLE_RAG_AUTO_ANSWER,
+                # Answering happens later on the answer queue; poll /questions/{id}/status
+                "auto_answered": new_question.status == 'answered',
+                "auto_answer_queued": auto_answer_queued,
                 "rag_enabled": ENABLE_RAG_AUTO_ANSWER
             }
         }
 
-        # Include AI answer details if available
-        if ai_answer_data:
-            response_data['ai_details'] = ai_answer_data
-
         return response_data
 
     except HTTPException:
@@ -264,7 +285,7 @@ async def _create_question_handler(
         logger.error(f"Error creating question: {str(e)}")
         import traceback
         traceback.print_exc()
-        db.rollback()
+        await run_db(db, _rollback)
         raise HTTPException(status_code=500, detail=f"Failed to create question: {str(e)}")
 
 # ============================================================================
@@ -315,21 +336,17 @@ async def answer_question(
             raise HTTPException(status_code=400, detail=f"Invalid question ID format: {question_id}")
         
         # Find the question
-        question = db.query(ProposalQuestion).filter(
-            ProposalQuestion.id == question_uuid
-        ).first()
+        question = await run_db(db, _find_question, question_uuid)
         
         if not question:
             raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
         
         # Update with answer
-        question.answer_text = answer_data.answer
-        question.status = 'answered'
-        question.answered_by = user.get('full_name') if user else 'Support Team'
-        question.answered_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(question)
+        question = await run_db(
+            db, _record_answer, question, answer_data.answer,
+            user.get('full_name') if user else 'Support Team'
+        )
+        await ainvalidate_proposal_cache(question.proposal_id)
         
         logger.info(f"Answered question {question_id}")
         
@@ -356,9 +373,54 @@ async def answer_question(
         logger.error(f"Error answering question {question_id}: {str(e)}")
         import traceback
         traceback.print_exc()
-        db.rollback()
+        await run_db(db, _rollback)
         raise HTTPException(status_code=500, detail=f"Failed to answer question: {str(e)}")
 
+# ============================================================================
+# QUESTION STATUS ROUTE (POLLED WHILE AUTO-ANSWERING)
+# ============================================================================
+
+def _get_question_status(db: Session, question_uuid: uuid.UUID) -> Optional[Dict[str, Any]]:
+    question = _find_question(db, question_uuid)
+    
+    if not question:
+        return None
+    
+    return {
+        "id": str(question.id),
+        "status": question.status,
+        "answer": question.answer_text,
+        "answeredBy": question.answered_by,
+        "answeredAt": question.answered_at.isoformat() if question.answered_at else None,
+        "ai_generated": question.ai_generated
+    }
+
+@router.get("/questions/{question_id}/status")
+async def get_question_status(
+    question_id: str,
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Current status of a question and of its background auto-answer job
+
+    The frontend polls this after creating a question until status is 'answered'
+    or auto_answer.state is terminal (answered / skipped / failed). auto_answer is
+    null when the job ran in another worker process or has aged out.
+    """
+    try:
+        question_uuid = uuid.UUID(question_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid question ID format: {question_id}")
+    
+    status_data = await run_db(db, _get_question_status, question_uuid)
+    
+    if status_data is None:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
+    
+    status_data["auto_answer"] = get_answer_queue().get_job(question_uuid)
+    return status_data
+
 # ============================================================================
 # AI-POWERED AUTO-ANSWER ROUTES
 # ============================================================================
@@ -394,17 +456,13 @@ async def ai_answer_question(
             raise HTTPException(status_code=400, detail=f"Invalid question ID format: {question_id}")
 
         # Find the question
-        question = db.query(ProposalQuestion).filter(
-            ProposalQuestion.id == question_uuid
-        ).first()
+        question = await run_db(db, _find_question, question_uuid)
 
         if not question:
             raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
 
         # Get the associated proposal
-        proposal = db.query(Proposal).filter(
-            Proposal.id == question.proposal_id
-        ).first()
+        proposal = await run_db(db, load_proposal_graph, str(question.proposal_id))
 
         if not proposal:
             raise HTTPException(status_code=404, detail=f"Proposal for question {question_id} not found")
@@ -422,13 +480,11 @@ async def ai_answer_question(
 
         # If auto_save is enabled, save the answer
         if ai_request.auto_save and result.get('answer'):
-            question.answer_text = result['answer']
-            question.status = 'answered'
-            question.answered_by = f"AI Assistant ({user.get('full_name') if user else 'System'})"
-            question.answered_at = datetime.utcnow()
-
-            db.commit()
-            db.refresh(question)
+            question = await run_db(
+                db, _record_answer, question, result['answer'],
+                f"AI Assistant ({user.get('full_name') if user else 'System'})"
+            )
+            await ainvalidate_proposal_cache(question.proposal_id)
             logger.info(f"Auto-saved AI answer for question {question_id}")
 
         # Return comprehensive response
@@ -454,10 +510,61 @@ async def ai_answer_question(
         logger.error(f"Error generating AI answer for question {question_id}: {str(e)}")
         import traceback
         traceback.print_exc()
-        db.rollback()
+        await run_db(db, _rollback)
         raise HTTPException(status_code=500, detail=f"Failed to generate AI answer: {str(e)}")
 
 
+@router.post("/questions/ai-answer/batch")
+async def ai_answer_question_batch(
+    batch_request: BatchAIAnswerRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate AI answers for many pending questions at once
+
+    Give either question_ids or proposal_id (all of that proposal's pending
+    questions, oldest first, up to AI_BATCH_MAX_QUESTIONS). Questions are
+    grouped by proposal: each proposal's index is loaded once, all question
+    texts are embedded in one call, LLM calls run with bounded concurrency
+    (AI_BATCH_CONCURRENCY) and, with auto_save, each proposal's answers are
+    saved in one transaction. Questions that are no longer pending are skipped,
+    as are those not answered within AI_BATCH_TIME_BUDGET_SECONDS; they stay
+    pending for the next batch.
+    """
+    user = getattr(request.state, 'user', None)
+
+    if bool(batch_request.question_ids) == bool(batch_request.proposal_id):
+        raise HTTPException(status_code=400, detail="Provide either question_ids or proposal_id")
+
+    question_ids = None
+    if batch_request.question_ids:
+        try:
+            question_ids = list(dict.fromkeys(uuid.UUID(question_id) for question_id in batch_request.question_ids))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid question ID format in question_ids")
+
+    try:
+        if question_ids:
+            logger.info(f"Batch AI answer for {len(question_ids)} questions")
+        else:
+            logger.info(f"Batch AI answer for pending questions of proposal {batch_request.proposal_id}")
+        return await answer_question_batch(
+            db,
+            question_ids=question_ids,
+            proposal_identifier=batch_request.proposal_id,
+            use_rag=batch_request.use_rag,
+            auto_save=batch_request.auto_save,
+            answered_by=f"AI Assistant ({user.get('full_name') if user else 'System'})"
+        )
+    except BatchRequestError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch AI answer: {str(e)}")
+        await run_db(db, _rollback)
+        raise HTTPException(status_code=500, detail=f"Failed to generate AI answers: {str(e)}")
+
+
 @router.post("/proposals/{proposal_id}/questions/ask-ai")
 async def ask_ai_about_proposal(
     proposal_id: str,
@@ -486,7 +593,7 @@ async def ask_ai_about_proposal(
         logger.info(f"AI question for proposal {proposal_id}: {question_text}")
 
         # Get proposal
-        proposal = get_proposal_by_id_or_job_number(db, proposal_id)
+        proposal = await run_db(db, load_proposal_graph, proposal_id)
 
         if not proposal:
             raise HTTPException(status_code=404, detail=f"Proposal {proposal_id} not found")
@@ -525,6 +632,68 @@ async def ask_ai_about_proposal(
         raise HTTPException(status_code=500, detail=f"Failed to process AI question: {str(e)}")
 
 
+@router.post("/proposals/{proposal_id}/questions/ask-ai/stream")
+async def ask_ai_about_proposal_stream(
+    proposal_id: str,
+    question_data: Dict[str, Any],
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Ask a question about a proposal and stream the AI answer as Server-Sent Events
+
+    Same request body as /ask-ai. The response is text/event-stream:
+
+        event: token   data: {"text": "..."}            (answer text as it is generated)
+        event: done    data: {same fields as /ask-ai}   (sources, confidence, method)
+        event: error   data: {"answer": ..., "reasoning": ...}
+    """
+    question_text = question_data.get('question')
+    if not question_text:
+        raise HTTPException(status_code=400, detail="Question text is required")
+
+    use_rag = question_data.get('use_rag', True)
+
+    logger.info(f"Streaming AI question for proposal {proposal_id}: {question_text}")
+
+    proposal = await run_db(db, load_proposal_graph, proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail=f"Proposal {proposal_id} not found")
+
+    rag_service = get_rag_service()
+    response_fields = {
+        "proposal_id": str(proposal.id),
+        "job_number": proposal.job_number,
+        "question": question_text
+    }
+
+    async def events():
+        async for event in rag_service.stream_answer(question_text, proposal, db, use_rag=use_rag):
+            kind = event.pop('type')
+            if kind == 'token':
+                data = {"text": event['text']}
+            else:
+                data = {
+                    **response_fields,
+                    "answer": event.get('answer'),
+                    "method": event.get('method'),
+                    "confidence": event.get('confidence'),
+                    "sources": event.get('sources', []),
+                    "reasoning": event.get('reasoning')
+                }
+            yield f"event: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Content-Encoding": "identity",  # GZipMiddleware would hold events back in its compressor
+            "X-Accel-Buffering": "no"  # Don't let nginx buffer the stream
+        }
+    )
+
+
 @router.delete("/proposals/{proposal_id}/rag-cache")
 async def clear_proposal_rag_cache(
     proposal_id: str,
@@ -538,7 +707,7 @@ async def clear_proposal_rag_cache(
     """
     try:
         # Verify proposal exists
-        proposal = get_proposal_by_id_or_job_number(db, proposal_id)
+        proposal = await run_db(db, get_proposal_by_id_or_job_number, proposal_id)
 
         if not proposal:
             raise HTTPException(status_code=404, detail=f"Proposal {proposal_id} not found")
@@ -0,0 +1,70 @@
+# app/api/search.py
+"""Cross-proposal semantic search (e.g. "LED wall at the Marriott ballroom")"""
+
+from fastapi import APIRouter, Request, HTTPException, Query
+from app.services.rag_service import get_rag_service
+from app.services.search_index import get_search_index, attach_chunks
+from typing import Optional
+from datetime import date
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Chunk hits fetched per requested proposal, so proposals with many matching
+# chunks don't crowd the others off the page
+CHUNKS_PER_RESULT = 10
+
+
+@router.get("/search")
+async def search_proposals(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=500),
+    status: Optional[str] = Query(None, description="Status, or comma-separated statuses"),
+    client: Optional[str] = Query(None, description="Substring of the client name or company"),
+    date_from: Optional[date] = Query(None, description="Events ending on or after this date"),
+    date_to: Optional[date] = Query(None, description="Events starting on or before this date"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Proposals whose content best matches the query, each with its top matching chunks"""
+    user = getattr(request.state, 'user', None)
+
+    search_index = get_search_index()
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="Proposal search is not enabled")
+    if not search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is loading, try again shortly",
+                            headers={"Retry-After": "10"})
+
+    rag_service = get_rag_service()
+    if rag_service.readiness()["status"] == "loading":
+        raise HTTPException(status_code=503, detail="Embedding model is loading, try again shortly",
+                            headers={"Retry-After": "10"})
+
+    started = time.perf_counter()
+    embedding = await rag_service.embed_question_batched(q)
+    if embedding is None:
+        raise HTTPException(status_code=503, detail="Embedding model not available")
+
+    try:
+        hits = await asyncio.to_thread(
+            search_index.search, embedding, limit * CHUNKS_PER_RESULT,
+            status=status, client=client, date_from=date_from, date_to=date_to
+        )
+        results = await asyncio.to_thread(attach_chunks, search_index, hits, limit)
+    except Exception as e:
+        logger.error(f"Error searching proposals for '{q}': {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to search proposals: {str(e)}")
+
+    return {
+        "query": q,
+        "filters": {"status": status, "client": client, "date_from": date_from, "date_to": date_to},
+        "results": results,
+        "total_count": len(results),
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+        "index": {"type": search_index.stats()["type"], "vectors": search_index.ntotal},
+        "user": user
+    }
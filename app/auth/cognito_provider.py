@@ -1,7 +1,7 @@
 # app/auth/cognito_provider.py
 import boto3
-import requests
-from jose import jwk, jwt as jose_jwt
+from jose import jwt as jose_jwt
+from app.auth.jwks import JWKSKeyStore
 from app.config import settings
 from typing import Dict
 import logging
@@ -16,19 +16,11 @@ class CognitoProvider:
         
         # JWK keys URL for token validation
         self.jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
-        self._jwks = None
-    
-    async def get_jwks(self):
-        """Get JSON Web Key Set from Cognito"""
-        if not self._jwks:
-            try:
-                response = requests.get(self.jwks_url, timeout=10)
-                response.raise_for_status()
-                self._jwks = response.json()
-            except Exception as e:
-                logger.error(f"Failed to fetch JWKS: {e}")
-                raise ValueError("Unable to fetch Cognito JWKS")
-        return self._jwks
+        self.key_store = JWKSKeyStore(
+            self.jwks_url,
+            ttl_seconds=settings.COGNITO_JWKS_TTL_SECONDS,
+            refetch_interval_seconds=settings.COGNITO_JWKS_REFETCH_INTERVAL_SECONDS
+        )
     
     async def validate_token(self, token: str) -> Dict:
         """Validate JWT token from Cognito"""
@@ -40,13 +32,8 @@ class CognitoProvider:
             if not kid:
                 raise ValueError("No 'kid' found in token header")
             
-            # Get the public key
-            jwks = await self.get_jwks()
-            key = None
-            for jwk_key in jwks['keys']:
-                if jwk_key['kid'] == kid:
-                    key = jwk.construct(jwk_key)
-                    break
+            # Get the pre-constructed public key
+            key = await self.key_store.get_key(kid)
             
             if not key:
                 raise ValueError("Unable to find appropriate key")
@@ -67,7 +54,8 @@ class CognitoProvider:
                 "full_name": payload.get("name", ""),
                 "username": payload.get("cognito:username"),
                 "roles": payload.get("cognito:groups", []),
-                "custom_attributes": {k: v for k, v in payload.items() if k.startswith("custom:")}
+                "custom_attributes": {k: v for k, v in payload.items() if k.startswith("custom:")},
+                "exp": payload.get("exp")
             }
             
         except Exception as e:
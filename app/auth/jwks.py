@@ -0,0 +1,97 @@
+# app/auth/jwks.py
+import asyncio
+import httpx
+import time
+from jose import jwk
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JWKSKeyStore:
+    """
+    Cognito public keys, parsed once and held by kid
+
+    - Cold start fetches synchronously (awaited) before the first validation
+    - Once older than ttl_seconds, keys keep being served while a background
+      refresh replaces them
+    - An unknown kid (key rotation) triggers one awaited refetch, shared by
+      all concurrent callers and rate limited by refetch_interval_seconds;
+      callers arriving while a refetch is in flight wait for its result
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl_seconds: float = 3600,
+        refetch_interval_seconds: float = 30,
+        timeout: float = 10
+    ):
+        self.jwks_url = jwks_url
+        self.ttl_seconds = ttl_seconds
+        self.refetch_interval_seconds = refetch_interval_seconds
+        self.timeout = timeout
+
+        self._keys: Dict[str, jwk.Key] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_fetch_attempt: float = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+
+    async def get_key(self, kid: str) -> Optional[jwk.Key]:
+        """Return the constructed public key for kid, or None if Cognito doesn't know it"""
+        if self._fetched_at is None:
+            await self._refresh()
+        elif time.monotonic() - self._fetched_at > self.ttl_seconds:
+            self._start_refresh()
+
+        key = self._keys.get(kid)
+        if key is None and self._refresh_task is not None and not self._refresh_task.done():
+            # A refresh is in flight (maybe started for this very kid): its
+            # keys count before the rate limit turns this caller away
+            await self._refresh()
+            key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._last_fetch_attempt > self.refetch_interval_seconds:
+            logger.info(f"Unknown JWKS kid {kid}, refetching keys")
+            await self._refresh()
+            key = self._keys.get(kid)
+
+        return key
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already in flight (single-flight)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._last_fetch_attempt = time.monotonic()
+            self._refresh_task = asyncio.ensure_future(self._fetch())
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    async def _refresh(self):
+        try:
+            await asyncio.shield(self._start_refresh())
+        except Exception as e:
+            if not self._keys:
+                raise ValueError("Unable to fetch Cognito JWKS") from e
+
+    async def _fetch(self):
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+            jwks = response.json()
+
+        keys = {}
+        for jwk_key in jwks.get('keys', []):
+            try:
+                keys[jwk_key['kid']] = jwk.construct(jwk_key, jwk_key.get('alg', 'RS256'))
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWKS key {jwk_key.get('kid')}: {e}")
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        self.fetch_count += 1
+        logger.info(f"Loaded {len(keys)} Cognito signing keys")
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to fetch JWKS: {task.exception()}")
@@ -1,70 +1,82 @@
 # app/auth/sso_middleware.py
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.auth.cognito_provider import CognitoProvider
-from app.services.user_service import UserService, UserValidationError
-from app.database import get_db
+from app.auth.token_cache import get_token_cache
+from app.config import settings
+from app.services.user_service import authorize_user, UserValidationError
+from typing import Iterable, Pattern
+import re
 import logging
 
 logger = logging.getLogger(__name__)
 
-class ApprovedUserMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, exempt_paths: list = None):
-        super().__init__(app)
+def compile_prefix_pattern(prefixes: Iterable[str]) -> Pattern:
+    """One anchored regex equivalent to any(path.startswith(p) for p in prefixes)"""
+    alternatives = sorted({re.escape(prefix) for prefix in prefixes}, key=len, reverse=True)
+    if not alternatives:
+        return re.compile(r"(?!)")  # Matches nothing
+    return re.compile("(?:" + "|".join(alternatives) + ")")
+
+class ApprovedUserMiddleware:
+    """
+    Pure ASGI authentication middleware
+
+    Non-HTTP scopes and exempt path prefixes pass straight through. Other
+    requests need a Cognito bearer token for a pre-approved user; the user
+    dict is stored on scope["state"] so routes read it as request.state.user.
+    Responses (including streaming ones) are never wrapped or buffered.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: list = None):
+        self.app = app
         self.cognito = CognitoProvider()
+        self.token_cache = get_token_cache() if settings.AUTH_TOKEN_CACHE_ENABLED else None
         self.exempt_paths = exempt_paths or [
-            "/health", "/docs", "/redoc", "/openapi.json", "/", 
+            "/health", "/docs", "/redoc", "/openapi.json", "/",
             "/admin/approved-users"  # Read-only endpoint
         ]
-    
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for exempt paths
-        if any(request.url.path.startswith(path) for path in self.exempt_paths):
-            return await call_next(request)
-        
+        self.exempt_pattern = compile_prefix_pattern(self.exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip auth for non-HTTP scopes and exempt paths
+        if scope["type"] != "http" or self.exempt_pattern.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
         # Check for Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=401, 
-                detail="Authorization header required"
-            )
-        
+            response = JSONResponse({"detail": "Authorization header required"}, status_code=401)
+            await response(scope, receive, send)
+            return
+
         token = auth_header.split(" ")[1]
-        
+
         try:
-            # Validate with Cognito
-            cognito_data = await self.cognito.validate_token(token)
-            
-            # Check against pre-approved users table
-            db = next(get_db())
-            user_service = UserService(db)
-            user = user_service.validate_and_get_user(cognito_data)
-            
-            # Add user to request state
-            request.state.user = {
-                "user_id": user.user_id,
-                "email": user.email,
-                "full_name": user.full_name,
-                "roles": user.roles,
-                "company": user.company,
-                "department": user.department,
-                "is_active": user.is_active
-            }
-            
-            logger.debug(f"Authenticated user: {user.email}")
-            
+            # Validate with Cognito (verified claims are cached until the token expires)
+            if self.token_cache:
+                cognito_data = await self.token_cache.validate(token, self.cognito.validate_token)
+            else:
+                cognito_data = await self.cognito.validate_token(token)
+
+            # Check against pre-approved users (cached, no writes on the request path)
+            user = await authorize_user(cognito_data)
+
         except UserValidationError as e:
             logger.warning(f"User validation failed: {str(e)}")
-            raise HTTPException(
-                status_code=403, 
-                detail=str(e)
-            )
+            response = JSONResponse({"detail": str(e)}, status_code=403)
+            await response(scope, receive, send)
+            return
         except Exception as e:
             logger.error(f"Authentication failed: {str(e)}")
-            raise HTTPException(
-                status_code=401, 
-                detail="Authentication failed"
-            )
-        
-        return await call_next(request)
\ No newline at end of file
+            response = JSONResponse({"detail": "Authentication failed"}, status_code=401)
+            await response(scope, receive, send)
+            return
+
+        # Add user to request state
+        scope.setdefault("state", {})["user"] = user
+        logger.debug(f"Authenticated user: {user['email']}")
+
+        await self.app(scope, receive, send)
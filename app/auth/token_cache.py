@@ -0,0 +1,63 @@
+# app/auth/token_cache.py
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from app.config import settings
+from app.core.cache import LRUCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+class VerifiedTokenCache:
+    """
+    Decoded Cognito claims keyed by a SHA-256 digest of the bearer token
+
+    Entries live until the token's own exp, so a token is only ever accepted
+    from cache while its signature check would still pass. Raw tokens are
+    never stored.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.cache = LRUCache(max_entries=max_entries)
+        self.verifications = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def validate(self, token: str, validator: Callable[[str], Awaitable[Dict]]) -> Dict:
+        """Return cached claims for token, or verify it with validator and cache the result"""
+        key = self.digest(token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+
+        claims = await validator(token)
+        self.verifications += 1
+
+        remaining = (claims.get("exp") or 0) - time.time()
+        if remaining > 0:
+            self.cache.set(key, claims, ttl_seconds=remaining)
+        return claims
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": settings.AUTH_TOKEN_CACHE_ENABLED,
+            "verifications": self.verifications,
+            **self.cache.stats()
+        }
+
+
+# Global verified-token cache instance
+_token_cache: Optional[VerifiedTokenCache] = None
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    """Get or create global verified-token cache"""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = VerifiedTokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+    return _token_cache
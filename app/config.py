@@ -11,6 +11,13 @@ ENV_FILE = ROOT_DIR / ".env"
 class Settings(BaseSettings):
     # Database - will be overridden by .env
     DATABASE_URL: str = "sqlite:///./proposal_portal.db"
+    DB_POOL_SIZE: int = 5  # Per gunicorn worker
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = no server-side statement timeout (PostgreSQL only)
+    DB_ASYNC_ENABLED: bool = False  # asyncpg / aiosqlite sessions for read routes
+    DB_ASYNC_PGBOUNCER: bool = False  # Disable asyncpg statement caches behind transaction poolers
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -25,6 +32,12 @@ class Settings(BaseSettings):
     COGNITO_USER_POOL_ID: str = ""
     COGNITO_CLIENT_ID: str = ""
     COGNITO_CLIENT_SECRET: str = ""
+    COGNITO_JWKS_TTL_SECONDS: int = 3600  # Background refresh of signing keys
+    COGNITO_JWKS_REFETCH_INTERVAL_SECONDS: int = 30  # Min gap between unknown-kid refetches
+    AUTH_TOKEN_CACHE_ENABLED: bool = True  # Skip RS256 verification for tokens already seen
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60  # How long pre-approved lookups are trusted
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: int = 30  # Batched last_login/session writes
     
     # Frontend URL
     FRONTEND_BASE_URL: str = "https://main.dnfe4l5bsjojn.amplifyapp.com"
@@ -41,7 +54,62 @@ class Settings(BaseSettings):
 
     # AI/RAG Configuration
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_MAX_CONCURRENCY: int = 4  # In-flight Claude calls per process
+    ANTHROPIC_TIMEOUT_SECONDS: float = 60.0
+    ANTHROPIC_MAX_RETRIES: int = 2  # Client-side retries on 429/5xx/connection errors
     ENABLE_RAG_AUTO_ANSWER: bool = True
+    RAG_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # In-memory vector stores (index vectors + chunk text)
+    RAG_CACHE_MAX_ENTRIES: int = 1000
+    RAG_COMPACT_MAX_CHUNKS: int = 1024  # Proposals up to this size search a shared NumPy matrix, larger use FAISS (0 = FAISS only)
+    RAG_COMPACT_DTYPE: str = "float16"  # float16 | float32 storage for the shared matrix
+    RAG_CONTEXT_TOP_K: int = 5  # Chunks put in the answer prompt (at most)
+    RAG_CONTEXT_MAX_TOKENS: int = 1500  # Context token budget of the answer prompt (tiktoken cl100k_base count)
+    RAG_HYBRID_SEARCH: bool = True  # Fuse vector search with BM25 keyword search (reciprocal-rank fusion)
+    RAG_HYBRID_CANDIDATES: int = 20  # Chunks taken from each ranking before fusion
+    RAG_RRF_K: int = 60  # Reciprocal-rank fusion constant: 1 / (k + rank)
+    RAG_HYBRID_MIN_SCORE_RATIO: float = 0.0  # Drop chunks fused below this fraction of the best one
+    FAST_PATH_ENABLED: bool = True  # Answer factual questions (totals, dates, quantities) from proposal columns
+    FAST_PATH_MIN_CONFIDENCE: float = 0.8  # Below this the question goes to RAG + LLM
+    RAG_INDEX_ON_WRITE: bool = True  # Embed proposals in the background when their rows change
+    RAG_EMBED_ON_REQUEST: bool = False  # Allow embedding proposal chunks inside a question request
+    RAG_INDEX_DIR: str = "./data/rag_indexes"  # Shared on-disk FAISS indexes ("" = memory only)
+    RAG_WARMUP_ON_STARTUP: bool = True  # Load the embedder on a background thread at startup
+    RAG_WARMUP_WAIT_SECONDS: float = 120.0  # Background answer jobs wait this long for the warm-up
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # sentence-transformers | onnx | onnx-int8
+    EMBEDDING_ONNX_DIR: str = "./models/all-MiniLM-L6-v2-onnx"  # Output of scripts/export_onnx_embedder.py
+    EMBEDDING_ONNX_THREADS: int = 0  # ONNX Runtime intra-op threads (0 = all cores)
+    EMBEDDING_SERVICE_SOCKET: str = ""  # Unix socket of the shared embedding sidecar ("" = model per worker)
+    EMBEDDING_SERVICE_TIMEOUT_SECONDS: float = 10.0
+    EMBEDDING_SERVICE_FALLBACK_LOCAL: bool = True  # Load the model in-process while the sidecar is down
+    EMBEDDING_BATCH_MAX_SIZE: int = 64  # Texts per encode call in the sidecar
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0  # How long the sidecar waits to fill a batch
+    QUESTION_EMBED_BATCH_MAX_SIZE: int = 32  # Concurrent question embeddings per encode call (per worker)
+    QUESTION_EMBED_BATCH_WAIT_MS: float = 5.0  # Window for gathering concurrent question embeddings
+    SEARCH_INDEX_ENABLED: bool = True  # Cross-proposal semantic search (GET /api/v1/search)
+    SEARCH_INDEX_DIR: str = "./data/search_index"  # Snapshots of the global index ("" = rebuild on startup)
+    SEARCH_INDEX_REFRESH_SECONDS: float = 60.0  # How often workers pick up re-indexed / deleted proposals
+    SEARCH_INDEX_IVF_MIN_VECTORS: int = 20000  # Exact search below this, IVF-SQ8 above
+    SEARCH_INDEX_NPROBE: int = 16  # IVF lists scanned per unfiltered query
+    ANSWER_CACHE_ENABLED: bool = True  # Reuse answers to repeated questions per proposal
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # Cosine similarity for near-duplicate questions
+    ANSWER_CACHE_SEMANTIC_MIN_WORDS: int = 6  # Shorter questions only hit on exact text
+    ANSWER_CACHE_MAX_PROPOSALS: int = 256
+    ANSWER_CACHE_MAX_ENTRIES_PER_PROPOSAL: int = 100
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+    AUTO_ANSWER_WORKERS: int = 2  # Concurrent background answer jobs per process
+    AUTO_ANSWER_MAX_PENDING: int = 1000  # Questions beyond this stay pending for human review
+    AUTO_ANSWER_MAX_ATTEMPTS: int = 3
+    AUTO_ANSWER_RETRY_BACKOFF_SECONDS: float = 2.0  # Doubles after each failed attempt
+    AUTO_ANSWER_REQUEUE_MINUTES: int = 0  # On startup, re-queue pending questions this recent (0 = off)
+    AI_BATCH_MAX_QUESTIONS: int = 20  # Questions per POST /questions/ai-answer/batch (~ max / concurrency x LLM latency)
+    AI_BATCH_CONCURRENCY: int = 2  # Answers in flight per batch (leaves LLM slots for interactive asks)
+    AI_BATCH_TIME_BUDGET_SECONDS: float = 45.0  # No new answers after this; the rest stay pending (fits 60s proxy timeouts)
+
+    # Proposal payload cache
+    PROPOSAL_CACHE_ENABLED: bool = True
+    PROPOSAL_CACHE_MAX_ENTRIES: int = 256
+    PROPOSAL_CACHE_TTL_SECONDS: int = 300
+    PROPOSAL_CACHE_USE_REDIS: bool = False  # Share payloads across workers via REDIS_URL
 
     @property
     def allowed_origins_list(self) -> List[str]:
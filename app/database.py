@@ -1,21 +1,82 @@
 # app/database.py
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from typing import Any, Callable, Dict, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_postgres(url: str) -> bool:
+    return url.startswith("postgres")
+
+def _pool_options(url: str) -> Dict[str, Any]:
+    """Engine options shared by the sync and async engines"""
+    options = {
+        "echo": settings.DEBUG,  # Log SQL queries in debug mode
+        "pool_pre_ping": True,
+    }
+    if not _is_sqlite(url):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+def _sync_connect_args(url: str) -> Dict[str, Any]:
+    if _is_postgres(url) and settings.DB_STATEMENT_TIMEOUT_MS:
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+def _async_connect_args(url: str) -> Dict[str, Any]:
+    connect_args: Dict[str, Any] = {}
+    if _is_postgres(url):
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        if settings.DB_ASYNC_PGBOUNCER:
+            # Transaction-mode poolers (e.g. Supabase on :6543) can't keep prepared statements
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    return connect_args
+
+def async_database_url(url: str) -> str:
+    """Map DATABASE_URL onto its async driver (asyncpg / aiosqlite)"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-    pool_pre_ping=True
+    connect_args=_sync_connect_args(settings.DATABASE_URL),
+    **_pool_options(settings.DATABASE_URL)
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional async engine (DB_ASYNC_ENABLED=true)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    async_url = async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        connect_args=_async_connect_args(async_url),
+        **_pool_options(async_url)
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db() -> Session:
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -24,6 +85,27 @@ def get_db() -> Session:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncSession:
+    """Dependency for getting an async database session (requires DB_ASYNC_ENABLED)"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled; set DB_ASYNC_ENABLED=true")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Read-only routes use the async session when async mode is on
+get_read_db = get_async_db if settings.DB_ASYNC_ENABLED else get_db
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., Any], *args) -> Any:
+    """
+    Run fn(session, *args) without blocking the event loop
+
+    Async sessions run it on their own connection via run_sync; sync sessions
+    run it in the threadpool. Lets query code be written once against Session.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
 def init_database():
     """Initialize database tables"""
     from app.models.users import Base
@@ -32,4 +114,4 @@ def init_database():
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -12,11 +12,16 @@ from app.config import settings
 from app.auth.sso_middleware import ApprovedUserMiddleware
 
 # API routers
-from app.api import proposals, questions, users, admin, admin_read
+from app.api import proposals, questions, users, admin, admin_read, search
 from app.api import secure_access  # ✅ NEW: JWT temporary access module
 
 from app.core.logging import setup_logging
 from app.database import init_database
+from app.services.user_service import get_login_recorder
+from app.services.answer_queue import get_answer_queue
+from app.services.rag_service import RAGService, start_rag_warmup, get_rag_readiness
+from app.services.embedders import embedding_model_id
+from app.services.search_index import start_search_index, stop_search_index, get_search_index
 
 # Setup logging
 setup_logging()
@@ -51,9 +56,29 @@ async def lifespan(app: FastAPI):
     logger.info("  • Q&A System")
     logger.info("=" * 80)
     
+    login_recorder = get_login_recorder()
+    login_recorder.start()
+    
+    # Embedding model loads on a background thread; requests don't wait for it
+    if settings.RAG_WARMUP_ON_STARTUP:
+        start_rag_warmup()
+    
+    # Global search index: snapshot load + periodic refresh on a background thread
+    if settings.SEARCH_INDEX_ENABLED:
+        start_search_index(embedding_model_id(RAGService.EMBEDDING_MODEL, settings.EMBEDDING_BACKEND))
+    
+    answer_queue = get_answer_queue()
+    if settings.ENABLE_RAG_AUTO_ANSWER:
+        answer_queue.start()
+        if settings.AUTO_ANSWER_REQUEUE_MINUTES:
+            await answer_queue.requeue_pending(settings.AUTO_ANSWER_REQUEUE_MINUTES)
+    
     yield
     
     logger.info("⏹️ Shutting down Proposal Portal API")
+    await answer_queue.stop()
+    await login_recorder.stop()
+    stop_search_index()
 
 # ============================================================================
 # CREATE FASTAPI APPLICATION
@@ -161,6 +186,13 @@ app.include_router(
     tags=["admin-read"]
 )
 
+# Cross-proposal semantic search
+app.include_router(
+    search.router, 
+    prefix="/api/v1", 
+    tags=["search"]
+)
+
 # ✅ NEW: JWT-based temporary access (stateless, no sessions)
 app.include_router(
     secure_access.router, 
@@ -194,10 +226,13 @@ async def health_check():
             "qa_system": True,                 # ✅ Client questions
             "email_notifications": True,       # ✅ Gmail SMTP
         },
+        "rag": get_rag_readiness(),            # Embedder warm-up: loading / ready / unavailable
+        "search_index": get_search_index().stats() if get_search_index() else None,
         "endpoints": {
             "docs": "/docs" if settings.DEBUG else None,
             "health": "/health",
             "proposals": "/api/v1/proposals",
+            "search": "/api/v1/search?q=",
             "send_proposal": "/api/v1/admin/send-proposal",
             "access_proposal": "/api/v1/proposal/access/{token}"
         }
@@ -1,7 +1,8 @@
 # app/models/proposals.py - Complete corrected file with ForeignKey constraints
 from sqlalchemy import Column, String, Date, Time, Numeric, Integer, Boolean, DateTime, Text, ARRAY, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, Session
 from app.models.users import Base  # Use the same Base from users.py
 from datetime import datetime
 import uuid
@@ -58,10 +59,10 @@ class Proposal(Base):
     terms_accepted_by = Column(String(255))
     
     # Relationships
-    sections = relationship("ProposalSection", back_populates="proposal", cascade="all, delete-orphan")
+    sections = relationship("ProposalSection", back_populates="proposal", cascade="all, delete-orphan", order_by="ProposalSection.display_order")
     line_items = relationship("ProposalLineItem", back_populates="proposal", cascade="all, delete-orphan")
-    timeline = relationship("ProposalTimeline", back_populates="proposal", cascade="all, delete-orphan")
-    labor = relationship("ProposalLabor", back_populates="proposal", cascade="all, delete-orphan")
+    timeline = relationship("ProposalTimeline", back_populates="proposal", cascade="all, delete-orphan", order_by="ProposalTimeline.display_order")
+    labor = relationship("ProposalLabor", back_populates="proposal", cascade="all, delete-orphan", order_by="ProposalLabor.display_order")
     questions = relationship("ProposalQuestion", back_populates="proposal", cascade="all, delete-orphan")
 
 
@@ -84,7 +85,7 @@ class ProposalSection(Base):
     
     # Relationships
     proposal = relationship("Proposal", back_populates="sections")
-    items = relationship("ProposalLineItem", back_populates="section", cascade="all, delete-orphan")
+    items = relationship("ProposalLineItem", back_populates="section", cascade="all, delete-orphan", order_by="ProposalLineItem.display_order")
 
 
 class ProposalLineItem(Base):
@@ -200,6 +201,8 @@ class ProposalQuestion(Base):
     internal_notes = Column(Text)
     requires_follow_up = Column(Boolean, default=False)
 
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     # Relationships
     proposal = relationship("Proposal", back_populates="questions")
     line_item = relationship("ProposalLineItem", back_populates="questions")
@@ -247,4 +250,29 @@ class ProposalSession(Base):
     last_accessed = Column(DateTime, default=datetime.utcnow)
     
     is_active = Column(Boolean, default=True, index=True)
-    extension_count = Column(Integer, default=0)
\ No newline at end of file
+    extension_count = Column(Integer, default=0)
+
+
+_PROPOSAL_CHILDREN = (ProposalSection, ProposalLineItem, ProposalTimeline, ProposalLabor)
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_parent_proposals(session: Session, flush_context):
+    """
+    Bump Proposal.updated_at when its sections, items, timeline or labor change
+
+    Keeps the proposal row's timestamp a version of its whole content, so
+    edits to tables without updated_at (timeline, labor) are seen as well.
+    """
+    proposal_ids = {
+        obj.proposal_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, _PROPOSAL_CHILDREN) and obj.proposal_id is not None
+        and (obj not in session.dirty or session.is_modified(obj, include_collections=False))
+    }
+    if proposal_ids:
+        session.connection().execute(
+            Proposal.__table__.update()
+            .where(Proposal.__table__.c.id.in_(proposal_ids))
+            .values(updated_at=datetime.utcnow())
+        )
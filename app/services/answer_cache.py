@@ -0,0 +1,216 @@
+# app/services/answer_cache.py
+"""
+Semantic cache of AI answers to proposal questions
+
+Answers are bucketed per proposal and tagged with the proposal's content
+version (see proposal_service.get_proposal_content_version). A bucket built
+from an older version is dropped on the next lookup, so edits to the proposal
+invalidate its answers without explicit calls.
+
+Within a bucket a question hits on:
+1. Exact match of the normalized text (case, punctuation and spacing ignored)
+2. Cosine similarity of its embedding to a cached question's embedding
+   at or above ANSWER_CACHE_SIMILARITY_THRESHOLD
+
+Embeddings barely move when a question differs in one small token ("setup
+time on day 1" vs "day 2"), so similarity matching is skipped for questions
+shorter than ANSWER_CACHE_SEMANTIC_MIN_WORDS and never pairs questions that
+mention different numbers. Those only hit on exact text.
+"""
+
+import re
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _NON_WORD.sub("", question.lower())).strip()
+
+
+def _numbers(text: str) -> frozenset:
+    return frozenset(_NUMBER.findall(text))
+
+
+class _Bucket:
+    """Cached answers for one proposal at one content version"""
+
+    def __init__(self, version: str, max_entries: int):
+        self.version = version
+        self.max_entries = max_entries
+        self.by_text: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._matrix = None  # (texts, unit embeddings) built lazily for similarity search
+
+    def add(self, text: str, entry: Dict[str, Any]):
+        self.by_text[text] = entry
+        self.by_text.move_to_end(text)
+        while len(self.by_text) > self.max_entries:
+            self.by_text.popitem(last=False)  # Oldest first out
+        self._matrix = None
+
+    def nearest(self, embedding: np.ndarray, numbers: frozenset):
+        """(similarity, entry) of the most similar cached question mentioning the same numbers"""
+        if self._matrix is None:
+            texts = [text for text, entry in self.by_text.items() if entry["embedding"] is not None]
+            rows = np.stack([self.by_text[text]["embedding"] for text in texts]) if texts else None
+            self._matrix = (texts, rows)
+
+        texts, rows = self._matrix
+        if rows is None:
+            return 0.0, None
+        similarities = rows @ embedding
+        for index in np.argsort(-similarities):
+            if _numbers(texts[index]) == numbers:
+                return float(similarities[index]), self.by_text[texts[index]]
+        return 0.0, None
+
+
+class SemanticAnswerCache:
+    """Per-proposal answer cache matching exact and near-duplicate questions"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        semantic_min_words: int = 6,
+        max_proposals: int = 256,
+        max_entries_per_proposal: int = 100,
+        ttl_seconds: Optional[int] = 86400
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.semantic_min_words = semantic_min_words
+        self.max_entries_per_proposal = max_entries_per_proposal
+        self.buckets = LRUCache(max_entries=max_proposals, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def _unit(embedding: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(embedding))
+        return embedding / norm if norm else None
+
+    def _bucket(self, key: str, version: str, create: bool = False) -> Optional[_Bucket]:
+        bucket = self.buckets.get(key)
+        if bucket is not None and bucket.version != version:
+            self.stale += 1
+            self.buckets.pop(key)
+            bucket = None
+        if bucket is None and create:
+            bucket = _Bucket(version, self.max_entries_per_proposal)
+            self.buckets.set(key, bucket)
+        return bucket
+
+    def get(
+        self,
+        proposal_id: str,
+        version: str,
+        question: str,
+        embedding: Optional[np.ndarray] = None,
+        use_rag: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Cached answer result for this question (or a near-duplicate), else None"""
+        text = normalize_question(question)
+        with self._lock:
+            bucket = self._bucket(f"{proposal_id}:{use_rag}", version)
+            if bucket is not None:
+                entry = bucket.by_text.get(text)
+                if entry is not None:
+                    self.exact_hits += 1
+                    self.tokens_saved += entry["tokens"]
+                    return dict(entry["result"], cache="exact")
+
+                unit = self._unit(embedding)
+                if unit is not None and len(text.split()) >= self.semantic_min_words:
+                    similarity, entry = bucket.nearest(unit, _numbers(text))
+                    if entry is not None and similarity >= self.similarity_threshold:
+                        self.semantic_hits += 1
+                        self.tokens_saved += entry["tokens"]
+                        return dict(entry["result"], cache="semantic", cache_similarity=round(similarity, 4))
+
+            self.misses += 1
+            return None
+
+    def set(
+        self,
+        proposal_id: str,
+        version: str,
+        question: str,
+        result: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None,
+        tokens: int = 0,
+        use_rag: bool = True
+    ):
+        """Remember an answer result and the LLM tokens it cost"""
+        with self._lock:
+            bucket = self._bucket(f"{proposal_id}:{use_rag}", version, create=True)
+            bucket.add(normalize_question(question), {
+                "result": result,
+                "tokens": tokens,
+                "embedding": self._unit(embedding)
+            })
+
+    def invalidate(self, proposal_id: Optional[str] = None):
+        """Drop one proposal's answers, or everything when proposal_id is None"""
+        with self._lock:
+            self.invalidations += 1
+            if proposal_id:
+                for use_rag in (True, False):
+                    self.buckets.pop(f"{proposal_id}:{use_rag}")
+            else:
+                self.buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": settings.ANSWER_CACHE_ENABLED,
+            "similarity_threshold": self.similarity_threshold,
+            "semantic_min_words": self.semantic_min_words,
+            "proposals": len(self.buckets),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "llm_tokens_saved": self.tokens_saved
+        }
+
+
+# Global answer cache instance
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """Get or create global answer cache instance"""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            semantic_min_words=settings.ANSWER_CACHE_SEMANTIC_MIN_WORDS,
+            max_proposals=settings.ANSWER_CACHE_MAX_PROPOSALS,
+            max_entries_per_proposal=settings.ANSWER_CACHE_MAX_ENTRIES_PER_PROPOSAL,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS
+        )
+    return _answer_cache
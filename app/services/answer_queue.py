@@ -0,0 +1,253 @@
+# app/services/answer_queue.py
+"""Background auto-answering of client questions with the RAG service"""
+
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.proposals import ProposalQuestion
+from app.services.proposal_service import load_proposal_graph
+from app.services.proposal_cache import ainvalidate_proposal_cache
+from app.services.rag_service import get_rag_service
+from app.core.cache import LRUCache
+from app.config import settings
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Job states reported by the status endpoint
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+ANSWERED = "answered"
+SKIPPED = "skipped"  # Answered by a human first, or AI not configured
+FAILED = "failed"
+
+
+class AnswerJobError(Exception):
+    """The RAG service could not produce an answer (retryable)"""
+    pass
+
+
+class AnswerQueue:
+    """
+    In-process queue that answers pending questions in the background
+
+    The question row is committed as 'pending' by the request handler and its
+    id is enqueued here. A fixed pool of workers loads the proposal, calls the
+    RAG service and writes the answer back, retrying failures with exponential
+    backoff. Job progress is kept in a bounded in-memory map for the status
+    endpoint; the question row itself stays the source of truth.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        workers: int = 2,
+        max_pending: int = 1000,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 2.0
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.jobs = LRUCache(max_entries=max(max_pending * 4, 1000), ttl_seconds=3600)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def enqueue(self, question_id: uuid.UUID) -> bool:
+        """Schedule a question for answering; False if the queue is full or not running"""
+        if self._queue is None or not self.running:
+            return False
+        try:
+            self._queue.put_nowait(question_id)
+        except asyncio.QueueFull:
+            logger.warning(f"Answer queue full; question {question_id} left for human review")
+            return False
+        self._set_job(question_id, QUEUED, attempts=0)
+        return True
+
+    def get_job(self, question_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(str(question_id))
+
+    def _set_job(self, question_id: uuid.UUID, state: str, **fields):
+        job = dict(self.jobs.get(str(question_id)) or {})
+        job.update(fields, state=state, updated_at=datetime.utcnow().isoformat())
+        self.jobs.set(str(question_id), job)
+
+    async def _worker(self):
+        while True:
+            question_id = await self._queue.get()
+            try:
+                await self._process(question_id)
+            except Exception as e:
+                logger.error(f"Answer worker crashed on question {question_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, question_id: uuid.UUID):
+        for attempt in range(1, self.max_attempts + 1):
+            self._set_job(question_id, RUNNING, attempts=attempt)
+            try:
+                state = await self.answer(question_id)
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    self.failed += 1
+                    self._set_job(question_id, FAILED, error=str(e))
+                    logger.error(f"Giving up on question {question_id} after {attempt} attempts: {e}")
+                    return
+                delay = self.retry_backoff_seconds * 2 ** (attempt - 1)
+                self._set_job(question_id, RETRYING, error=str(e), retry_in_seconds=delay)
+                logger.warning(f"Answering question {question_id} failed ({e}); retrying in {delay}s")
+                await asyncio.sleep(delay)
+            else:
+                if state == ANSWERED:
+                    self.completed += 1
+                self._set_job(question_id, state, error=None)
+                return
+
+    async def answer(self, question_id: uuid.UUID) -> str:
+        """Answer one question; returns ANSWERED or SKIPPED, raises on retryable failure"""
+        rag_service = get_rag_service()
+        if not rag_service.client and not settings.FAST_PATH_ENABLED:
+            return SKIPPED
+
+        db = self.session_factory()
+        try:
+            loaded = await asyncio.to_thread(self._load, db, question_id)
+            if loaded is None:
+                return SKIPPED
+            question_text, proposal = loaded
+            proposal_id = proposal.id
+
+            # Factual questions are answered from the proposal's columns, no embedder or LLM needed
+            result = rag_service.try_structured_answer(question_text, proposal)
+            if result is None:
+                if not rag_service.client:
+                    return SKIPPED
+                # Right after startup, wait for the embedder rather than answer without retrieval
+                await rag_service.wait_until_ready(settings.RAG_WARMUP_WAIT_SECONDS)
+                # Off the request path, so an outdated index is re-embedded before
+                # answering, in a worker thread rather than on the event loop
+                if rag_service.embedder:
+                    await asyncio.to_thread(rag_service.ensure_vector_store, proposal, db, True)
+                result = await rag_service.answer_question(
+                    question=question_text,
+                    proposal=proposal,
+                    db=db,
+                    use_rag=True,
+                    embed_chunks=False,  # Indexed above
+                    fast_path=False
+                )
+            if result.get('method') == 'error' or not result.get('answer'):
+                raise AnswerJobError(result.get('reasoning') or "No answer generated")
+
+            saved = await asyncio.to_thread(self._save, db, question_id, result['answer'])
+        finally:
+            db.close()
+
+        if not saved:
+            return SKIPPED
+        await ainvalidate_proposal_cache(proposal_id)
+        logger.info(f"Question {question_id} auto-answered by AI")
+        return ANSWERED
+
+    @staticmethod
+    def _load(db: Session, question_id: uuid.UUID):
+        question = db.query(ProposalQuestion).filter(ProposalQuestion.id == question_id).first()
+        if not question or question.status != 'pending':
+            return None
+        proposal = load_proposal_graph(db, str(question.proposal_id))
+        if not proposal:
+            return None
+        return question.question_text, proposal
+
+    @staticmethod
+    def _save(db: Session, question_id: uuid.UUID, answer: str) -> bool:
+        """Store the AI answer unless someone answered the question in the meantime"""
+        updated = db.query(ProposalQuestion).filter(
+            ProposalQuestion.id == question_id,
+            ProposalQuestion.status == 'pending'
+        ).update({
+            ProposalQuestion.answer_text: answer,
+            ProposalQuestion.status: 'answered',
+            ProposalQuestion.answered_by: 'AI Assistant',
+            ProposalQuestion.answered_at: datetime.utcnow(),
+            ProposalQuestion.ai_generated: True  # Mark answer as AI-generated
+        }, synchronize_session=False)
+        db.commit()
+        return updated == 1
+
+    def _recent_pending(self, max_age_minutes: int) -> List[Any]:
+        db = self.session_factory()
+        try:
+            return db.query(ProposalQuestion.id, ProposalQuestion.question_text).filter(
+                ProposalQuestion.status == 'pending',
+                ProposalQuestion.asked_at >= datetime.utcnow() - timedelta(minutes=max_age_minutes)
+            ).all()
+        finally:
+            db.close()
+
+    async def requeue_pending(self, max_age_minutes: int) -> int:
+        """Re-enqueue recent auto-answerable questions a restart dropped from the queue"""
+        rag_service = get_rag_service()
+        requeued = 0
+        for row in await asyncio.to_thread(self._recent_pending, max_age_minutes):
+            classification = await rag_service.classify_question(row.question_text)
+            # Same condition as question creation (app/api/questions.py)
+            if classification['should_auto_answer'] and classification['use_ai'] and self.enqueue(row.id):
+                requeued += 1
+        if requeued:
+            logger.info(f"Re-queued {requeued} pending questions for auto-answering")
+        return requeued
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Answer queue started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel the workers; unfinished questions stay 'pending' in the database"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+# Global answer queue instance
+_answer_queue: Optional[AnswerQueue] = None
+
+
+def get_answer_queue() -> AnswerQueue:
+    """Get or create global answer queue instance"""
+    global _answer_queue
+    if _answer_queue is None:
+        _answer_queue = AnswerQueue(
+            workers=settings.AUTO_ANSWER_WORKERS,
+            max_pending=settings.AUTO_ANSWER_MAX_PENDING,
+            max_attempts=settings.AUTO_ANSWER_MAX_ATTEMPTS,
+            retry_backoff_seconds=settings.AUTO_ANSWER_RETRY_BACKOFF_SECONDS
+        )
+    return _answer_queue
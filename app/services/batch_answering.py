@@ -0,0 +1,269 @@
+# app/services/batch_answering.py
+"""
+Answering many pending questions at once, grouped by proposal
+
+Answering a backlog through /questions/{id}/ai-answer repeats the per-call
+work for every question: resolve the proposal, check its index, embed the
+question, call the LLM, commit. A batch instead:
+
+    1. loads the requested questions (ids, or all pending of a proposal)
+       and groups them by proposal
+    2. loads each proposal graph, its content version and makes sure its
+       index is in memory once (the concurrent answers never touch the Session)
+    3. embeds every distinct question text of the batch in one call
+    4. answers them all with at most AI_BATCH_CONCURRENCY answers in flight
+       (identical texts on the same proposal are answered once)
+    5. saves each proposal's answers in one transaction
+
+Only 'pending' questions are answered and saved, so a human answer given
+in the meantime is never overwritten.
+
+A batch runs inside one HTTP request, so it is sized to finish within
+request timeouts: at most AI_BATCH_MAX_QUESTIONS questions, and answers
+still running (or not yet started) after AI_BATCH_TIME_BUDGET_SECONDS are
+cancelled. Those questions are reported as skipped and stay pending for
+the next batch.
+"""
+
+import asyncio
+import time
+import uuid
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.proposals import Proposal, ProposalQuestion
+from app.services.proposal_cache import ainvalidate_proposal_cache
+from app.services.proposal_service import (
+    get_proposal_content_version, load_proposal_graph, proposal_identifier_filter
+)
+from app.services.rag_service import get_rag_service
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRequestError(ValueError):
+    """The batch request can't be served (unknown proposal, too many questions)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _load_questions(
+    db: Session,
+    question_ids: Optional[List[uuid.UUID]],
+    proposal_identifier: Optional[str],
+    limit: int
+) -> Tuple[List[ProposalQuestion], Dict[str, str]]:
+    """Pending questions to answer, and a skip reason for each requested id that isn't one"""
+    skipped: Dict[str, str] = {}
+    if question_ids is not None:
+        rows = db.query(ProposalQuestion).filter(ProposalQuestion.id.in_(question_ids)).all()
+        found = {row.id: row for row in rows}
+        questions = []
+        for question_id in question_ids:
+            row = found.get(question_id)
+            if row is None:
+                skipped[str(question_id)] = "not found"
+            elif row.status != 'pending':
+                skipped[str(question_id)] = f"status is {row.status}"
+            else:
+                questions.append(row)
+        return questions, skipped
+
+    proposal_id = db.query(Proposal.id).filter(proposal_identifier_filter(proposal_identifier)).scalar()
+    if proposal_id is None:
+        raise BatchRequestError(f"Proposal {proposal_identifier} not found", status_code=404)
+    questions = db.query(ProposalQuestion).filter(
+        ProposalQuestion.proposal_id == proposal_id,
+        ProposalQuestion.status == 'pending'
+    ).order_by(ProposalQuestion.asked_at).limit(limit).all()
+    return questions, skipped
+
+
+def _save_answers(db: Session, answers: List[Tuple[uuid.UUID, str]], answered_by: str) -> List[uuid.UUID]:
+    """Store one proposal's answers in a single transaction; returns the ids actually saved"""
+    saved = []
+    answered_at = datetime.utcnow()
+    try:
+        for question_id, answer in answers:
+            updated = db.query(ProposalQuestion).filter(
+                ProposalQuestion.id == question_id,
+                ProposalQuestion.status == 'pending'
+            ).update({
+                ProposalQuestion.answer_text: answer,
+                ProposalQuestion.status: 'answered',
+                ProposalQuestion.answered_by: answered_by,
+                ProposalQuestion.answered_at: answered_at,
+                ProposalQuestion.ai_generated: True
+            }, synchronize_session=False)
+            if updated:
+                saved.append(question_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return saved
+
+
+async def answer_question_batch(
+    db: Session,
+    question_ids: Optional[List[uuid.UUID]] = None,
+    proposal_identifier: Optional[str] = None,
+    use_rag: bool = True,
+    auto_save: bool = True,
+    answered_by: str = "AI Assistant",
+    max_questions: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    time_budget_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Answer the given pending questions, or all pending ones of a proposal
+
+    Returns per-question results plus batch totals. Raises BatchRequestError
+    for an unknown proposal or more than max_questions (AI_BATCH_MAX_QUESTIONS)
+    question ids; a proposal's pending questions are capped at that limit,
+    oldest first. Answers not finished within time_budget_seconds
+    (AI_BATCH_TIME_BUDGET_SECONDS) are cancelled and skipped.
+    """
+    started = time.perf_counter()
+    max_questions = max_questions or settings.AI_BATCH_MAX_QUESTIONS
+    concurrency = concurrency or settings.AI_BATCH_CONCURRENCY
+    deadline = started + (time_budget_seconds or settings.AI_BATCH_TIME_BUDGET_SECONDS)
+    if question_ids is not None and len(question_ids) > max_questions:
+        raise BatchRequestError(f"At most {max_questions} questions per batch ({len(question_ids)} given)")
+
+    rag_service = get_rag_service()
+    questions, skipped = await asyncio.to_thread(
+        _load_questions, db, question_ids, proposal_identifier, max_questions
+    )
+
+    by_proposal: Dict[uuid.UUID, List[ProposalQuestion]] = defaultdict(list)
+    for question in questions:
+        by_proposal[question.proposal_id].append(question)
+
+    # One graph load, content version and index check per proposal
+    proposals: Dict[uuid.UUID, Proposal] = {}
+    content_versions: Dict[uuid.UUID, Optional[str]] = {}
+    for proposal_id in by_proposal:
+        proposal = await asyncio.to_thread(load_proposal_graph, db, str(proposal_id))
+        if proposal is None:
+            for question in by_proposal[proposal_id]:
+                skipped[str(question.id)] = "proposal not found"
+            continue
+        if use_rag and rag_service.embedder:
+            await asyncio.to_thread(rag_service.ensure_vector_store, proposal, db, True)
+        if settings.ANSWER_CACHE_ENABLED:
+            content_versions[proposal_id] = await asyncio.to_thread(get_proposal_content_version, db, proposal_id)
+        proposals[proposal_id] = proposal
+
+    # Identical questions on a proposal are answered once. Plain values only:
+    # the per-proposal commits below expire the ORM rows.
+    work: Dict[Tuple[uuid.UUID, str], List[Tuple[uuid.UUID, str]]] = defaultdict(list)
+    job_numbers = {proposal_id: proposal.job_number for proposal_id, proposal in proposals.items()}
+    for proposal_id in proposals:
+        for question in by_proposal[proposal_id]:
+            work[(proposal_id, question.question_text.strip())].append((question.id, question.question_text))
+
+    # Every distinct question text embedded in one call
+    texts = sorted({text for _, text in work})
+    embeddings: Dict[str, Any] = {}
+    if texts and use_rag and rag_service.embedder:
+        try:
+            vectors = await asyncio.to_thread(rag_service.embed_texts, texts)
+            embeddings = dict(zip(texts, vectors))
+        except Exception as e:
+            logger.warning(f"Batch question embedding failed, embedding one by one: {e}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def answer(proposal_id: uuid.UUID, text: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None  # Not started; stays pending
+            try:
+                return await asyncio.wait_for(rag_service.answer_question(
+                    question=text,
+                    proposal=proposals[proposal_id],
+                    db=None,  # Index and content version were prepared above
+                    use_rag=use_rag,
+                    question_embedding=embeddings.get(text),
+                    content_version=content_versions.get(proposal_id)
+                ), remaining)
+            except asyncio.TimeoutError:
+                logger.warning(f"Batch answer for proposal {proposal_id} cut off by the time budget: {text}")
+                return None  # Stays pending
+
+    keys = list(work)
+    answers = await asyncio.gather(*(answer(proposal_id, text) for proposal_id, text in keys))
+
+    results: List[Dict[str, Any]] = []
+    saved_ids = set()
+    failed = 0
+    for key, result in zip(keys, answers):
+        if result is None:
+            for question_id, _ in work[key]:
+                skipped[str(question_id)] = "batch time budget exceeded"
+
+    for proposal_id in proposals:
+        proposal_answers = [
+            (key, result) for key, result in zip(keys, answers) if key[0] == proposal_id and result is not None
+        ]
+        to_save = []
+        if auto_save:
+            for key, result in proposal_answers:
+                if result.get('method') != 'error' and result.get('answer'):
+                    to_save += [(question_id, result['answer']) for question_id, _ in work[key]]
+        if to_save:
+            try:
+                saved_ids.update(await asyncio.to_thread(
+                    _save_answers, db, to_save, f"{answered_by} (batch)"
+                ))
+                await ainvalidate_proposal_cache(proposal_id)
+            except Exception as e:
+                logger.error(f"Saving batch answers for proposal {proposal_id} failed: {e}")
+
+        for key, result in proposal_answers:
+            error = result.get('method') == 'error'
+            failed += len(work[key]) if error else 0
+            for question_id, question_text in work[key]:
+                results.append({
+                    "question_id": str(question_id),
+                    "proposal_id": str(proposal_id),
+                    "job_number": job_numbers[proposal_id],
+                    "question": question_text,
+                    "ai_answer": result.get('answer'),
+                    "method": result.get('method'),
+                    "confidence": result.get('confidence'),
+                    "sources": result.get('sources', []),
+                    "saved": question_id in saved_ids,
+                    "error": result.get('reasoning') if error else None
+                })
+
+    # Distinct answers generated by the LLM (not structured, cached or failed)
+    llm_answers = sum(
+        1 for result in answers
+        if result is not None and result.get('method') in ('rag', 'simple') and 'cache' not in result
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Batch answered {len(results)} questions over {len(proposals)} proposals in {elapsed:.1f}s "
+        f"({llm_answers} LLM answers, {len(saved_ids)} saved)"
+    )
+    return {
+        "proposals": len(proposals),
+        "questions": len(results),
+        "answered": len(results) - failed,
+        "failed": failed,
+        "saved": len(saved_ids),
+        "skipped": [{"question_id": question_id, "reason": reason} for question_id, reason in skipped.items()],
+        "llm_answers": llm_answers,
+        "elapsed_seconds": round(elapsed, 2),
+        "results": results
+    }
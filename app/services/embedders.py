@@ -0,0 +1,136 @@
+# app/services/embedders.py
+"""
+Pluggable sentence-embedding backends for RAG
+
+Every backend exposes the SentenceTransformer-style encode(texts) -> float32
+array used by RAGService, the embedding sidecar and the answer cache:
+
+    sentence-transformers  PyTorch all-MiniLM-L6-v2 (reference)
+    onnx                   the same model exported to ONNX, run with ONNX Runtime
+    onnx-int8              the ONNX export with dynamically int8-quantized weights
+
+The ONNX backends only need onnxruntime + tokenizers at runtime (no PyTorch);
+export the model once with scripts/export_onnx_embedder.py. They reproduce the
+all-MiniLM-L6-v2 pipeline: mean pooling over the attention mask, then L2
+normalization. Recall against the reference backend is covered by
+tests/test_embedders.py.
+"""
+
+import os
+import logging
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx", "onnx-int8")
+
+ONNX_MODEL_FILES = {
+    "onnx": "model.onnx",
+    "onnx-int8": "model_int8.onnx",
+}
+
+
+def embedding_model_id(model_name: str, backend: str) -> str:
+    """
+    Identifier stored with persisted indexes
+
+    The fp32 ONNX export matches PyTorch to float precision, so both share
+    indexes; int8 vectors differ slightly and get their own.
+    """
+    return f"{model_name}:int8" if backend == "onnx-int8" else model_name
+
+
+def mean_pool_normalize(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Masked mean over tokens followed by L2 normalization (sentence-transformers pooling)"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class SentenceTransformerEmbedder:
+    """Reference PyTorch backend"""
+
+    backend = "sentence-transformers"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, batch_size: int = 32, **kwargs) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True),
+            dtype=np.float32
+        )
+
+
+class ONNXEmbedder:
+    """ONNX Runtime backend over an exported (optionally int8-quantized) model"""
+
+    def __init__(
+        self,
+        model_dir: str,
+        backend: str = "onnx",
+        max_length: int = 256,
+        threads: int = 0
+    ):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, ONNX_MODEL_FILES[backend])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} not found; export it with scripts/export_onnx_embedder.py"
+            )
+
+        self.backend = backend
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {graph_input.name for graph_input in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, batch_size: int = 32, **kwargs) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            feed = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            feed = {name: value for name, value in feed.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, feed)[0]
+            batches.append(mean_pool_normalize(token_embeddings, feed["attention_mask"]))
+        return np.concatenate(batches)
+
+
+def load_embedder(
+    backend: str,
+    model_name: str,
+    onnx_dir: Optional[str] = None,
+    threads: int = 0
+) -> Any:
+    """Instantiate an embedding backend; raises ImportError if its packages are missing"""
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(model_name)
+    if backend in ONNX_MODEL_FILES:
+        if not onnx_dir:
+            raise ValueError("EMBEDDING_ONNX_DIR is required for the ONNX backends")
+        return ONNXEmbedder(onnx_dir, backend=backend, threads=threads)
+    raise ValueError(f"Unknown embedding backend {backend!r} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
@@ -0,0 +1,100 @@
+# app/services/embedding_batcher.py
+"""
+Async micro-batching of question embeddings
+
+Concurrent embed() calls in a worker are gathered for up to
+EMBEDDING_BATCH_MAX_WAIT_MS, or until EMBEDDING_BATCH_MAX_SIZE texts are
+waiting, and encoded in one forward pass on a worker thread. Each caller gets
+its own row back. A burst of N questions thus costs one encode call instead of
+N sequential ones, and the event loop never blocks on the model.
+
+Identical texts in the same batch are encoded once.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Gather concurrent single-text encodes into batched encode calls"""
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.batches = 0
+        self.texts_encoded = 0
+        self.max_batch_seen = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embedding row for one text, encoded together with concurrent callers"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Bound lazily: the service singleton can outlive an event loop (tests, scripts)
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+        texts = list(unique)
+
+        try:
+            embeddings = await asyncio.to_thread(self.encode, texts)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.texts_encoded += len(texts)
+        self.max_batch_seen = max(self.max_batch_seen, len(texts))
+        for text, future in batch:
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(embeddings[unique[text]])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts_encoded": self.texts_encoded,
+            "max_batch_seen": self.max_batch_seen,
+            "mean_batch_size": round(self.texts_encoded / self.batches, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,332 @@
+# app/services/embedding_service.py
+"""
+Shared embedding sidecar for all gunicorn workers
+
+Run one per host next to the API:
+
+    python -m app.services.embedding_service --socket /tmp/pinnacle-embed.sock
+
+and set EMBEDDING_SERVICE_SOCKET to the same path. The sidecar loads the
+embedding model (EMBEDDING_BACKEND) once and serves encode requests from every worker
+over a Unix socket. Requests that arrive while a batch is encoding (or within
+EMBEDDING_BATCH_MAX_WAIT_MS of the first queued one) are merged into a single
+encode call of up to EMBEDDING_BATCH_MAX_SIZE texts.
+
+Wire format, both directions: 4-byte big-endian length + JSON header. The
+request header is {"texts": [...]} (or {"op": "stats"}); the response header
+is {"shape": [n, dim]} followed by n * dim float32 values, or {"error": "..."}.
+
+EmbeddingClient exposes the same encode() as SentenceTransformer, so
+RAGService uses it as a drop-in embedder. If the sidecar is unreachable it
+falls back to a model loaded in the worker itself, and tries the socket again
+after a cooldown.
+"""
+
+import os
+import json
+import time
+import socket
+import struct
+import asyncio
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.embedders import EMBEDDING_BACKENDS, load_embedder
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+
+
+def _frame(header: Dict[str, Any]) -> bytes:
+    payload = json.dumps(header).encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class EmbeddingServer:
+    """Unix-socket encode server with dynamic micro-batching"""
+
+    def __init__(
+        self,
+        socket_path: str,
+        model: Any,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.socket_path = socket_path
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional[asyncio.Task] = None
+        # One encode at a time; requests queue up behind it and form the next batch
+        self._encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        logger.info(f"Embedding service listening on {self.socket_path}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        self._encoder.shutdown(wait=False)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # A worker keeps its connection open and sends requests one at a time
+        try:
+            while True:
+                try:
+                    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                    request = json.loads(await reader.readexactly(length))
+                except asyncio.IncompleteReadError:
+                    break
+
+                if request.get("op") == "stats":
+                    writer.write(_frame(self.stats()))
+                else:
+                    writer.write(await self._encode_request(request.get("texts") or []))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Embedding connection closed: {e}")
+        finally:
+            writer.close()
+
+    async def _encode_request(self, texts: List[str]) -> bytes:
+        self.requests += 1
+        if not texts:
+            return _frame({"shape": [0, 0]})
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        try:
+            embeddings = await future
+        except Exception as e:
+            return _frame({"error": str(e)})
+
+        return _frame({"shape": list(embeddings.shape)}) + embeddings.tobytes()
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                remaining = deadline - loop.time()
+                try:
+                    pending = self._queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(
+                        self._queue.get(), remaining
+                    )
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                batch.append(pending)
+                size += len(pending[0])
+
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = await loop.run_in_executor(self._encoder, self._encode, texts)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                if not future.done():
+                    future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "socket": self.socket_path,
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0
+        }
+
+
+class EmbeddingClient:
+    """
+    SentenceTransformer-compatible encode() backed by the embedding sidecar
+
+    Each thread keeps its own connection. When the sidecar can't be reached,
+    encode() uses load_fallback() (loaded once, on first need) for the next
+    retry_seconds before trying the socket again; without a fallback the
+    error propagates.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: float = 10.0,
+        load_fallback: Optional[Callable[[], Any]] = None,
+        retry_seconds: float = 30.0
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.load_fallback = load_fallback
+        self.retry_seconds = retry_seconds
+        self._local = threading.local()
+        self._fallback: Any = None
+        self._fallback_lock = threading.Lock()
+        self._unavailable_until = 0.0
+        self.remote_calls = 0
+        self.fallback_calls = 0
+        self.failures = 0
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        if time.monotonic() >= self._unavailable_until:
+            try:
+                embeddings = self._request(list(texts))
+                self.remote_calls += 1
+                return embeddings
+            except (OSError, ValueError) as e:
+                self.failures += 1
+                self._close()
+                if self.load_fallback is None:
+                    raise
+                logger.warning(f"Embedding service unavailable ({e}); using local model for {self.retry_seconds:.0f}s")
+                self._unavailable_until = time.monotonic() + self.retry_seconds
+
+        self.fallback_calls += 1
+        return np.asarray(self._fallback_model().encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    def _fallback_model(self) -> Any:
+        with self._fallback_lock:
+            if self._fallback is None:
+                self._fallback = self.load_fallback()
+            return self._fallback
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+            self._local.sock = None
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        header, body = self._roundtrip({"texts": texts})
+        if "error" in header:
+            raise ValueError(f"Embedding service error: {header['error']}")
+        rows, dim = header["shape"]
+        return np.frombuffer(body, dtype=np.float32).reshape(rows, dim)
+
+    def _roundtrip(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        sock = self._connection()
+        sock.sendall(_frame(request))
+        (length,) = _LENGTH.unpack(self._recv_exactly(sock, _LENGTH.size))
+        header = json.loads(self._recv_exactly(sock, length))
+        shape = header.get("shape")
+        body = self._recv_exactly(sock, shape[0] * shape[1] * 4) if shape else b""
+        return header, body
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = sock.recv(size - len(buffer))
+            if not chunk:
+                raise ConnectionError("Embedding service closed the connection")
+            buffer.extend(chunk)
+        return bytes(buffer)
+
+    def server_stats(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self._roundtrip({"op": "stats"})[0]
+        except (OSError, ValueError):
+            self._close()
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "socket": self.socket_path,
+            "remote_calls": self.remote_calls,
+            "fallback_calls": self.fallback_calls,
+            "failures": self.failures,
+            "using_fallback": time.monotonic() < self._unavailable_until,
+            "server": self.server_stats()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared embedding service for the API workers")
+    parser.add_argument("--socket", default=settings.EMBEDDING_SERVICE_SOCKET or "/tmp/pinnacle-embed.sock")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backend", default=settings.EMBEDDING_BACKEND, choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--max-batch-size", type=int, default=settings.EMBEDDING_BATCH_MAX_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.EMBEDDING_BATCH_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    model = load_embedder(
+        args.backend, args.model, onnx_dir=settings.EMBEDDING_ONNX_DIR, threads=settings.EMBEDDING_ONNX_THREADS
+    )
+
+    server = EmbeddingServer(args.socket, model, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
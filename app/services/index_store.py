@@ -0,0 +1,200 @@
+# app/services/index_store.py
+"""
+On-disk store of per-proposal FAISS indexes shared by all workers
+
+Layout under RAG_INDEX_DIR:
+
+    {proposal_id}/{content_hash}.faiss        serialized FAISS index
+    {proposal_id}/{content_hash}.chunks.json  chunk text + metadata, keyed by chunk_key
+
+The content hash covers the embedding model and every chunk's text, so a
+proposal edit produces a new file pair instead of overwriting one another
+worker may be reading. Files are written to a temp name and renamed into
+place, and older hashes for the proposal are pruned after a successful save.
+Loading reads the whole index into process memory: FAISS only memory-maps
+the inverted lists of IVF indexes, and these are flat (IndexIDMap2 over
+IndexFlat), so every worker holds its own copy of a loaded index.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def chunks_content_hash(chunks: List[Dict[str, Any]], model_name: str) -> str:
+    """Stable hash of the chunks an index is built from"""
+    digest = hashlib.sha256(model_name.encode())
+    for chunk in chunks:
+        digest.update(b"\0")
+        digest.update(chunk['content'].encode())
+    return digest.hexdigest()[:32]
+
+
+def atomic_write(path: Path, write):
+    """Write through a temp file in the same directory, then rename into place"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class FAISSIndexStore:
+    """Persist and load FAISS indexes keyed by proposal id and content hash"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.loads = 0
+        self.saves = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return faiss is not None
+
+    def _paths(self, proposal_id: str, content_hash: str) -> Tuple[Path, Path]:
+        base = self.directory / proposal_id
+        return base / f"{content_hash}.faiss", base / f"{content_hash}.chunks.json"
+
+    def load(self, proposal_id: str, content_hash: str) -> Optional[Tuple[Any, List[Dict[str, Any]]]]:
+        """(index, chunks) if this exact content was indexed before, else None"""
+        if not self.available:
+            return None
+
+        index_path, chunks_path = self._paths(proposal_id, content_hash)
+        if not index_path.exists() or not chunks_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            index = faiss.read_index(str(index_path))
+            with open(chunks_path) as f:
+                chunks = json.load(f)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Failed to load index for proposal {proposal_id}: {e}")
+            return None
+
+        if index.ntotal != len(chunks):
+            self.errors += 1
+            logger.warning(f"Index/chunk mismatch for proposal {proposal_id}; ignoring stored index")
+            return None
+
+        self.loads += 1
+        return index, chunks
+
+    def load_latest(self, proposal_id: str) -> Optional[Tuple[str, Any, List[Dict[str, Any]]]]:
+        """(content_hash, index, chunks) of the newest stored index for a proposal, if any"""
+        base = self.directory / proposal_id
+        if not self.available or not base.is_dir():
+            self.misses += 1
+            return None
+
+        candidates = sorted(base.glob("*.faiss"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for index_path in candidates:
+            content_hash = index_path.name[:-len(".faiss")]
+            stored = self.load(proposal_id, content_hash)
+            if stored and all('chunk_key' in chunk for chunk in stored[1]):
+                return (content_hash, *stored)
+        return None
+
+    def latest_hash(self, proposal_id: str) -> Optional[str]:
+        """Content hash of the newest stored index for a proposal, without loading it"""
+        base = self.directory / proposal_id
+        if not base.is_dir():
+            return None
+        candidates = sorted(base.glob("*.faiss"), key=lambda path: path.stat().st_mtime, reverse=True)
+        return candidates[0].name[:-len(".faiss")] if candidates else None
+
+    def load_chunks(self, proposal_id: str, content_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """Just the chunks of a stored index (no FAISS read)"""
+        _, chunks_path = self._paths(proposal_id, content_hash)
+        try:
+            with open(chunks_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, proposal_id: str, content_hash: str, index: Any, chunks: List[Dict[str, Any]]):
+        """Write an index and its chunks atomically, then drop older versions"""
+        if not self.available:
+            return
+
+        index_path, chunks_path = self._paths(proposal_id, content_hash)
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Chunks first: a reader only trusts the pair once the .faiss file exists
+            atomic_write(chunks_path, lambda tmp: Path(tmp).write_text(json.dumps(chunks, default=str)))
+            atomic_write(index_path, lambda tmp: faiss.write_index(index, tmp))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Failed to save index for proposal {proposal_id}: {e}")
+            return
+
+        self.saves += 1
+        self._prune(proposal_id, keep=content_hash)
+
+    def _prune(self, proposal_id: str, keep: str):
+        for path in (self.directory / proposal_id).iterdir():
+            if not path.name.startswith(keep) and not path.name.startswith(".tmp-"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Another worker got there first
+
+    def delete(self, proposal_id: Optional[str] = None):
+        """Remove one proposal's stored indexes, or all of them"""
+        targets = [self.directory / proposal_id] if proposal_id else (
+            list(self.directory.iterdir()) if self.directory.exists() else []
+        )
+        for target in targets:
+            if target.is_dir():
+                for path in target.iterdir():
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                try:
+                    target.rmdir()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "loads": self.loads,
+            "saves": self.saves,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+# Global index store instance
+_index_store: Optional[FAISSIndexStore] = None
+
+
+def get_index_store() -> Optional[FAISSIndexStore]:
+    """Get or create global index store (None when RAG_INDEX_DIR is unset)"""
+    global _index_store
+    if _index_store is None and settings.RAG_INDEX_DIR:
+        _index_store = FAISSIndexStore(settings.RAG_INDEX_DIR)
+    return _index_store
@@ -0,0 +1,126 @@
+# app/services/lexical_index.py
+"""
+BM25 keyword index over a proposal's chunks, and reciprocal-rank fusion
+
+Vector search finds chunks that mean the same thing as the question but is
+weak on exact tokens: item numbers, job numbers and model names ("Shure
+SM58", "SW318", "302946"). BM25 over the same chunks catches those, and
+reciprocal-rank fusion (RRF) merges the two rankings without having to
+calibrate L2 distances against BM25 scores:
+
+    fused(chunk) = sum over rankings of 1 / (rrf_k + rank)
+
+Postings are stored as flat NumPy arrays (CSR layout) with the BM25 weight
+of every (term, chunk) pair precomputed, so a query is a handful of
+vectorized adds.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its
+many much of on or our the their there this to us was we what when where
+which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased terms; "SM-58" also yields "sm58" and plural "s" is dropped
+
+    Compound tokens (model numbers, sizes, dates) keep their parts and the
+    joined form, so "SM58" in a question matches "SM-58" in a line item.
+    """
+    terms = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        parts = re.split(r"[-./]", match)
+        if len(parts) > 1:
+            terms.append("".join(parts))
+        for part in parts:
+            if part in STOPWORDS:
+                continue
+            if len(part) > 3 and part.endswith("s") and not part.endswith("ss"):
+                part = part[:-1]
+            terms.append(part)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over (id, text) documents"""
+
+    def __init__(self, documents: Iterable[Tuple[int, str]], k1: float = 1.2, b: float = 0.75):
+        ids: List[int] = []
+        counts: List[Counter] = []
+        for doc_id, text in documents:
+            ids.append(doc_id)
+            counts.append(Counter(tokenize(text)))
+
+        self.ids = np.array(ids, dtype=np.int64)
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avgdl = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc, term_counts in enumerate(counts):
+            for term, tf in term_counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        self.vocabulary: Dict[str, int] = {}
+        pointers = [0]
+        docs: List[int] = []
+        weights: List[float] = []
+        n = len(ids)
+        for term, entries in postings.items():
+            self.vocabulary[term] = len(self.vocabulary)
+            idf = np.log(1.0 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc, tf in entries:
+                norm = tf + k1 * (1.0 - b + b * lengths[doc] / avgdl)
+                docs.append(doc)
+                weights.append(idf * tf * (k1 + 1.0) / norm)
+            pointers.append(len(docs))
+
+        self.pointers = np.array(pointers, dtype=np.int32)
+        self.docs = np.array(docs, dtype=np.int32)
+        self.weights = np.array(weights, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """(id, score) of the best matching documents; documents sharing no term are left out"""
+        if not len(self.ids) or top_k <= 0:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            position = self.vocabulary.get(term)
+            if position is None:
+                continue
+            start, end = self.pointers[position], self.pointers[position + 1]
+            scores[self.docs[start:end]] += self.weights[start:end]
+
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        k = min(top_k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[doc]), float(scores[doc])) for doc in top]
+
+    def nbytes(self) -> int:
+        """Approximate resident bytes (arrays plus the vocabulary dict)"""
+        arrays = self.ids.nbytes + self.pointers.nbytes + self.docs.nbytes + self.weights.nbytes
+        return arrays + len(self.vocabulary) * 90
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], rrf_k: int = 60) -> List[Tuple[int, float]]:
+    """Merge ranked id lists (best first) into one (id, fused score) ranking"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda entry: entry[1], reverse=True)
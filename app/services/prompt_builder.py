@@ -0,0 +1,232 @@
+# app/services/prompt_builder.py
+"""
+Token-budgeted prompt assembly for RAG answers
+
+Retrieved chunks overlap: extract_proposal_content emits a chunk per line
+item and a chunk per section that repeats all of its items, so a big
+section plus a few of its items can dominate the prompt. PromptBuilder
+packs context greedily in relevance order under RAG_CONTEXT_MAX_TOKENS:
+
+    - a chunk whose text is already inside a packed chunk is skipped
+    - a chunk containing packed chunks (a section after its items) replaces
+      them if the difference fits, otherwise the smaller items stay
+    - a chunk that doesn't fit is skipped and later, smaller ones are tried
+    - if even the best chunk doesn't fit, it is truncated to the budget
+
+Tokens are counted with tiktoken's cl100k_base. That is close to, not the
+same as, Claude's tokenizer, so the budget is approximate; the real input
+tokens reported by the API are recorded per answer (stats()) to keep an eye
+on the gap. Without tiktoken or its encoding file, characters / 4 is used.
+"""
+
+import threading
+import logging
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+TOKEN_ENCODING = "cl100k_base"
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+RAG_PROMPT = """You are an expert assistant helping answer questions about a proposal/quote.
+
+Question: {question}
+
+Relevant context from the proposal:
+
+{context}
+
+Please provide a clear, accurate, and helpful answer based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide the best answer you can with what's available.
+
+Keep your answer concise but complete."""
+
+BASIC_PROMPT = """You are an expert assistant helping answer questions about a proposal/quote.
+
+Basic proposal information:
+{basic_info}
+
+Question: {question}
+
+Please provide a brief, helpful answer. If you need more specific information from the proposal to answer accurately, mention what details would be helpful."""
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    """tiktoken encoding, loaded once; None when unavailable (offline, not installed)"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    if tiktoken is None:
+                        raise ImportError("tiktoken is not installed")
+                    _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+                except Exception as e:
+                    _encoding_failed = True
+                    logger.warning(f"tiktoken {TOKEN_ENCODING} unavailable ({e}); estimating tokens as characters / 4")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# Chunk texts repeat across questions about a proposal, so their counts are memoized
+chunk_tokens = lru_cache(maxsize=8192)(count_tokens)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Prefix of text of at most max_tokens tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def format_chunk(chunk: Dict[str, Any]) -> str:
+    """A retrieved chunk as it appears in the answer prompt"""
+    return f"[{chunk['section']} - {chunk['type']}]\n{chunk['content']}"
+
+
+def format_context_chunks(chunks: List[Dict[str, Any]]) -> str:
+    """Retrieved chunks as they appear in the answer prompt"""
+    return CHUNK_SEPARATOR.join(format_chunk(chunk) for chunk in chunks)
+
+
+def pack_chunks(chunks: List[Dict[str, Any]], max_tokens: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Greedily pack chunks (best first) into max_tokens of context
+
+    Returns the packed chunks in relevance order and their token count
+    (separators included).
+    """
+    separator = count_tokens(CHUNK_SEPARATOR)
+    packed: List[Tuple[int, Dict[str, Any], int]] = []  # (rank, chunk, tokens)
+    used = 0
+
+    for rank, chunk in enumerate(chunks):
+        content = chunk['content']
+        if any(content in other['content'] for _, other, _ in packed):
+            continue
+        tokens = chunk_tokens(format_chunk(chunk))
+        contained = [entry for entry in packed if entry[1]['content'] in content]
+        freed = sum(entry[2] + separator for entry in contained)
+        cost = tokens + (separator if packed else 0)
+        if used - freed + cost <= max_tokens:
+            if contained:
+                # Takes the place of the best item it replaces
+                rank = min(entry[0] for entry in contained)
+                packed = [entry for entry in packed if not any(entry is other for other in contained)]
+            packed.append((rank, chunk, tokens))
+            used = used - freed + cost
+        elif not packed:
+            # Even the best chunk is over budget: keep what fits of it
+            header = chunk_tokens(format_chunk({**chunk, 'content': ''}))
+            truncated = {**chunk, 'content': truncate_to_tokens(content, max_tokens - header), 'truncated': True}
+            if truncated['content']:
+                tokens = count_tokens(format_chunk(truncated))
+                packed.append((rank, truncated, tokens))
+                used = tokens
+
+    packed.sort(key=lambda entry: entry[0])
+    return [chunk for _, chunk, _ in packed], used
+
+
+class PromptBuilder:
+    """Builds answer prompts under a context token budget and records token usage"""
+
+    def __init__(self, max_context_tokens: int = 1500):
+        self.max_context_tokens = max_context_tokens
+        self.prompts = 0
+        self.chunks_retrieved = 0
+        self.chunks_packed = 0
+        self.truncated = 0
+        self.context_tokens = 0
+        self.answers = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.estimated_input_tokens = 0
+        self.max_input_tokens = 0
+        self._lock = threading.Lock()
+
+    def rag_prompt(self, question: str, chunks: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]], int]:
+        """(prompt, packed chunks, estimated prompt tokens) for a RAG answer"""
+        packed, context_tokens = pack_chunks(chunks, self.max_context_tokens)
+        prompt = RAG_PROMPT.format(question=question, context=format_context_chunks(packed))
+        with self._lock:
+            self.prompts += 1
+            self.chunks_retrieved += len(chunks)
+            self.chunks_packed += len(packed)
+            self.truncated += sum(1 for chunk in packed if chunk.get('truncated'))
+            self.context_tokens += context_tokens
+        return prompt, packed, count_tokens(prompt)
+
+    def basic_prompt(self, question: str, proposal: Any) -> Tuple[str, int]:
+        """(prompt, estimated prompt tokens) for an answer from the proposal's headline fields"""
+        basic_info = f"""
+Proposal for {proposal.client_name}
+Job Number: {proposal.job_number}
+Event Date: {proposal.start_date} to {proposal.end_date}
+Location: {proposal.event_location}
+Total Cost: ${proposal.total_cost}
+        """.strip()
+        prompt = BASIC_PROMPT.format(basic_info=basic_info, question=question)
+        with self._lock:
+            self.prompts += 1
+        return prompt, count_tokens(prompt)
+
+    def record_usage(self, input_tokens: int, output_tokens: int, estimated_input_tokens: Optional[int] = None):
+        """Record the API-reported token usage of one answer"""
+        with self._lock:
+            self.answers += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.estimated_input_tokens += estimated_input_tokens or 0
+            self.max_input_tokens = max(self.max_input_tokens, input_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_context_tokens": self.max_context_tokens,
+                "token_counter": TOKEN_ENCODING if _get_encoding() is not None else "characters / 4",
+                "prompts": self.prompts,
+                "mean_chunks_retrieved": round(self.chunks_retrieved / self.prompts, 2) if self.prompts else 0.0,
+                "mean_chunks_packed": round(self.chunks_packed / self.prompts, 2) if self.prompts else 0.0,
+                "truncated_chunks": self.truncated,
+                "mean_context_tokens": round(self.context_tokens / self.prompts, 1) if self.prompts else 0.0,
+                "answers": self.answers,
+                "mean_input_tokens": round(self.input_tokens / self.answers, 1) if self.answers else 0.0,
+                "max_input_tokens": self.max_input_tokens,
+                "mean_output_tokens": round(self.output_tokens / self.answers, 1) if self.answers else 0.0,
+                "estimate_ratio": round(self.estimated_input_tokens / self.input_tokens, 3) if self.input_tokens else None
+            }
+
+
+# Global prompt builder
+_prompt_builder: Optional[PromptBuilder] = None
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Get or create the global prompt builder"""
+    global _prompt_builder
+    if _prompt_builder is None:
+        _prompt_builder = PromptBuilder(max_context_tokens=settings.RAG_CONTEXT_MAX_TOKENS)
+    return _prompt_builder
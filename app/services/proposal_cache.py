@@ -0,0 +1,188 @@
+# app/services/proposal_cache.py
+"""
+Versioned cache for serialized proposal detail payloads
+
+Entries are keyed by proposal id and carry the version stamp they were built
+from (see proposal_service.get_proposal_stamp). A lookup only hits when the
+stored stamp matches the current one, so edits that bump the stamp are picked
+up by every worker without explicit invalidation.
+
+Two tiers:
+1. In-process LRU (always on)
+2. Redis, shared by all workers (PROPOSAL_CACHE_USE_REDIS=true, uses REDIS_URL)
+
+The Redis client is synchronous; async callers use aget/aset/ainvalidate,
+which run Redis round-trips in a worker thread instead of on the event loop.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from app.config import settings
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "proposal-payload:"
+
+
+class ProposalPayloadCache:
+    """Two-tier (local LRU + optional Redis) cache of proposal detail payloads"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[int] = 300,
+        redis_url: Optional[str] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(
+                    redis_url,
+                    socket_timeout=0.25,
+                    socket_connect_timeout=0.25
+                )
+            except Exception as e:
+                logger.warning(f"Proposal cache Redis tier disabled: {e}")
+                self.redis = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    def get(self, proposal_id: str, stamp: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload if it was built from the given version stamp"""
+        entry = self.local.get(proposal_id)
+        if entry is not None:
+            if entry[0] == stamp:
+                self.local_hits += 1
+                return entry[1]
+            self.stale += 1
+            self.local.pop(proposal_id)
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(REDIS_KEY_PREFIX + proposal_id)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Proposal cache Redis get failed: {e}")
+                raw = None
+
+            if raw:
+                cached = json.loads(raw)
+                if cached.get("stamp") == stamp:
+                    self.redis_hits += 1
+                    self.local.set(proposal_id, (stamp, cached["payload"]))
+                    return cached["payload"]
+                self.stale += 1
+
+        self.misses += 1
+        return None
+
+    def set(self, proposal_id: str, stamp: str, payload: Dict[str, Any]):
+        """Store a payload under its version stamp in both tiers"""
+        self.local.set(proposal_id, (stamp, payload))
+
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    REDIS_KEY_PREFIX + proposal_id,
+                    json.dumps({"stamp": stamp, "payload": payload}),
+                    ex=self.ttl_seconds
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Proposal cache Redis set failed: {e}")
+
+    def invalidate(self, proposal_id: Optional[str] = None):
+        """Drop one proposal's payload, or everything when proposal_id is None"""
+        self.invalidations += 1
+        if proposal_id:
+            self.local.pop(proposal_id)
+        else:
+            self.local.clear()
+
+        if self.redis is not None:
+            try:
+                if proposal_id:
+                    self.redis.delete(REDIS_KEY_PREFIX + proposal_id)
+                else:
+                    keys = list(self.redis.scan_iter(match=REDIS_KEY_PREFIX + "*"))
+                    if keys:
+                        self.redis.delete(*keys)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Proposal cache Redis invalidate failed: {e}")
+
+    async def aget(self, proposal_id: str, stamp: str) -> Optional[Dict[str, Any]]:
+        """get() for async callers"""
+        if self.redis is None:
+            return self.get(proposal_id, stamp)
+        return await asyncio.to_thread(self.get, proposal_id, stamp)
+
+    async def aset(self, proposal_id: str, stamp: str, payload: Dict[str, Any]):
+        """set() for async callers"""
+        if self.redis is None:
+            return self.set(proposal_id, stamp, payload)
+        await asyncio.to_thread(self.set, proposal_id, stamp, payload)
+
+    async def ainvalidate(self, proposal_id: Optional[str] = None):
+        """invalidate() for async callers"""
+        if self.redis is None:
+            return self.invalidate(proposal_id)
+        await asyncio.to_thread(self.invalidate, proposal_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers"""
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": settings.PROPOSAL_CACHE_ENABLED,
+            "redis_enabled": self.redis is not None,
+            "entries": len(self.local),
+            "hits": hits,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+            "local_evictions": self.local.evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global proposal cache instance
+_proposal_cache: Optional[ProposalPayloadCache] = None
+
+
+def get_proposal_cache() -> ProposalPayloadCache:
+    """Get or create global proposal payload cache"""
+    global _proposal_cache
+    if _proposal_cache is None:
+        _proposal_cache = ProposalPayloadCache(
+            max_entries=settings.PROPOSAL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PROPOSAL_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL if settings.PROPOSAL_CACHE_USE_REDIS else None
+        )
+    return _proposal_cache
+
+
+def invalidate_proposal_cache(proposal_id: Optional[str] = None):
+    """Invalidate cached payloads after a write to a proposal or its children"""
+    get_proposal_cache().invalidate(str(proposal_id) if proposal_id else None)
+
+
+async def ainvalidate_proposal_cache(proposal_id: Optional[str] = None):
+    """invalidate_proposal_cache() for async callers; keeps Redis off the event loop"""
+    await get_proposal_cache().ainvalidate(str(proposal_id) if proposal_id else None)
@@ -0,0 +1,348 @@
+# app/services/proposal_service.py
+"""Proposal graph loading, caching and serialization for the proposal detail endpoints"""
+
+from sqlalchemy import select, func, desc
+from sqlalchemy.orm import Session, selectinload
+from app.models.proposals import (
+    Proposal, ProposalSection, ProposalLineItem,
+    ProposalTimeline, ProposalLabor, ProposalQuestion
+)
+from app.services.proposal_cache import get_proposal_cache
+from app.database import run_db
+from app.config import settings
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def proposal_graph_options():
+    """
+    Loader options that fetch the full proposal tree in a constant number of queries
+
+    One SELECT per table (proposal, sections, line items, timeline, labor, questions)
+    regardless of how many sections the proposal has.
+    """
+    return (
+        selectinload(Proposal.sections).selectinload(ProposalSection.items),
+        selectinload(Proposal.timeline),
+        selectinload(Proposal.labor),
+        selectinload(Proposal.questions),
+    )
+
+
+def proposal_identifier_filter(identifier: str):
+    """Filter clause matching a proposal by UUID or job_number"""
+    try:
+        return Proposal.id == uuid.UUID(identifier)
+    except ValueError:
+        return Proposal.job_number == identifier
+
+
+def load_proposal_graph(db: Session, identifier: str) -> Optional[Proposal]:
+    """Load a proposal (by UUID or job_number) with its sections, items, timeline, labor and questions"""
+    return db.query(Proposal).options(
+        *proposal_graph_options()
+    ).filter(
+        proposal_identifier_filter(identifier)
+    ).first()
+
+
+def list_proposals(
+    db: Session,
+    skip: int = 0,
+    limit: int = 10,
+    status: Optional[str] = None
+) -> Dict[str, Any]:
+    """Paginated proposal summaries, newest first"""
+    query = db.query(Proposal)
+
+    # Filter by status if provided
+    if status:
+        query = query.filter(Proposal.status == status)
+
+    # Get total count before pagination
+    total_count = query.count()
+
+    proposals = query.order_by(
+        desc(Proposal.created_at)
+    ).offset(skip).limit(limit).all()
+
+    return {
+        "proposals": [
+            {
+                "id": str(proposal.id),
+                "job_number": proposal.job_number,
+                "client_name": proposal.client_name,
+                "client_email": proposal.client_email,
+                "client_company": proposal.client_company,
+                "venue": proposal.venue_name,
+                "event_location": proposal.event_location,
+                "start_date": proposal.start_date.isoformat() if proposal.start_date else None,
+                "end_date": proposal.end_date.isoformat() if proposal.end_date else None,
+                "product_subtotal": float(proposal.product_subtotal) if proposal.product_subtotal else 0,
+                "labor_total": float(proposal.labor_total) if proposal.labor_total else 0,
+                "total_cost": float(proposal.total_cost) if proposal.total_cost else 0,
+                "status": proposal.status,
+                "prepared_by": proposal.prepared_by,
+                "version": proposal.version,
+                "created_at": proposal.created_at.isoformat() if proposal.created_at else None,
+                "updated_at": proposal.updated_at.isoformat() if proposal.updated_at else None
+            }
+            for proposal in proposals
+        ],
+        "total_count": total_count
+    }
+
+
+CHILD_MODELS = (ProposalSection, ProposalLineItem, ProposalTimeline, ProposalLabor)
+
+
+def child_version_columns(*models) -> list:
+    """
+    Row count and latest write of each child table, as correlated subqueries
+
+    Child rows can change without touching the proposal row. The count catches
+    deletes, which leave no newer timestamp behind; tables without updated_at
+    fall back to created_at.
+    """
+    columns = []
+    for model in models:
+        written_at = getattr(model, "updated_at", None) or model.created_at
+        columns.append(select(func.count(model.id)).where(
+            model.proposal_id == Proposal.id
+        ).correlate(Proposal).scalar_subquery())
+        columns.append(select(func.max(written_at)).where(
+            model.proposal_id == Proposal.id
+        ).correlate(Proposal).scalar_subquery())
+    return columns
+
+
+def _stamp(values) -> str:
+    return "|".join(
+        value.isoformat() if isinstance(value, datetime) else str(value or "")
+        for value in values
+    )
+
+
+def get_proposal_stamp(db: Session, identifier: str) -> Optional[Tuple[uuid.UUID, str]]:
+    """
+    Resolve a proposal (by UUID or job_number) to (id, version stamp) in one query
+
+    The stamp combines Proposal.updated_at/version with the row count and
+    latest write of every child table (sections, items, timeline, labor,
+    questions), since child writes don't necessarily touch the proposal row.
+    Question updated_at covers status/priority edits; answered_at also covers
+    rows written before that column existed.
+    """
+    last_answered = select(func.max(ProposalQuestion.answered_at)).where(
+        ProposalQuestion.proposal_id == Proposal.id
+    ).correlate(Proposal).scalar_subquery()
+
+    row = db.query(
+        Proposal.id,
+        Proposal.updated_at,
+        Proposal.version,
+        *child_version_columns(*CHILD_MODELS, ProposalQuestion),
+        last_answered
+    ).filter(
+        proposal_identifier_filter(identifier)
+    ).first()
+
+    if not row:
+        return None
+    return row[0], _stamp(row[1:])
+
+
+def get_proposal_content_version(db: Session, proposal_id: uuid.UUID) -> str:
+    """
+    Version of a proposal's answerable content, in one query
+
+    Combines Proposal.updated_at/version with the row count and latest write
+    of sections, line items, timeline and labor (counts catch deletes). Unlike
+    get_proposal_stamp it ignores questions, so asking or answering questions
+    doesn't invalidate derived data such as cached answers.
+    """
+    row = db.query(
+        Proposal.updated_at,
+        Proposal.version,
+        *child_version_columns(*CHILD_MODELS)
+    ).filter(Proposal.id == proposal_id).first()
+
+    return _stamp(row) if row else ""
+
+
+def get_proposal_detail(db: Session, identifier: str) -> Optional[Dict[str, Any]]:
+    """Proposal detail payload, served from the versioned payload cache when possible"""
+    if not settings.PROPOSAL_CACHE_ENABLED:
+        proposal = load_proposal_graph(db, identifier)
+        return serialize_proposal_detail(proposal) if proposal else None
+
+    resolved = get_proposal_stamp(db, identifier)
+    if not resolved:
+        return None
+
+    proposal_id, stamp = resolved
+    cache = get_proposal_cache()
+    payload = cache.get(str(proposal_id), stamp)
+    if payload is not None:
+        return payload
+
+    proposal = load_proposal_graph(db, str(proposal_id))
+    if not proposal:
+        return None
+
+    payload = serialize_proposal_detail(proposal)
+    cache.set(str(proposal_id), stamp, payload)
+    return payload
+
+
+def _load_proposal_payload(db: Session, identifier: str) -> Optional[Dict[str, Any]]:
+    proposal = load_proposal_graph(db, identifier)
+    return serialize_proposal_detail(proposal) if proposal else None
+
+
+async def get_proposal_detail_async(db, identifier: str) -> Optional[Dict[str, Any]]:
+    """
+    get_proposal_detail for async routes (sync or async session)
+
+    Queries go through run_db and Redis round-trips through the cache's
+    async methods, so neither runs on the event loop.
+    """
+    if not settings.PROPOSAL_CACHE_ENABLED:
+        return await run_db(db, _load_proposal_payload, identifier)
+
+    resolved = await run_db(db, get_proposal_stamp, identifier)
+    if not resolved:
+        return None
+
+    proposal_id, stamp = resolved
+    cache = get_proposal_cache()
+    payload = await cache.aget(str(proposal_id), stamp)
+    if payload is not None:
+        return payload
+
+    payload = await run_db(db, _load_proposal_payload, str(proposal_id))
+    if payload is not None:
+        await cache.aset(str(proposal_id), stamp, payload)
+    return payload
+
+
+def serialize_proposal_detail(proposal: Proposal) -> Dict[str, Any]:
+    """Build the proposal detail payload from an eagerly loaded proposal graph"""
+    sections_data = [
+        {
+            "id": str(section.id),
+            "title": section.section_name,
+            "section_type": section.section_type,
+            "isExpanded": section.is_expanded,
+            "total": float(section.section_total) if section.section_total else 0,
+            "notes": section.notes,
+            "items": [
+                {
+                    "id": str(item.id),
+                    "item_number": item.item_number,
+                    "quantity": item.quantity,
+                    "description": item.description,
+                    "duration": item.duration,
+                    "price": float(item.unit_price) if item.unit_price else 0,
+                    "discount": float(item.discount) if item.discount else 0,
+                    "subtotal": float(item.subtotal) if item.subtotal else 0,
+                    "category": item.category,
+                    "item_type": item.item_type,
+                    "notes": item.notes
+                }
+                for item in section.items
+            ]
+        }
+        for section in proposal.sections
+    ]
+
+    timeline_data = [
+        {
+            "id": str(event.id),
+            "date": event.event_date.isoformat() if event.event_date else None,
+            "startTime": event.start_time.isoformat() if event.start_time else None,
+            "endTime": event.end_time.isoformat() if event.end_time else None,
+            "title": event.title,
+            "location": event.location,
+            "setup": event.setup_tasks or [],
+            "equipment": event.equipment_needed or [],
+            "cost": float(event.cost) if event.cost else 0,
+            "notes": event.notes
+        }
+        for event in proposal.timeline
+    ]
+
+    labor_data = [
+        {
+            "id": str(task.id),
+            "task_name": task.task_name,
+            "quantity": task.quantity,
+            "date": task.labor_date.isoformat() if task.labor_date else None,
+            "start_time": task.start_time.isoformat() if task.start_time else None,
+            "end_time": task.end_time.isoformat() if task.end_time else None,
+            "regular_hours": float(task.regular_hours) if task.regular_hours else 0,
+            "overtime_hours": float(task.overtime_hours) if task.overtime_hours else 0,
+            "double_time_hours": float(task.double_time_hours) if task.double_time_hours else 0,
+            "hourly_rate": float(task.hourly_rate) if task.hourly_rate else 0,
+            "subtotal": float(task.subtotal) if task.subtotal else 0,
+            "notes": task.notes
+        }
+        for task in proposal.labor
+    ]
+
+    questions_data = [
+        {
+            "id": str(q.id),
+            "question_text": q.question_text,
+            "status": q.status,
+            "priority": q.priority,
+            "asked_by_name": q.asked_by_name,
+            "asked_by_email": q.asked_by_email,
+            "asked_at": q.asked_at.isoformat() if q.asked_at else None,
+            "answer_text": q.answer_text,
+            "answered_by": q.answered_by,
+            "answered_at": q.answered_at.isoformat() if q.answered_at else None
+        }
+        for q in proposal.questions
+    ]
+
+    return {
+        "eventDetails": {
+            "id": str(proposal.id),
+            "jobNumber": proposal.job_number,
+            "clientName": proposal.client_name,
+            "clientEmail": proposal.client_email,
+            "clientCompany": proposal.client_company,
+            "clientContact": proposal.client_contact,
+            "clientPhone": proposal.client_phone,
+            "venue": proposal.venue_name,
+            "eventLocation": proposal.event_location,
+            "startDate": proposal.start_date.isoformat() if proposal.start_date else None,
+            "endDate": proposal.end_date.isoformat() if proposal.end_date else None,
+            "preparedBy": proposal.prepared_by,
+            "salesperson": proposal.salesperson,
+            "email": proposal.salesperson_email,
+            "status": proposal.status,
+            "version": proposal.version,
+            "lastModified": proposal.updated_at.isoformat() if proposal.updated_at else None,
+            "notes": proposal.notes,
+            "internalNotes": proposal.internal_notes
+        },
+        "pricing": {
+            "productSubtotal": float(proposal.product_subtotal) if proposal.product_subtotal else 0,
+            "productDiscount": float(proposal.product_discount) if proposal.product_discount else 0,
+            "productTotal": float(proposal.product_total) if proposal.product_total else 0,
+            "laborTotal": float(proposal.labor_total) if proposal.labor_total else 0,
+            "serviceCharge": float(proposal.service_charge) if proposal.service_charge else 0,
+            "taxAmount": float(proposal.tax_amount) if proposal.tax_amount else 0,
+            "totalCost": float(proposal.total_cost) if proposal.total_cost else 0
+        },
+        "sections": sections_data,
+        "timeline": timeline_data,
+        "labor": labor_data,
+        "questions": questions_data
+    }
@@ -9,59 +9,227 @@ This service provides intelligent question answering using:
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import List, Dict, Any, AsyncIterator, Deque, Optional, Set, Tuple
 from datetime import datetime
 import numpy as np
 
+# Imported separately: workers using the embedding sidecar or an ONNX
+# backend don't need sentence-transformers to search FAISS indexes
+# (embedding backends are loaded by app.services.embedders)
 try:
     import anthropic
-    from sentence_transformers import SentenceTransformer
-    import faiss
 except ImportError as e:
-    logging.warning(f"RAG dependencies not installed: {e}. Install with: pip install anthropic sentence-transformers faiss-cpu")
+    logging.warning(f"RAG dependency not installed: {e}. Install with: pip install anthropic")
     anthropic = None
-    SentenceTransformer = None
+
+try:
+    import faiss
+except ImportError as e:
+    logging.warning(f"RAG dependency not installed: {e}. Install with: pip install faiss-cpu")
     faiss = None
 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from app.models.proposals import Proposal, ProposalSection, ProposalLineItem, ProposalTimeline, ProposalLabor
+from app.core.cache import LRUCache
+from app.services.answer_cache import get_answer_cache
+from app.services.index_store import get_index_store, chunks_content_hash
+from app.services.vector_store import ProposalVectorStore, VectorArena
+from app.services.search_index import get_search_index, proposal_meta
+from app.services.structured_answers import get_structured_answerer
+from app.services.prompt_builder import get_prompt_builder
+from app.services.embedding_service import EmbeddingClient
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedders import load_embedder, embedding_model_id
+from app.services.proposal_service import get_proposal_content_version, load_proposal_graph
+from app.database import SessionLocal
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Recent LLM streams kept for time-to-first-token percentiles
+STREAM_LATENCY_WINDOW = 1000
+
+
+class _StreamFanout:
+    """
+    One upstream LLM stream shared by every stream_answer() caller with the same prompt
+
+    The pump task appends tokens to each subscriber's unbounded queue, so it
+    never waits on a slow client; a late subscriber gets the tokens so far
+    replayed first. None in a queue marks the end of the stream.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.queues: List[asyncio.Queue] = []
+        self.message = None
+        self.error: Optional[Exception] = None
+        self.closed = False
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        for text in self.parts:
+            queue.put_nowait(text)
+        if self.closed:
+            queue.put_nowait(None)
+        self.queues.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> bool:
+        """Drop a subscriber; True when it was the last one"""
+        self.queues.remove(queue)
+        return not self.queues
+
+    def publish(self, text: str):
+        self.parts.append(text)
+        for queue in self.queues:
+            queue.put_nowait(text)
+
+    def close(self):
+        self.closed = True
+        for queue in self.queues:
+            queue.put_nowait(None)
+
 
 class RAGService:
     """Service for intelligent question answering with RAG"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    MODEL = "claude-3-haiku-20240307"
+    EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+    def __init__(self, api_key: Optional[str] = None, warm_up_in_background: bool = False):
         """Initialize RAG service with Claude API and embedding model"""
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
 
         if not self.api_key:
             logger.warning("ANTHROPIC_API_KEY not configured in settings")
 
-        # Initialize Claude client
+        # Initialize Claude client (async, so LLM calls don't block the event loop)
         if anthropic and self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            self.client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                timeout=settings.ANTHROPIC_TIMEOUT_SECONDS,
+                max_retries=settings.ANTHROPIC_MAX_RETRIES
+            )
         else:
             self.client = None
             logger.warning("Claude client not initialized")
 
-        # Initialize embedding model (using a lightweight model)
-        if SentenceTransformer:
+        # At most ANTHROPIC_MAX_CONCURRENCY upstream calls per process;
+        # identical in-flight prompts share one call
+        self.llm_semaphore = asyncio.Semaphore(settings.ANTHROPIC_MAX_CONCURRENCY)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._inflight_waiters: Dict[str, int] = {}
+        self._inflight_streams: Dict[str, _StreamFanout] = {}
+        self.llm_calls = 0
+        self.coalesced_calls = 0
+        # Streamed answers (stream_answer); time to first token of recent LLM streams
+        self.streams = 0
+        self.streams_without_llm = 0
+        self.stream_errors = 0
+        self.first_token_seconds: Deque[float] = deque(maxlen=STREAM_LATENCY_WINDOW)
+
+        # Answers to repeated / near-duplicate questions, per proposal content version
+        self.answer_cache = get_answer_cache()
+
+        # Embedding model (using a lightweight model), or a client of the
+        # per-host embedding sidecar when EMBEDDING_SERVICE_SOCKET is set.
+        # With warm_up_in_background (the API lifespan) it loads on a thread;
+        # until then questions get the non-RAG prompt instead of waiting.
+        self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
+        self.embedder = None
+        self.embedder_status = "loading"  # loading | ready | unavailable
+        self.embedder_load_seconds: Optional[float] = None
+        self._embedder_ready = threading.Event()
+        # Stored indexes are only reused by a backend producing the same vectors
+        self.embedding_model_id = embedding_model_id(self.EMBEDDING_MODEL, settings.EMBEDDING_BACKEND)
+
+        # Concurrent question embeddings share one encode call
+        self.question_batcher = EmbeddingBatcher(
+            self.embed_texts,
+            max_batch_size=settings.QUESTION_EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=settings.QUESTION_EMBED_BATCH_WAIT_MS
+        )
+
+        # Cache for proposal vector stores: proposal_id -> (index, chunks),
+        # LRU-evicted to stay within RAG_CACHE_MAX_BYTES
+        self.vector_stores = get_vector_store_cache()
+
+        # Indexes persisted on disk, shared by all workers (RAG_INDEX_DIR)
+        self.index_store = get_index_store()
+
+        # Proposals are embedded at write/import time or on this background
+        # thread, never on the request path (unless RAG_EMBED_ON_REQUEST)
+        self._index_lock = threading.RLock()
+        self._indexing_lock = threading.Lock()
+        self._indexing: Set[str] = set()
+        self._indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-index")
+
+        if warm_up_in_background:
+            threading.Thread(target=self.warm_up, name="rag-warmup", daemon=True).start()
+        else:
+            self.warm_up()
+
+    def _create_embedder(self):
+        if settings.EMBEDDING_SERVICE_SOCKET:
+            return EmbeddingClient(
+                settings.EMBEDDING_SERVICE_SOCKET,
+                timeout=settings.EMBEDDING_SERVICE_TIMEOUT_SECONDS,
+                load_fallback=self._load_local_embedder if settings.EMBEDDING_SERVICE_FALLBACK_LOCAL else None
+            )
+        try:
+            return self._load_local_embedder()
+        except ImportError as e:
+            logger.warning(f"Embedding backend {settings.EMBEDDING_BACKEND} not installed: {e}")
+        except Exception as e:
+            logger.error(f"Failed to load embedding model: {e}")
+        return None
+
+    def warm_up(self):
+        """Load the embedder and run one encode so the first question doesn't pay for lazy init"""
+        started = time.monotonic()
+        embedder = self._create_embedder()
+        if embedder is not None:
             try:
-                self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-                self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
+                embedder.encode(["warm-up"], convert_to_numpy=True)
             except Exception as e:
-                logger.error(f"Failed to load embedding model: {e}")
-                self.embedder = None
-        else:
-            self.embedder = None
+                # A sidecar that isn't up yet (and has no fallback) may be later
+                logger.warning(f"Embedding warm-up encode failed: {e}")
 
-        # Cache for proposal vector stores
-        self.vector_stores: Dict[str, Any] = {}
-        self.document_chunks: Dict[str, List[Dict]] = {}
+        self.embedder = embedder
+        self.embedder_load_seconds = round(time.monotonic() - started, 3)
+        self.embedder_status = "ready" if embedder is not None else "unavailable"
+        self._embedder_ready.set()
+        logger.info(f"RAG embedder {self.embedder_status} after {self.embedder_load_seconds}s")
+
+    async def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait (off the event loop) for the embedder warm-up to finish"""
+        return await asyncio.to_thread(self._embedder_ready.wait, timeout)
+
+    def readiness(self) -> Dict[str, Any]:
+        return {
+            "status": self.embedder_status,
+            "embedder": "sidecar" if settings.EMBEDDING_SERVICE_SOCKET else settings.EMBEDDING_BACKEND,
+            "load_seconds": self.embedder_load_seconds,
+            "llm_configured": self.client is not None
+        }
+
+    def _load_local_embedder(self):
+        return load_embedder(
+            settings.EMBEDDING_BACKEND,
+            self.EMBEDDING_MODEL,
+            onnx_dir=settings.EMBEDDING_ONNX_DIR,
+            threads=settings.EMBEDDING_ONNX_THREADS
+        )
 
     def is_terms_and_conditions_question(self, question: str) -> bool:
         """
@@ -201,6 +369,7 @@ Prepared by: {proposal.prepared_by or 'N/A'}
 Salesperson: {proposal.salesperson or 'N/A'}
             """.strip(),
             'type': 'overview',
+            'chunk_key': 'overview',
             'section': 'General Information',
             'metadata': {
                 'job_number': proposal.job_number,
@@ -221,6 +390,7 @@ Tax Amount: ${proposal.tax_amount or 0}
 Grand Total: ${proposal.total_cost}
             """.strip(),
             'type': 'pricing',
+            'chunk_key': 'pricing',
             'section': 'Pricing',
             'metadata': {
                 'total': float(proposal.total_cost),
@@ -233,6 +403,7 @@ Grand Total: ${proposal.total_cost}
             chunks.append({
                 'content': f"Proposal Notes:\n{proposal.notes}",
                 'type': 'notes',
+                'chunk_key': 'notes',
                 'section': 'Notes',
                 'metadata': {}
             })
@@ -264,6 +435,7 @@ Grand Total: ${proposal.total_cost}
                 chunks.append({
                     'content': item_text,
                     'type': 'line_item',
+                    'chunk_key': f"item:{item.id}",
                     'section': section.section_name,
                     'metadata': {
                         'item_id': str(item.id),
@@ -276,6 +448,7 @@ Grand Total: ${proposal.total_cost}
             chunks.append({
                 'content': section_content,
                 'type': 'section',
+                'chunk_key': f"section:{section.id}",
                 'section': section.section_name,
                 'metadata': {
                     'section_id': str(section.id),
@@ -303,6 +476,7 @@ Cost: ${timeline_item.cost or 0}
             chunks.append({
                 'content': timeline_content,
                 'type': 'timeline',
+                'chunk_key': f"timeline:{timeline_item.id}",
                 'section': 'Timeline',
                 'metadata': {
                     'date': str(timeline_item.event_date),
@@ -330,6 +504,7 @@ Subtotal: ${labor.subtotal}
             chunks.append({
                 'content': labor_content,
                 'type': 'labor',
+                'chunk_key': f"labor:{labor.id}",
                 'section': 'Labor',
                 'metadata': {
                     'task': labor.task_name,
@@ -339,7 +514,21 @@ Subtotal: ${labor.subtotal}
 
         return chunks
 
-    def create_vector_store(self, proposal_id: str, chunks: List[Dict[str, Any]]) -> Optional[Any]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.encode(texts, convert_to_numpy=True)
+
+    def new_vector_store(self, index: Any = None, chunks: Optional[List[Dict[str, Any]]] = None) -> ProposalVectorStore:
+        """Empty (or loaded) store; proposals up to RAG_COMPACT_MAX_CHUNKS live in the shared arena"""
+        return ProposalVectorStore(
+            self.embedding_dim,
+            index=index,
+            chunks=chunks,
+            model_id=self.embedding_model_id,
+            arena=get_vector_arena(self.embedding_dim) if settings.RAG_COMPACT_MAX_CHUNKS else None,
+            compact_max_chunks=settings.RAG_COMPACT_MAX_CHUNKS
+        )
+
+    def create_vector_store(self, proposal_id: str, chunks: List[Dict[str, Any]]) -> Optional[ProposalVectorStore]:
         """
         Create FAISS vector store from proposal chunks
         """
@@ -348,217 +537,666 @@ Subtotal: ${labor.subtotal}
             return None
 
         try:
-            # Extract text content
-            texts = [chunk['content'] for chunk in chunks]
-
-            # Generate embeddings
-            embeddings = self.embedder.encode(texts, convert_to_numpy=True)
-
-            # Create FAISS index
-            index = faiss.IndexFlatL2(self.embedding_dim)
-            index.add(embeddings.astype('float32'))
+            store = self.new_vector_store()
+            store.sync(chunks, self.embed_texts)
 
             # Store in cache
-            self.vector_stores[proposal_id] = index
-            self.document_chunks[proposal_id] = chunks
+            self.vector_stores.set(proposal_id, store)
 
             logger.info(f"Created vector store for proposal {proposal_id} with {len(chunks)} chunks")
-            return index
+            return store
 
         except Exception as e:
             logger.error(f"Error creating vector store: {e}")
             return None
 
+    def index_proposal(self, proposal: Proposal, db: Optional[Session], embed: bool = True) -> Optional[Dict[str, int]]:
+        """
+        Bring the proposal's index up to date with its current rows
+
+        Re-extracts the chunks and syncs them into the existing index (from
+        memory, or the latest one on disk), so only added or edited chunks are
+        embedded; updated indexes are saved to disk for the other workers.
+        Returns chunk change counts, or None if the index couldn't be brought
+        up to date (no embedder, or embed=False and chunks need embedding).
+
+        Only embedding takes the index lock. With embed=False (the request
+        path) the in-memory or on-disk index is picked up without waiting
+        behind a background embedding pass.
+        """
+        if not self.embedder or not faiss:
+            logger.warning("Embedder or FAISS not available")
+            return None
+
+        proposal_id = str(proposal.id)
+        if embed:
+            self._index_lock.acquire()
+        try:
+            clear_proposal_stale(proposal_id)
+            content_version = get_proposal_content_version(db, proposal.id) if db is not None else None
+            chunks = self.extract_proposal_content(proposal, db)
+            content_hash = chunks_content_hash(chunks, self.embedding_model_id)
+
+            store = self.vector_stores.get(proposal_id)
+            if store is None and self.index_store:
+                stored = self.index_store.load_latest(proposal_id)
+                if stored:
+                    stored_hash, index, stored_chunks = stored
+                    store = self.new_vector_store(index=index, chunks=stored_chunks)
+                    store.content_hash = stored_hash
+
+            if store is not None and store.content_hash == content_hash:
+                # Rows were touched but the indexed text didn't change
+                store.content_version = content_version
+                self.vector_stores.set(proposal_id, store)
+                return {"added": 0, "updated": 0, "removed": 0, "unchanged": len(store)}
+
+            if not embed:
+                # Outdated, but better than nothing; never replaces a store a
+                # concurrent embedding pass has just brought up to date
+                if store is not None and proposal_id not in self.vector_stores:
+                    self.vector_stores.set(proposal_id, store)
+                mark_proposal_stale(proposal_id)
+                return None
+
+            try:
+                if store is None:
+                    store = self.new_vector_store()
+                changes = store.sync(chunks, self.embed_texts)
+            except Exception as e:
+                mark_proposal_stale(proposal_id)
+                logger.error(f"Error indexing proposal {proposal_id}: {e}")
+                return None
+
+            store.content_hash = content_hash
+            store.content_version = content_version
+            self.vector_stores.set(proposal_id, store)  # Re-measures its size
+        finally:
+            if embed:
+                self._index_lock.release()
+
+        logger.info(f"Indexed proposal {proposal_id}: {changes}")
+        if self.index_store:
+            self.index_store.save(proposal_id, content_hash, store.faiss_index(), store.chunk_list())
+        # This worker's search index picks the change up now, the others on their next refresh
+        search_index = get_search_index()
+        if search_index is not None and search_index.model_id == self.embedding_model_id:
+            try:
+                search_index.upsert(
+                    proposal_id, proposal_meta(proposal), content_hash, store.chunk_list(), store.chunk_vectors
+                )
+            except Exception as e:
+                logger.warning(f"Search index update for proposal {proposal_id} failed: {e}")
+        return changes
+
+    def ensure_vector_store(self, proposal: Proposal, db: Optional[Session], embed: bool = True) -> bool:
+        """
+        Make sure an index for the proposal is in memory
+
+        The cached store is reused while the proposal's content version is
+        unchanged and no local write has marked it stale. With embed=False
+        (the request path) chunks are never embedded here: an outdated index
+        is used as-is and the proposal is re-indexed in the background.
+        """
+        proposal_id = str(proposal.id)
+        store = self.vector_stores.get(proposal_id)
+        if store is not None and not is_proposal_stale(proposal_id):
+            content_version = get_proposal_content_version(db, proposal.id) if db is not None else None
+            if store.content_version == content_version:
+                return True
+
+        if self.index_proposal(proposal, db, embed=embed) is not None:
+            return True
+        if not embed:
+            self.schedule_indexing(proposal_id)
+        return proposal_id in self.vector_stores
+
+    def schedule_indexing(self, proposal_id: str):
+        """Index a proposal on the background indexing thread (deduplicated)"""
+        if not self.embedder or not faiss:
+            return
+        with self._indexing_lock:
+            if proposal_id in self._indexing:
+                return
+            self._indexing.add(proposal_id)
+        self._indexer.submit(self._index_in_background, proposal_id)
+
+    def _index_in_background(self, proposal_id: str):
+        db = SessionLocal()
+        try:
+            proposal = load_proposal_graph(db, proposal_id)
+            if proposal:
+                self.index_proposal(proposal, db)
+        except Exception as e:
+            logger.error(f"Background indexing failed for proposal {proposal_id}: {e}")
+        finally:
+            db.close()
+            with self._indexing_lock:
+                self._indexing.discard(proposal_id)
+
+    def embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Embedding of a single question, or None without an embedder"""
+        if not self.embedder:
+            return None
+        try:
+            return self.embedder.encode([question], convert_to_numpy=True)[0]
+        except Exception as e:
+            logger.error(f"Error embedding question: {e}")
+            return None
+
+    async def embed_question_batched(self, question: str) -> Optional[np.ndarray]:
+        """embed_question through the micro-batcher, off the event loop"""
+        if not self.embedder:
+            return None
+        try:
+            return await self.question_batcher.embed(question)
+        except Exception as e:
+            logger.error(f"Error embedding question: {e}")
+            return None
+
     def retrieve_relevant_context(
         self,
         proposal_id: str,
         question: str,
-        top_k: int = 5
+        top_k: Optional[int] = None,
+        question_embedding: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve most relevant chunks for a question using semantic search
+        Retrieve most relevant chunks for a question
+
+        With RAG_HYBRID_SEARCH the vector ranking is fused with a BM25
+        ranking over the same chunks (exact item numbers, job numbers and
+        model names), and weak tail chunks are cut; otherwise pure vector search.
         """
-        if not self.embedder or proposal_id not in self.vector_stores:
+        top_k = top_k or settings.RAG_CONTEXT_TOP_K
+        store = self.vector_stores.get(proposal_id)
+        if not self.embedder or store is None:
             logger.warning(f"No vector store found for proposal {proposal_id}")
             return []
 
         try:
-            # Encode question
-            question_embedding = self.embedder.encode([question], convert_to_numpy=True)
+            # Encode question (unless the caller already has its embedding)
+            if question_embedding is None:
+                question_embedding = self.embedder.encode([question], convert_to_numpy=True)[0]
+
+            # Search (returns copies of the cached chunks with relevance scores)
+            if settings.RAG_HYBRID_SEARCH:
+                return store.hybrid_search(
+                    question_embedding,
+                    question,
+                    top_k,
+                    candidates=settings.RAG_HYBRID_CANDIDATES,
+                    rrf_k=settings.RAG_RRF_K,
+                    min_score_ratio=settings.RAG_HYBRID_MIN_SCORE_RATIO
+                )
+            return store.search(question_embedding, top_k)
 
-            # Search
-            index = self.vector_stores[proposal_id]
-            distances, indices = index.search(question_embedding.astype('float32'), top_k)
+        except Exception as e:
+            logger.error(f"Error retrieving context: {e}")
+            return []
 
-            # Get relevant chunks
-            chunks = self.document_chunks[proposal_id]
-            relevant_chunks = [chunks[idx] for idx in indices[0]]
+    async def _create_message(self, prompt: str):
+        async with self.llm_semaphore:
+            self.llm_calls += 1
+            return await self.client.messages.create(
+                model=self.MODEL,
+                max_tokens=1024,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }]
+            )
 
-            # Add relevance scores
-            for chunk, distance in zip(relevant_chunks, distances[0]):
-                chunk['relevance_score'] = float(distance)
+    async def complete(self, prompt: str):
+        """
+        Send a prompt to Claude, sharing the call with identical in-flight prompts
 
-            return relevant_chunks
+        Each caller awaits the shared task through a shield, so one caller being
+        cancelled doesn't cancel the others; the upstream call is only cancelled
+        once every caller waiting on it is gone. Errors (including client
+        timeouts) propagate to every waiter.
+        """
+        key = hashlib.sha256(f"{self.MODEL}\n{prompt}".encode()).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._create_message(prompt))
+            self._inflight[key] = task
+            self._inflight_waiters[key] = 0
+            task.add_done_callback(lambda done: self._release_inflight(key, done))
+        else:
+            self.coalesced_calls += 1
 
-        except Exception as e:
-            logger.error(f"Error retrieving context: {e}")
-            return []
+        self._inflight_waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._inflight_waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if key in self._inflight_waiters:
+                self._inflight_waiters[key] -= 1
+
+    def _release_inflight(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._inflight_waiters.pop(key, None)
+        # Don't leave "exception was never retrieved" warnings for cancelled waiters
+        if not task.cancelled():
+            task.exception()
+
+    def try_structured_answer(self, question: str, proposal: Proposal) -> Optional[Dict[str, Any]]:
+        """Templated answer from proposal columns (FAST_PATH_ENABLED), or None to use RAG + LLM"""
+        if not settings.FAST_PATH_ENABLED:
+            return None
+        result = get_structured_answerer().answer(question, proposal)
+        if result:
+            logger.info(f"Answered without LLM ({result['intent']}) for proposal {proposal.id}: {question}")
+        return result
 
     async def answer_question(
         self,
         question: str,
         proposal: Proposal,
-        db: Session,
-        use_rag: bool = True
+        db: Optional[Session],
+        use_rag: bool = True,
+        embed_chunks: Optional[bool] = None,
+        fast_path: bool = True,
+        question_embedding: Optional[np.ndarray] = None,
+        content_version: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Answer a question about a proposal using RAG or direct LLM
 
+        embed_chunks controls whether a missing/outdated proposal index may be
+        embedded inline (default RAG_EMBED_ON_REQUEST); otherwise it is
+        indexed in the background and this answer uses what is available.
+        With fast_path, factual questions (totals, dates, quantities) are
+        answered from the proposal's columns without retrieval or the LLM.
+        question_embedding skips embedding the question (batch callers
+        embed all their questions in one call).
+
+        With db=None the session is not used at all: the caller has already
+        ensured the proposal's index and passes its content_version (batch
+        answers run concurrently and a Session isn't thread-safe).
+
         Returns:
         {
             'answer': str,
-            'method': 'simple' | 'rag',
+            'method': 'structured' | 'simple' | 'rag',
             'confidence': float,
             'sources': List[Dict],
             'reasoning': str
         }
         """
+        try:
+            prepared = await self._prepare_answer(
+                question, proposal, db, use_rag, embed_chunks, fast_path, question_embedding, content_version
+            )
+            if 'result' in prepared:
+                return prepared['result']
+
+            # Call Claude
+            # Using Haiku model for better availability and lower cost
+            message = await self.complete(prepared['prompt'])
+            return self._finish_answer(prepared, message.content[0].text, message.usage)
+
+        except Exception as e:
+            logger.error(f"Error answering question: {e}")
+            return error_result(e)
+
+    async def stream_answer(
+        self,
+        question: str,
+        proposal: Proposal,
+        db: Session,
+        use_rag: bool = True,
+        fast_path: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer like answer_question, yielding the text as Claude generates it
+
+        Yields {'type': 'token', 'text': str} events, then one
+        {'type': 'done', **result} with the answer_question() result, or
+        {'type': 'error', ...} if it fails part way. Structured, cached and
+        error answers arrive as a single token event. Time from the call to
+        the first generated token is recorded (stream_stats()).
+
+        The model is read by a separate task (_pump_stream) that holds an
+        llm_semaphore slot only until the model finishes, however slowly the
+        caller consumes the tokens. Callers with the same prompt in flight
+        share that upstream stream. The last caller to leave cancels it.
+        """
+        started = time.perf_counter()
+        try:
+            prepared = await self._prepare_answer(question, proposal, db, use_rag, None, fast_path)
+            if 'result' in prepared:
+                result = prepared['result']
+                self.streams_without_llm += 1
+                if result.get('answer'):
+                    yield {'type': 'token', 'text': result['answer']}
+                yield {'type': 'done', **result}
+                return
+
+            key = hashlib.sha256(f"{self.MODEL}\n{prepared['prompt']}".encode()).hexdigest()
+            fanout = self._inflight_streams.get(key)
+            if fanout is None:
+                fanout = _StreamFanout()
+                self._inflight_streams[key] = fanout
+                fanout.task = asyncio.create_task(self._pump_stream(key, prepared['prompt'], fanout))
+            else:
+                self.coalesced_calls += 1
+
+            queue = fanout.subscribe()
+            received = False
+            try:
+                while (text := await queue.get()) is not None:
+                    if not received:
+                        self.first_token_seconds.append(time.perf_counter() - started)
+                        received = True
+                    yield {'type': 'token', 'text': text}
+            finally:
+                if fanout.unsubscribe(queue) and not fanout.closed:
+                    fanout.task.cancel()
+
+            if fanout.error is not None:
+                raise fanout.error
+            yield {'type': 'done', **self._finish_answer(prepared, "".join(fanout.parts), fanout.message.usage)}
+
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            self.stream_errors += 1
+            yield {'type': 'error', **error_result(e)}
+
+    async def _pump_stream(self, key: str, prompt: str, fanout: _StreamFanout):
+        """Read one upstream stream into fanout, holding an LLM slot only while the model generates"""
+        try:
+            async with self.llm_semaphore:
+                self.llm_calls += 1
+                self.streams += 1
+                async with self.client.messages.stream(
+                    model=self.MODEL,
+                    max_tokens=1024,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                ) as stream:
+                    async for text in stream.text_stream:
+                        fanout.publish(text)
+                    fanout.message = await stream.get_final_message()
+        except Exception as e:
+            fanout.error = e
+        finally:
+            if self._inflight_streams.get(key) is fanout:
+                del self._inflight_streams[key]
+            fanout.close()
+
+    async def _prepare_answer(
+        self,
+        question: str,
+        proposal: Proposal,
+        db: Optional[Session],
+        use_rag: bool,
+        embed_chunks: Optional[bool],
+        fast_path: bool,
+        question_embedding: Optional[np.ndarray] = None,
+        content_version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Everything before the LLM call: fast path, cache lookup, retrieval, prompt
+
+        Returns {'result': ...} when the answer is already known (structured,
+        cached, or the service isn't configured), otherwise the prompt and the
+        state _finish_answer() needs.
+        """
+        if fast_path:
+            structured = self.try_structured_answer(question, proposal)
+            if structured:
+                return {'result': structured}
+
         if not self.client:
-            return {
+            return {'result': {
                 'answer': "AI service is not configured. Please set ANTHROPIC_API_KEY environment variable.",
                 'method': 'error',
                 'confidence': 0.0,
                 'sources': [],
                 'reasoning': 'Missing API key'
+            }}
+
+        # Check if question is simple
+        is_simple, reason = await self.is_simple_question(question)
+
+        proposal_id = str(proposal.id)
+        context_chunks = []
+
+        # Serve repeated and near-duplicate questions from the answer cache
+        if not settings.ANSWER_CACHE_ENABLED:
+            content_version = None
+        elif content_version is None and db is not None:
+            content_version = await asyncio.to_thread(get_proposal_content_version, db, proposal.id)
+        if content_version is not None:
+            if question_embedding is None:
+                question_embedding = await self.embed_question_batched(question)
+            cached = self.answer_cache.get(proposal_id, content_version, question, question_embedding, use_rag)
+            if cached:
+                logger.info(f"Answer cache hit ({cached['cache']}) for proposal {proposal_id}: {question}")
+                return {'result': cached}
+
+        # If complex or RAG requested, use RAG
+        if (not is_simple or use_rag):
+            # Index proposal if not already done (or load it from disk), off the
+            # event loop: the version query, disk read and any embedding block
+            embed = settings.RAG_EMBED_ON_REQUEST if embed_chunks is None else embed_chunks
+            if db is not None:
+                await asyncio.to_thread(self.ensure_vector_store, proposal, db, embed)
+            if question_embedding is None:
+                question_embedding = await self.embed_question_batched(question)
+
+            # Retrieve relevant context
+            context_chunks = self.retrieve_relevant_context(
+                proposal_id, question, question_embedding=question_embedding
+            )
+
+        # Build prompt: context packed by relevance under RAG_CONTEXT_MAX_TOKENS
+        prompt_builder = get_prompt_builder()
+        if context_chunks:
+            prompt, context_chunks, prompt_tokens = prompt_builder.rag_prompt(question, context_chunks)
+        else:
+            # Simple question without RAG
+            prompt, prompt_tokens = prompt_builder.basic_prompt(question, proposal)
+
+        # Log the prompt being sent to AI
+        logger.info("=" * 80)
+        logger.info("📝 SENDING PROMPT TO AI")
+        logger.info("=" * 80)
+        logger.info(f"Question: {question}")
+        logger.info(f"Method: {'RAG' if context_chunks else 'Simple'}")
+        logger.info(f"Context chunks: {len(context_chunks) if context_chunks else 0}")
+        logger.info(f"Prompt tokens (estimated): {prompt_tokens}")
+        logger.debug(f"Full prompt:\n{prompt}")
+        logger.info("=" * 80)
+
+        return {
+            'question': question,
+            'proposal_id': proposal_id,
+            'use_rag': use_rag,
+            'reason': reason,
+            'prompt': prompt,
+            'prompt_tokens': prompt_tokens,
+            'context_chunks': context_chunks,
+            'content_version': content_version,
+            'question_embedding': question_embedding
+        }
+
+    def _finish_answer(self, prepared: Dict[str, Any], answer: str, usage: Any) -> Dict[str, Any]:
+        """Result of a generated answer: token accounting, sources and the answer cache"""
+        question = prepared['question']
+        context_chunks = prepared['context_chunks']
+        get_prompt_builder().record_usage(usage.input_tokens, usage.output_tokens, prepared['prompt_tokens'])
+
+        # Log the AI response
+        logger.info("=" * 80)
+        logger.info("🤖 AI GENERATED ANSWER")
+        logger.info("=" * 80)
+        logger.info(f"Question: {question}")
+        logger.info(f"Answer: {answer}")
+        logger.info(f"Model: {self.MODEL}")
+        logger.info(f"Tokens used: {usage.input_tokens} input, {usage.output_tokens} output")
+        logger.info("=" * 80)
+
+        # Determine method and confidence
+        method = 'rag' if context_chunks else 'simple'
+        confidence = 0.9 if context_chunks else 0.7
+
+        # Prepare sources
+        sources = [
+            {
+                'section': chunk['section'],
+                'type': chunk['type'],
+                # Lexical-only hybrid hits have no vector distance; 0 would read as a perfect match
+                'relevance': chunk.get('relevance_score')
             }
+            for chunk in context_chunks[:3]  # Top 3 sources
+        ]
 
-        try:
-            # Check if question is simple
-            is_simple, reason = await self.is_simple_question(question)
+        result = {
+            'answer': answer,
+            'method': method,
+            'confidence': confidence,
+            'sources': sources,
+            'reasoning': prepared['reason'] if method == 'simple' else 'Used RAG for comprehensive answer',
+            'input_tokens': usage.input_tokens
+        }
 
-            proposal_id = str(proposal.id)
-            context_chunks = []
+        # Answers given before the embedder finished loading lacked
+        # retrieval; don't let them shadow proper ones later
+        if prepared['content_version'] is not None and self.embedder_status != "loading":
+            self.answer_cache.set(
+                prepared['proposal_id'], prepared['content_version'], question, result,
+                embedding=prepared['question_embedding'],
+                tokens=usage.input_tokens + usage.output_tokens,
+                use_rag=prepared['use_rag']
+            )
 
-            # If complex or RAG requested, use RAG
-            if (not is_simple or use_rag):
-                # Index proposal if not already done
-                if proposal_id not in self.vector_stores:
-                    chunks = self.extract_proposal_content(proposal, db)
-                    self.create_vector_store(proposal_id, chunks)
+        return result
 
-                # Retrieve relevant context
-                context_chunks = self.retrieve_relevant_context(proposal_id, question, top_k=5)
+    def stream_stats(self) -> Dict[str, Any]:
+        """Streamed answers and their time to first token (last STREAM_LATENCY_WINDOW LLM streams)"""
+        first_token = np.array(self.first_token_seconds) * 1000
+        return {
+            "streams": self.streams,
+            "streams_without_llm": self.streams_without_llm,
+            "errors": self.stream_errors,
+            "first_token_p50_ms": round(float(np.percentile(first_token, 50)), 1) if len(first_token) else None,
+            "first_token_p95_ms": round(float(np.percentile(first_token, 95)), 1) if len(first_token) else None
+        }
 
-            # Build prompt
-            if context_chunks:
-                context_text = "\n\n---\n\n".join([
-                    f"[{chunk['section']} - {chunk['type']}]\n{chunk['content']}"
-                    for chunk in context_chunks
-                ])
+    def clear_cache(self, proposal_id: Optional[str] = None):
+        """Clear vector store and answer caches"""
+        if proposal_id:
+            self.vector_stores.pop(proposal_id)
+        else:
+            self.vector_stores.clear()
+        if self.index_store:
+            self.index_store.delete(proposal_id)
+        self.answer_cache.invalidate(proposal_id)
 
-                prompt = f"""You are an expert assistant helping answer questions about a proposal/quote.
 
-Question: {question}
+def error_result(error: Exception) -> Dict[str, Any]:
+    """answer_question() result for a failed answer"""
+    return {
+        'answer': f"I encountered an error while processing your question: {str(error)}",
+        'method': 'error',
+        'confidence': 0.0,
+        'sources': [],
+        'reasoning': str(error)
+    }
 
-Relevant context from the proposal:
 
-{context_text}
+def vector_store_size(store: ProposalVectorStore) -> int:
+    """Approximate resident bytes of a cached vector store"""
+    return store.nbytes(CHUNK_OVERHEAD_BYTES)
 
-Please provide a clear, accurate, and helpful answer based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide the best answer you can with what's available.
 
-Keep your answer concise but complete."""
-            else:
-                # Simple question without RAG
-                basic_info = f"""
-Proposal for {proposal.client_name}
-Job Number: {proposal.job_number}
-Event Date: {proposal.start_date} to {proposal.end_date}
-Location: {proposal.event_location}
-Total Cost: ${proposal.total_cost}
-                """.strip()
+# Per-chunk dict/str object overhead on top of the text itself
+CHUNK_OVERHEAD_BYTES = 400
 
-                prompt = f"""You are an expert assistant helping answer questions about a proposal/quote.
 
-Basic proposal information:
-{basic_info}
+# Proposals whose rows were written in this process since they were indexed
+_stale_proposals: Set[str] = set()
+_stale_lock = threading.Lock()
 
-Question: {question}
 
-Please provide a brief, helpful answer. If you need more specific information from the proposal to answer accurately, mention what details would be helpful."""
+def mark_proposal_stale(proposal_id: str):
+    with _stale_lock:
+        _stale_proposals.add(proposal_id)
 
-            # Log the prompt being sent to AI
-            logger.info("=" * 80)
-            logger.info("📝 SENDING PROMPT TO AI")
-            logger.info("=" * 80)
-            logger.info(f"Question: {question}")
-            logger.info(f"Method: {'RAG' if context_chunks else 'Simple'}")
-            logger.info(f"Context chunks: {len(context_chunks) if context_chunks else 0}")
-            logger.debug(f"Full prompt:\n{prompt}")
-            logger.info("=" * 80)
 
-            # Call Claude
-            # Using Haiku model for better availability and lower cost
-            message = self.client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=1024,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+def clear_proposal_stale(proposal_id: str):
+    with _stale_lock:
+        _stale_proposals.discard(proposal_id)
 
-            answer = message.content[0].text
-
-            # Log the AI response
-            logger.info("=" * 80)
-            logger.info("🤖 AI GENERATED ANSWER")
-            logger.info("=" * 80)
-            logger.info(f"Question: {question}")
-            logger.info(f"Answer: {answer}")
-            logger.info(f"Model: claude-3-haiku-20240307")
-            logger.info(f"Tokens used: {message.usage.input_tokens} input, {message.usage.output_tokens} output")
-            logger.info("=" * 80)
-
-            # Determine method and confidence
-            method = 'rag' if context_chunks else 'simple'
-            confidence = 0.9 if context_chunks else 0.7
-
-            # Prepare sources
-            sources = [
-                {
-                    'section': chunk['section'],
-                    'type': chunk['type'],
-                    'relevance': chunk.get('relevance_score', 0)
-                }
-                for chunk in context_chunks[:3]  # Top 3 sources
-            ]
 
-            return {
-                'answer': answer,
-                'method': method,
-                'confidence': confidence,
-                'sources': sources,
-                'reasoning': reason if method == 'simple' else 'Used RAG for comprehensive answer'
-            }
+def is_proposal_stale(proposal_id: str) -> bool:
+    return proposal_id in _stale_proposals
 
-        except Exception as e:
-            logger.error(f"Error answering question: {e}")
-            return {
-                'answer': f"I encountered an error while processing your question: {str(e)}",
-                'method': 'error',
-                'confidence': 0.0,
-                'sources': [],
-                'reasoning': str(e)
-            }
 
-    def clear_cache(self, proposal_id: Optional[str] = None):
-        """Clear vector store cache"""
-        if proposal_id:
-            self.vector_stores.pop(proposal_id, None)
-            self.document_chunks.pop(proposal_id, None)
-        else:
-            self.vector_stores.clear()
-            self.document_chunks.clear()
+_INDEXED_MODELS = (Proposal, ProposalSection, ProposalLineItem, ProposalTimeline, ProposalLabor)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_proposals(session: Session, flush_context):
+    """Remember which proposals had indexed rows inserted, updated or deleted"""
+    changed = session.info.setdefault("rag_changed_proposals", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _INDEXED_MODELS):
+            proposal_id = obj.id if isinstance(obj, Proposal) else obj.proposal_id
+            if proposal_id is not None:
+                changed.add(str(proposal_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_changed_proposals_stale(session: Session):
+    for proposal_id in session.info.pop("rag_changed_proposals", ()):
+        mark_proposal_stale(proposal_id)
+        get_answer_cache().invalidate(proposal_id)
+        # Re-embed at write time in processes that serve questions
+        if settings.RAG_INDEX_ON_WRITE and _rag_service is not None:
+            _rag_service.schedule_indexing(proposal_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_proposals(session: Session):
+    session.info.pop("rag_changed_proposals", None)
+
+
+# Global vector store cache (shared by every RAGService in the process)
+_vector_store_cache: Optional[LRUCache] = None
+
+
+def get_vector_store_cache() -> LRUCache:
+    """Get or create the byte-budgeted proposal vector store cache"""
+    global _vector_store_cache
+    if _vector_store_cache is None:
+        _vector_store_cache = LRUCache(
+            max_entries=settings.RAG_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RAG_CACHE_MAX_BYTES,
+            sizeof=vector_store_size
+        )
+    return _vector_store_cache
+
+
+# Global vector arena (compact stores of every proposal in the process)
+_vector_arena: Optional[VectorArena] = None
+
+
+def get_vector_arena(dim: int = 384) -> VectorArena:
+    """Get or create the contiguous matrix backing compact vector stores"""
+    global _vector_arena
+    if _vector_arena is None or _vector_arena.dim != dim:
+        _vector_arena = VectorArena(dim, dtype=np.dtype(settings.RAG_COMPACT_DTYPE))
+    return _vector_arena
 
 
 # Global RAG service instance
@@ -571,3 +1209,58 @@ def get_rag_service() -> RAGService:
     if _rag_service is None:
         _rag_service = RAGService()
     return _rag_service
+
+
+def start_rag_warmup() -> RAGService:
+    """Create the RAG service with its embedder loading on a background thread (API startup)"""
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService(warm_up_in_background=True)
+    return _rag_service
+
+
+def get_rag_readiness() -> Dict[str, Any]:
+    """Embedder warm-up state for /health"""
+    if _rag_service is None:
+        return {"status": "not_started"}
+    return _rag_service.readiness()
+
+
+def get_embedding_stats() -> Optional[Dict[str, Any]]:
+    """Question batching and sidecar client stats of this worker's RAG service"""
+    if _rag_service is None:
+        return None
+    return {
+        "question_batches": _rag_service.question_batcher.stats(),
+        "vector_arena": _vector_arena.stats() if _vector_arena else None,
+        "sidecar": _rag_service.embedder.stats() if isinstance(_rag_service.embedder, EmbeddingClient) else None
+    }
+
+
+def get_stream_stats() -> Optional[Dict[str, Any]]:
+    """Streamed-answer stats of this worker's RAG service"""
+    if _rag_service is None:
+        return None
+    return _rag_service.stream_stats()
+
+
+def index_proposal_by_id(proposal_id, session_factory=SessionLocal) -> Optional[Dict[str, int]]:
+    """
+    Embed a proposal now and persist its index to RAG_INDEX_DIR
+
+    Called after proposals are created or imported (seed/import scripts) and
+    by scripts/index_proposals.py, so questions never pay for embedding.
+    Returns chunk change counts, or None if the proposal couldn't be indexed.
+    """
+    db = session_factory()
+    try:
+        proposal = load_proposal_graph(db, str(proposal_id))
+        if not proposal:
+            logger.warning(f"Cannot index proposal {proposal_id}: not found")
+            return None
+        return get_rag_service().index_proposal(proposal, db)
+    except Exception as e:
+        logger.error(f"Failed to index proposal {proposal_id}: {e}")
+        return None
+    finally:
+        db.close()
@@ -0,0 +1,598 @@
+# app/services/search_index.py
+"""
+Global semantic search index over the chunks of every proposal
+
+Backs GET /api/v1/search ("which past proposals had an LED wall at this
+venue"). Each worker keeps one FAISS index of the normalized chunk vectors
+from extract_proposal_content for all proposals, searched by inner product:
+
+- Below SEARCH_INDEX_IVF_MIN_VECTORS vectors: exact IndexIDMap2(IndexFlatIP).
+- Above: IndexIVFScalarQuantizer (8-bit codes, a quarter of the float32
+  memory), with a hashtable direct map so proposals can be removed and
+  re-added in place. It is retrained once the index grows or shrinks 4x.
+
+Nothing is embedded here. Vectors come from the per-proposal indexes that
+RAGService.index_proposal already saves to RAG_INDEX_DIR: a refresh pass
+compares each proposal's stored content hash with the one indexed here and
+swaps only the chunks whose hash changed (incremental build). Proposal
+fields used by filters (status, client, event dates) are re-read from the
+database on every pass.
+
+Snapshots are persisted under SEARCH_INDEX_DIR:
+
+    {token}.faiss   the FAISS index
+    {token}.json    proposal metadata and chunk hashes
+    CURRENT         token of the newest complete pair, replaced last
+
+The token is a digest of the indexed content hashes, so workers that have
+converged on the same content don't write the same snapshot again.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.proposals import Proposal
+from app.services.index_store import FAISSIndexStore, atomic_write, get_index_store
+from app.services.vector_store import chunk_hash, chunk_id, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# Proposal columns kept for filtering and for the result cards
+META_COLUMNS = (
+    "job_number", "client_name", "client_company", "venue_name",
+    "event_location", "status", "start_date", "end_date"
+)
+
+
+def proposal_meta(proposal: Any) -> Dict[str, Any]:
+    """Search metadata of a proposal (ORM object or query row)"""
+    meta = {}
+    for column in META_COLUMNS:
+        value = getattr(proposal, column, None)
+        meta[column] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return meta
+
+
+def ivf_nlist(count: int) -> int:
+    """Number of IVF lists for an index of count vectors"""
+    return int(min(4096, max(64, 2 * math.sqrt(count))))
+
+
+class GlobalSearchIndex:
+    """Chunk vectors of all proposals in one FAISS index, with per-proposal metadata"""
+
+    def __init__(self, dim: int, model_id: str = "", ivf_min_vectors: int = 20000, nprobe: int = 16):
+        self.dim = dim
+        self.model_id = model_id
+        self.ivf_min_vectors = ivf_min_vectors
+        self.nprobe = nprobe
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self.trained_size = 0  # Vectors the IVF quantizer was trained on (0 = flat)
+        self.ready = False  # Set once the first refresh (or snapshot load) completes
+
+        # proposal_id -> metadata (+ content_hash of the stored index it came from)
+        self.proposals: Dict[str, Dict[str, Any]] = {}
+        # proposal_id -> {chunk_key: chunk content hash}
+        self.chunk_hashes: Dict[str, Dict[str, str]] = {}
+        # proposal_id -> global ids of its chunks; global id -> (proposal_id, chunk_key)
+        self._ids: Dict[str, np.ndarray] = {}
+        self._owners: Dict[int, Tuple[str, str]] = {}
+
+        self.generation = 0  # Bumped by every change to the indexed vectors
+        self.saved_token: Optional[str] = None
+        self.searches = 0
+        self.refreshes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def global_id(proposal_id: str, chunk_key: str) -> int:
+        return chunk_id(f"{proposal_id}:{chunk_key}")
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def ivf(self) -> bool:
+        return self.trained_size > 0
+
+    def upsert(
+        self,
+        proposal_id: str,
+        meta: Dict[str, Any],
+        content_hash: str,
+        chunks: List[Dict[str, Any]],
+        vectors: Callable[[List[str]], np.ndarray]
+    ) -> Dict[str, int]:
+        """
+        Bring one proposal's chunks in line with an indexed version of it
+
+        vectors(chunk_keys) returns the embeddings of the given chunks (from
+        the proposal's own index); only added and changed chunks are fetched.
+        """
+        current = {
+            chunk['chunk_key']: chunk.get('content_hash') or chunk_hash(chunk, self.model_id)
+            for chunk in chunks
+        }
+        with self._lock:
+            previous = self.chunk_hashes.get(proposal_id, {})
+            stale = [key for key, value in previous.items() if current.get(key) != value]
+            fresh = [key for key, value in current.items() if previous.get(key) != value]
+
+            if stale:
+                gids = np.array([self.global_id(proposal_id, key) for key in stale], dtype=np.int64)
+                self.index.remove_ids(gids)
+                for gid in gids:
+                    self._owners.pop(int(gid), None)
+            if fresh:
+                gids = np.array([self.global_id(proposal_id, key) for key in fresh], dtype=np.int64)
+                embeddings = normalize_rows(vectors(fresh)).reshape(len(fresh), self.dim)
+                self.index.add_with_ids(np.ascontiguousarray(embeddings), gids)
+                for gid, key in zip(gids, fresh):
+                    self._owners[int(gid)] = (proposal_id, key)
+
+            self.proposals[proposal_id] = dict(meta, content_hash=content_hash)
+            self.chunk_hashes[proposal_id] = current
+            self._ids[proposal_id] = np.array(
+                [self.global_id(proposal_id, key) for key in current], dtype=np.int64
+            )
+            if stale or fresh:
+                self.generation += 1
+        return {"added": len(fresh), "removed": len(stale)}
+
+    def remove(self, proposal_id: str):
+        """Drop a proposal and all of its chunks"""
+        with self._lock:
+            gids = self._ids.pop(proposal_id, None)
+            self.proposals.pop(proposal_id, None)
+            self.chunk_hashes.pop(proposal_id, None)
+            if gids is not None and len(gids):
+                self.index.remove_ids(gids)
+                for gid in gids:
+                    self._owners.pop(int(gid), None)
+                self.generation += 1
+
+    def update_meta(self, proposal_id: str, meta: Dict[str, Any]):
+        """Refresh filter fields of an indexed proposal (status, dates, client)"""
+        with self._lock:
+            if proposal_id in self.proposals:
+                self.proposals[proposal_id].update(meta)
+
+    def refresh(self, db, index_store: FAISSIndexStore) -> Dict[str, int]:
+        """
+        Sync with the database and the per-proposal indexes on disk
+
+        Proposals whose newest stored index differs from the indexed one are
+        re-read (changed chunks only); deleted proposals are removed.
+        Proposals that were never indexed are skipped until they are.
+        """
+        columns = [getattr(Proposal, column) for column in META_COLUMNS]
+        rows = db.query(Proposal.id, *columns).all()
+        counts = {"proposals": len(rows), "updated": 0, "removed": 0, "added": 0, "removed_chunks": 0}
+
+        seen = set()
+        for row in rows:
+            proposal_id = str(row.id)
+            seen.add(proposal_id)
+            meta = proposal_meta(row)
+            stored_hash = index_store.latest_hash(proposal_id)
+            indexed = self.proposals.get(proposal_id)
+            if stored_hash is None or (indexed and indexed.get('content_hash') == stored_hash):
+                self.update_meta(proposal_id, meta)
+                continue
+
+            stored = index_store.load_latest(proposal_id)
+            if not stored:
+                continue
+            content_hash, index, chunks = stored
+            changes = self.upsert(
+                proposal_id, meta, content_hash, chunks,
+                lambda keys, index=index: np.vstack([index.reconstruct(chunk_id(key)) for key in keys])
+            )
+            counts["updated"] += 1
+            counts["added"] += changes["added"]
+            counts["removed_chunks"] += changes["removed"]
+
+        for proposal_id in set(self.proposals) - seen:
+            self.remove(proposal_id)
+            counts["removed"] += 1
+
+        self.refreshes += 1
+        self.ready = True
+        return counts
+
+    def maybe_rebuild(self) -> bool:
+        """
+        Move to (or retrain) the IVF index when the size calls for it
+
+        The quantizer is trained on a sample outside the lock; the vectors are
+        then copied into the new index under the lock, so searches and
+        updates only wait for the copy.
+        """
+        count = self.ntotal
+        if self.ivf:
+            if self.trained_size // 4 <= count <= self.trained_size * 4:
+                return False
+        elif count < self.ivf_min_vectors:
+            return False
+
+        started = time.perf_counter()
+        with self._lock:
+            gids = np.array(list(self._owners), dtype=np.int64)
+        if not len(gids):
+            return False
+        if len(gids) < self.ivf_min_vectors:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+            trained_size = 0
+        else:
+            nlist = ivf_nlist(len(gids))
+            sample = np.random.default_rng(0).choice(gids, size=min(len(gids), 40 * nlist), replace=False)
+            with self._lock:
+                sample = [gid for gid in sample if int(gid) in self._owners]
+                training = self.index.reconstruct_batch(np.array(sample, dtype=np.int64))
+            index = faiss.IndexIVFScalarQuantizer(
+                faiss.IndexFlatIP(self.dim), self.dim, nlist,
+                faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(training)
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            trained_size = len(gids)
+
+        with self._lock:
+            gids = np.array(list(self._owners), dtype=np.int64)
+            if len(gids):
+                index.add_with_ids(self.index.reconstruct_batch(gids), gids)
+            self.index = index
+            self.trained_size = trained_size
+            self.generation += 1
+        logger.info(
+            f"Rebuilt search index: {len(gids)} vectors, "
+            f"{'IVF-SQ8 nlist=' + str(index.nlist) if trained_size else 'flat'} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return True
+
+    def _matching_proposals(
+        self,
+        status: Optional[str],
+        client: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> List[str]:
+        statuses = {value.strip().lower() for value in status.split(",")} if status else None
+        client = client.lower() if client else None
+        date_from = date_from.isoformat() if date_from else None
+        date_to = date_to.isoformat() if date_to else None
+
+        matches = []
+        for proposal_id, meta in self.proposals.items():
+            if statuses and (meta.get('status') or "").lower() not in statuses:
+                continue
+            if client and client not in (meta.get('client_name') or "").lower() \
+                    and client not in (meta.get('client_company') or "").lower():
+                continue
+            # Events overlapping [date_from, date_to]; ISO dates compare as strings
+            start = meta.get('start_date')
+            end = meta.get('end_date') or start
+            if date_to and (not start or start[:10] > date_to):
+                continue
+            if date_from and (not end or end[:10] < date_from):
+                continue
+            matches.append(proposal_id)
+        return matches
+
+    def search(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        status: Optional[str] = None,
+        client: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Nearest chunks as (proposal_id, chunk_key, cosine similarity)
+
+        Filters restrict the search to matching proposals' ids. On the IVF
+        index nprobe grows with the filter's selectivity, so a narrow filter
+        still scans enough lists to fill top_k.
+        """
+        query = normalize_rows(embedding).reshape(1, -1)
+        filtered = status or client or date_from or date_to
+        with self._lock:
+            self.searches += 1
+            if not self.ntotal or top_k <= 0:
+                return []
+
+            params = None
+            nprobe = self.nprobe
+            if filtered:
+                proposal_ids = self._matching_proposals(status, client, date_from, date_to)
+                ids = np.concatenate([self._ids[pid] for pid in proposal_ids]) if proposal_ids else []
+                if not len(ids):
+                    return []
+                top_k = min(top_k, len(ids))
+                selector = faiss.IDSelectorBatch(ids)
+                nprobe = math.ceil(nprobe * self.ntotal / len(ids))
+                params = faiss.SearchParametersIVF(sel=selector) if self.ivf else faiss.SearchParameters(sel=selector)
+            elif self.ivf:
+                params = faiss.SearchParametersIVF()
+            if self.ivf:
+                params.nprobe = min(nprobe, self.index.nlist)
+
+            scores, ids = self.index.search(query, min(top_k, self.ntotal), params=params)
+            owners = self._owners
+            return [
+                (*owners[int(gid)], float(score))
+                for gid, score in zip(ids[0], scores[0])
+                if int(gid) in owners
+            ]
+
+    def snapshot_token(self) -> str:
+        digest = hashlib.sha256(f"{self.model_id}\0{self.dim}".encode())
+        for proposal_id in sorted(self.proposals):
+            digest.update(f"\0{proposal_id}:{self.proposals[proposal_id].get('content_hash')}".encode())
+        return digest.hexdigest()[:32]
+
+    def save(self, directory: str) -> bool:
+        """
+        Persist a snapshot unless an identical one is already current
+
+        One worker writes at a time (flock); the others skip this round.
+        """
+        base = Path(directory)
+        base.mkdir(parents=True, exist_ok=True)
+        with open(base / ".lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+
+            with self._lock:
+                token = self.snapshot_token()
+                current = base / "CURRENT"
+                if current.exists() and current.read_text().strip() == token:
+                    self.saved_token = token
+                    return False
+                index = faiss.clone_index(self.index)
+                meta = {
+                    "model_id": self.model_id,
+                    "dim": self.dim,
+                    "trained_size": self.trained_size,
+                    "proposals": self.proposals,
+                    "chunk_hashes": self.chunk_hashes
+                }
+                meta = json.loads(json.dumps(meta, default=str))  # Copy while locked
+
+            atomic_write(base / f"{token}.json", lambda tmp: Path(tmp).write_text(json.dumps(meta)))
+            atomic_write(base / f"{token}.faiss", lambda tmp: faiss.write_index(index, tmp))
+            atomic_write(current, lambda tmp: Path(tmp).write_text(token))
+            for path in base.iterdir():
+                if path.suffix in (".faiss", ".json") and not path.name.startswith(token):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+        self.saved_token = token
+        logger.info(f"Saved search index snapshot {token}: {index.ntotal} vectors, {len(meta['proposals'])} proposals")
+        return True
+
+    def load(self, directory: str) -> bool:
+        """Replace the contents with the current snapshot (if it matches the embedding model)"""
+        base = Path(directory)
+        try:
+            token = (base / "CURRENT").read_text().strip()
+            meta = json.loads((base / f"{token}.json").read_text())
+            if meta.get("model_id") != self.model_id or meta.get("dim") != self.dim:
+                logger.info("Search index snapshot was built by another embedding model; rebuilding")
+                return False
+            index = faiss.read_index(str(base / f"{token}.faiss"))
+        except (OSError, ValueError, RuntimeError) as e:
+            logger.info(f"No usable search index snapshot in {directory}: {e}")
+            return False
+
+        ids = {
+            proposal_id: np.array([self.global_id(proposal_id, key) for key in hashes], dtype=np.int64)
+            for proposal_id, hashes in meta["chunk_hashes"].items()
+        }
+        with self._lock:
+            self.index = index
+            self.trained_size = meta.get("trained_size", 0)
+            self.proposals = meta["proposals"]
+            self.chunk_hashes = meta["chunk_hashes"]
+            self._ids = ids
+            self._owners = {
+                int(gid): (proposal_id, key)
+                for proposal_id, hashes in self.chunk_hashes.items()
+                for gid, key in zip(ids[proposal_id], hashes)
+            }
+            self.saved_token = token
+            self.generation += 1
+            self.ready = True
+        logger.info(f"Loaded search index snapshot {token}: {index.ntotal} vectors")
+        return True
+
+    def nbytes(self) -> int:
+        """Approximate bytes of the vector codes"""
+        if self.ivf:
+            return self.ntotal * (self.dim + 16)  # 8-bit codes + id + hashtable entry
+        return self.ntotal * (self.dim * 4 + 8)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "type": f"ivf-sq8 (nlist={self.index.nlist}, nprobe={self.nprobe})" if self.ivf else "flat",
+            "vectors": self.ntotal,
+            "proposals": len(self.proposals),
+            "approx_bytes": self.nbytes(),
+            "searches": self.searches,
+            "refreshes": self.refreshes,
+            "snapshot": self.saved_token
+        }
+
+
+def attach_chunks(
+    index: GlobalSearchIndex,
+    hits: List[Tuple[str, str, float]],
+    limit: int,
+    matches_per_proposal: int = 3,
+    index_store: Optional[FAISSIndexStore] = None
+) -> List[Dict[str, Any]]:
+    """
+    Group chunk hits by proposal (best score first) and attach chunk text
+
+    Chunk text isn't held in memory; it is read from the proposal's stored
+    chunks file for the proposals that make the page.
+    """
+    grouped: Dict[str, List[Tuple[str, float]]] = {}
+    for proposal_id, chunk_key, score in hits:
+        if proposal_id not in grouped and len(grouped) >= limit:
+            continue
+        grouped.setdefault(proposal_id, []).append((chunk_key, score))
+
+    index_store = index_store or get_index_store()
+    results = []
+    for proposal_id, matches in grouped.items():
+        meta = dict(index.proposals.get(proposal_id) or {})
+        content_hash = meta.pop('content_hash', None)
+        stored = index_store.load_chunks(proposal_id, content_hash) if index_store and content_hash else None
+        chunks = {chunk['chunk_key']: chunk for chunk in stored or []}
+
+        result_matches = []
+        for chunk_key, score in matches[:matches_per_proposal]:
+            chunk = chunks.get(chunk_key, {})
+            result_matches.append({
+                "chunk_key": chunk_key,
+                "section": chunk.get('section'),
+                "type": chunk.get('type'),
+                "content": chunk.get('content'),
+                "score": round(score, 4)
+            })
+        results.append({
+            "proposal_id": proposal_id,
+            **meta,
+            "score": round(matches[0][1], 4),
+            "matches": result_matches
+        })
+    return results
+
+
+class SearchIndexRefresher:
+    """Background thread: load the snapshot, then refresh, retrain and save periodically"""
+
+    def __init__(
+        self,
+        index: GlobalSearchIndex,
+        directory: str,
+        interval_seconds: float,
+        session_factory=SessionLocal,
+        index_store: Optional[FAISSIndexStore] = None
+    ):
+        self.index = index
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self.index_store = index_store
+        self.last_refresh_seconds: Optional[float] = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self) -> Optional[Dict[str, int]]:
+        index_store = self.index_store or get_index_store()
+        if index_store is None:
+            logger.warning("RAG_INDEX_DIR is not set: the search index has no source of vectors")
+            self.index.ready = True
+            return None
+
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            counts = self.index.refresh(db, index_store)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Search index refresh failed: {e}")
+            return None
+        finally:
+            db.close()
+        self.index.maybe_rebuild()
+        self.last_refresh_seconds = time.perf_counter() - started
+
+        if counts["updated"] or counts["removed"]:
+            logger.info(f"Search index refreshed in {self.last_refresh_seconds:.1f}s: {counts}")
+        if self.directory and self.index.snapshot_token() != self.index.saved_token:
+            try:
+                self.index.save(self.directory)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Failed to save search index snapshot: {e}")
+        return counts
+
+    def _run(self):
+        if self.directory:
+            self.index.load(self.directory)
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_seconds)
+
+
+# Global search index of this worker (None until started at API startup)
+_search_index: Optional[GlobalSearchIndex] = None
+_refresher: Optional[SearchIndexRefresher] = None
+
+
+def get_search_index() -> Optional[GlobalSearchIndex]:
+    """This worker's cross-proposal search index, if started"""
+    return _search_index
+
+
+def start_search_index(model_id: str, dim: int = 384) -> Optional[GlobalSearchIndex]:
+    """Create the search index and its refresher thread (API startup)"""
+    global _search_index, _refresher
+    if faiss is None:
+        logger.warning("FAISS not available: proposal search disabled")
+        return None
+    if _search_index is None:
+        _search_index = GlobalSearchIndex(
+            dim,
+            model_id=model_id,
+            ivf_min_vectors=settings.SEARCH_INDEX_IVF_MIN_VECTORS,
+            nprobe=settings.SEARCH_INDEX_NPROBE
+        )
+        _refresher = SearchIndexRefresher(
+            _search_index,
+            settings.SEARCH_INDEX_DIR,
+            settings.SEARCH_INDEX_REFRESH_SECONDS
+        )
+        _refresher.start()
+    return _search_index
+
+
+def stop_search_index():
+    if _refresher is not None:
+        _refresher.stop()
@@ -0,0 +1,371 @@
+# app/services/structured_answers.py
+"""
+Deterministic answers to factual proposal questions, without the LLM
+
+Many client questions ("what is the total cost", "when is the event", "how
+many items in Audio", "how many wireless microphones") are answered by a
+single column of Proposal / ProposalSection / ProposalLineItem. This module
+extracts an intent and its slots with regular expressions and token
+matching, then fills a template from the proposal rows:
+
+    intent          slot           answered from
+    -------------   ------------   -----------------------------------------
+    total_cost      -              Proposal.total_cost (+ breakdown)
+    tax / service   -              Proposal.tax_amount / service_charge / ...
+    event_date      -              Proposal.start_date / end_date
+    venue           -              Proposal.venue_name / event_location
+    client / job    -              Proposal.client_name / job_number / status
+    section_*       section name   ProposalSection.section_total / items
+    item_*          item words     ProposalLineItem.quantity / unit_price
+
+Proposal-level intents are only answered when the whole question matches
+one of the intent's templates: a keyword alone ("labor", "venue", "status")
+says nothing about what is asked of it ("labor rate for a stagehand", "is
+the venue confirmed", "status of the shipment"). Section and item intents
+need the section name or the item's words to account for the question.
+
+Every extraction carries a confidence. Below FAST_PATH_MIN_CONFIDENCE,
+or for questions asking for reasons, changes or alternatives, answer()
+returns None and the caller uses the RAG / LLM path. stats() reports the
+share of questions served without an LLM call.
+"""
+
+import re
+import threading
+import time
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.config import settings
+from app.services.lexical_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Questions asking for judgement, changes or more than one thing go to the LLM
+_DEFER = re.compile(
+    r"\b(why|explain|describe|compare|recommend|suggest|alternatives?|replace(ment)?|instead|"
+    r"could|should|would|can (we|i|you)|change|modify|cheaper|smaller|bigger|larger|policy|"
+    r"refund|cancel\w*|deposit|support|deliver\w*|wait|earlier|confirm\w*)\b"
+)
+_MULTI_PART = re.compile(r"\?.+\S|\b(and|also|plus) (what|when|where|how|who|is|are)\b")
+
+_HOW_MANY = re.compile(r"\b(how many|quantity|number of|count)\b")
+_COST = re.compile(r"\b(how much|cost|costs|price|priced|pricing|rate|total|subtotal|charge)\b")
+_INCLUDED = re.compile(r"\b(is there|are there|do you have|do we have|included?|include[sd]?|get)\b")
+_LIST = re.compile(r"\b(what('s| is| are)? (in|included in)|what (items|equipment)|list)\b")
+
+# Proposal-level intents: (intent, whole-question templates). Matched against
+# the normalized question (lowercase, no trailing punctuation), so anything the
+# templates don't cover -- rates, hours, yes/no, other nouns -- goes to the LLM.
+_WHAT_IS = r"(what('s| is| are)|tell me|show( me)?) (the |our |my )?"
+_OF_PROPOSAL = r"( (of|for|on) (the|this|our|my) (proposal|quote|event|order))?"
+_PROPOSAL_INTENTS = [
+    ("total_cost", re.compile(
+        rf"^({_WHAT_IS}(grand total|total( cost| price| amount)?|final (price|cost|amount|total|bill|pay\w*)|"
+        r"overall (cost|price)|full price)|how much is the (final|total)( price| cost| amount| bill)?|"
+        r"how much (is|does|will) (it|this|everything|the (event|proposal|quote|order|whole thing))"
+        r"( cost)?( in total)?)"
+        rf"{_OF_PROPOSAL}( (with|including|after) (tax|taxes|everything))?$"
+    )),
+    ("tax", re.compile(
+        rf"^({_WHAT_IS}(total |sales )?(tax|taxes)( amount| total)?|how much (is (the )?)?(sales )?tax)"
+        rf"{_OF_PROPOSAL}$"
+    )),
+    ("service_charge", re.compile(
+        rf"^({_WHAT_IS}|how much is the )service (charge|fee)( amount| total)?{_OF_PROPOSAL}$"
+    )),
+    ("labor_total", re.compile(
+        rf"^({_WHAT_IS}(total )?labou?r( cost| costs| total| charges?)?|"
+        r"how much (is|does) (the )?(total )?labou?r( cost)?)"
+        rf"{_OF_PROPOSAL}$"
+    )),
+    ("discount", re.compile(rf"^({_WHAT_IS}|how much is the )discount( amount)?{_OF_PROPOSAL}$")),
+    ("event_date", re.compile(
+        r"^(when('s| is) (the |our |my )?(event|conference|meeting|show|it)|"
+        r"when does (the |our )?(event|conference|meeting|show) (start|take place|happen)|"
+        rf"{_WHAT_IS}(event )?dates?( of the (event|conference|meeting|show))?|"
+        r"(what|which) (day|date)s? is (the |our )?(event|conference|meeting|show)( on)?)$"
+    )),
+    ("venue", re.compile(
+        r"^(where('s| is) (the |our )?(event|conference|meeting|show|venue|it)( being)?( held| located)?|"
+        r"where (will|does) (the |our )?(event|conference|meeting|show|it) (be|take place)( held)?|"
+        rf"{_WHAT_IS}(venue|location|address|event location|venue address)( of the (event|venue))?)$"
+    )),
+    ("client", re.compile(
+        rf"^(who is the client|{_WHAT_IS}client('s)? name|which client is (this|it)( for)?){_OF_PROPOSAL}$"
+    )),
+    ("job_number", re.compile(rf"^{_WHAT_IS}job (number|#|no){_OF_PROPOSAL}$")),
+    ("status", re.compile(rf"^{_WHAT_IS}(proposal |quote )?status{_OF_PROPOSAL}$")),
+]
+
+# Words that say what is being asked rather than which item it is about
+_QUESTION_WORDS = set(tokenize(
+    "how many much cost price priced pricing rate total subtotal quantity number count included include "
+    "including get have there need item items thing things line unit each per pay paying rental rent "
+    "proposal quote section provided listed order ordered please tell show me"
+))
+
+
+def _money(value: Any) -> str:
+    try:
+        return f"${Decimal(str(value or 0)):,.2f}"
+    except InvalidOperation:
+        return f"${value}"
+
+
+def _date(value: Any) -> str:
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value[:10])
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return f"{value:%A}, {value:%B} {value.day}, {value.year}"
+    return str(value)
+
+
+def _plural(count: int, word: str) -> str:
+    return f"{count} {word}" + ("" if count == 1 else "s")
+
+
+class StructuredAnswerer:
+    """Intent-and-slot extractor with templated answers over proposal rows"""
+
+    def __init__(self, min_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        self.questions = 0
+        self.served = 0
+        self.by_intent: Dict[str, int] = {}
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def answer(self, question: str, proposal: Any) -> Optional[Dict[str, Any]]:
+        """
+        Templated answer in the answer_question() result format, or None
+
+        None means the question needs retrieval and the LLM (no intent, low
+        confidence, or a question asking for judgement or changes).
+        """
+        started = time.perf_counter()
+        try:
+            extracted = self.extract(question, proposal)
+        except Exception as e:
+            logger.warning(f"Structured answer extraction failed for '{question}': {e}")
+            extracted = None
+        served = extracted is not None and extracted[1] >= self.min_confidence
+
+        with self._lock:
+            self.questions += 1
+            self.seconds += time.perf_counter() - started
+            if served:
+                self.served += 1
+                self.by_intent[extracted[0]] = self.by_intent.get(extracted[0], 0) + 1
+        if not served:
+            return None
+
+        intent, confidence, answer, sources = extracted
+        return {
+            'answer': answer,
+            'method': 'structured',
+            'confidence': round(confidence, 2),
+            'sources': sources,
+            'reasoning': f"Answered from proposal data ({intent}) without calling the AI model",
+            'intent': intent
+        }
+
+    def extract(self, question: str, proposal: Any) -> Optional[Tuple[str, float, str, List[Dict[str, Any]]]]:
+        """(intent, confidence, answer, sources) for the question, or None"""
+        text = re.sub(r"\s+", " ", question.lower()).strip()
+        if not text or _DEFER.search(text) or _MULTI_PART.search(text.rstrip("?. ")):
+            return None
+
+        terms = set(tokenize(text))
+        sections = list(proposal.sections or [])
+
+        section, section_score = self._match_section(terms, sections)
+        item_terms = terms - _QUESTION_WORDS
+        if section is not None:
+            item_terms -= set(tokenize(section.section_name))
+
+        items, item_score = self._match_items(item_terms, sections)
+        if items and item_score >= section_score:
+            return self._item_answer(text, items, item_score)
+        if section is not None:
+            return self._section_answer(text, section, section_score)
+
+        # The whole question has to be one intent's template; a keyword alone isn't enough
+        whole = text.rstrip("?.! ")
+        intents = [intent for intent, template in _PROPOSAL_INTENTS if template.match(whole)]
+        if len(intents) != 1:
+            return None
+        answer, sources = self._proposal_answer(intents[0], proposal)
+        if answer is None:
+            return None
+        return intents[0], 0.95, answer, sources
+
+    @staticmethod
+    def _match_section(terms, sections) -> Tuple[Any, float]:
+        """Section whose name words all appear in the question (best coverage wins, ties lose)"""
+        best, best_score, tied = None, 0.0, False
+        for section in sections:
+            name_terms = set(tokenize(section.section_name)) - {"section"}
+            if not name_terms:
+                continue
+            score = len(name_terms & terms) / len(name_terms)
+            if score > best_score:
+                best, best_score, tied = section, score, False
+            elif score == best_score and score > 0:
+                tied = True
+        if best is None or best_score < 1.0 or tied:
+            return None, 0.0
+        return best, 0.95
+
+    @staticmethod
+    def _match_items(terms, sections) -> Tuple[List[Tuple[Any, Any]], float]:
+        """
+        Line items matching the question's content words
+
+        Score is the share of content words found in the item description
+        (and item number); every item reaching the best score is returned.
+        """
+        if not terms:
+            return [], 0.0
+        scored = []
+        for section in sections:
+            for item in section.items or []:
+                item_terms = set(tokenize(f"{item.description} {item.item_number or ''}"))
+                score = len(terms & item_terms) / len(terms)
+                if score > 0:
+                    scored.append((score, section, item))
+        if not scored:
+            return [], 0.0
+        best = max(score for score, _, _ in scored)
+        items = [(section, item) for score, section, item in scored if score == best]
+        # One content word can match many unrelated items ("speaker"); that's only confident if few match
+        confidence = best * (0.95 if len(terms) > 1 or len(items) <= 3 else 0.6)
+        return items, confidence
+
+    @staticmethod
+    def _item_answer(text, items, confidence):
+        sources = [{'section': section.section_name, 'type': 'line_item', 'relevance': 0.0}
+                   for section, _ in items[:3]]
+        lines = [
+            f"{item.quantity or 1} x {item.description} ({section.section_name}) at "
+            f"{_money(item.unit_price)} each, {_money(item.subtotal)} total"
+            for section, item in items
+        ]
+        total_quantity = sum(item.quantity or 1 for _, item in items)
+
+        if _HOW_MANY.search(text):
+            intent = "item_quantity"
+            if len(items) == 1:
+                section, item = items[0]
+                answer = f"The proposal includes {item.quantity or 1} x {item.description} ({section.section_name})."
+            else:
+                answer = f"The proposal includes {total_quantity} in total across {len(items)} line items:\n" + \
+                    "\n".join(f"- {line}" for line in lines)
+        elif _COST.search(text):
+            intent = "item_price"
+            answer = "\n".join(f"- {line}" for line in lines) if len(items) > 1 else f"{lines[0]}."
+        elif _INCLUDED.search(text):
+            intent = "item_included"
+            answer = "Yes, the proposal includes:\n" + "\n".join(f"- {line}" for line in lines)
+        else:
+            return None
+        return intent, confidence, answer, sources
+
+    @staticmethod
+    def _section_answer(text, section, confidence):
+        items = list(section.items or [])
+        sources = [{'section': section.section_name, 'type': 'section', 'relevance': 0.0}]
+        name = section.section_name
+        if _HOW_MANY.search(text):
+            quantity = sum(item.quantity or 1 for item in items)
+            answer = f"The {name} section has {_plural(len(items), 'line item')} ({quantity} units in total)"
+            answer += ":\n" + "\n".join(f"- {item.quantity or 1} x {item.description}" for item in items) \
+                if items else "."
+            return "section_item_count", confidence, answer, sources
+        if _COST.search(text):
+            answer = f"The {name} section totals {_money(section.section_total)}."
+            return "section_total", confidence, answer, sources
+        if _LIST.search(text) or _INCLUDED.search(text):
+            if not items:
+                return "section_items", confidence, f"The {name} section has no line items.", sources
+            answer = f"The {name} section includes:\n" + "\n".join(
+                f"- {item.quantity or 1} x {item.description}" for item in items
+            )
+            return "section_items", confidence, answer, sources
+        return None
+
+    @staticmethod
+    def _proposal_answer(intent, proposal) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        pricing = [{'section': 'Pricing', 'type': 'pricing', 'relevance': 0.0}]
+        overview = [{'section': 'General Information', 'type': 'overview', 'relevance': 0.0}]
+
+        if intent == "total_cost":
+            parts = [
+                (label, value) for label, value in (
+                    ("products", proposal.product_total), ("labor", proposal.labor_total),
+                    ("service charge", proposal.service_charge), ("tax", proposal.tax_amount)
+                ) if value
+            ]
+            answer = f"The total cost of the proposal is {_money(proposal.total_cost)}"
+            if parts:
+                answer += " (" + ", ".join(f"{label} {_money(value)}" for label, value in parts) + ")"
+            return answer + ".", pricing
+        if intent == "tax":
+            return f"The tax amount is {_money(proposal.tax_amount)}.", pricing
+        if intent == "service_charge":
+            return f"The service charge is {_money(proposal.service_charge)}.", pricing
+        if intent == "labor_total":
+            labor = list(proposal.labor or [])
+            answer = f"Labor totals {_money(proposal.labor_total)}"
+            if labor:
+                answer += f" across {_plural(len(labor), 'labor line')}"
+            return answer + ".", pricing
+        if intent == "discount":
+            return f"The product discount is {_money(proposal.product_discount)}.", pricing
+        if intent == "event_date":
+            start, end = proposal.start_date, proposal.end_date
+            if not start:
+                return None, overview
+            if not end or str(end) == str(start):
+                return f"The event is on {_date(start)}.", overview
+            return f"The event runs from {_date(start)} to {_date(end)}.", overview
+        if intent == "venue":
+            place = ", ".join(part for part in (proposal.venue_name, proposal.event_location) if part)
+            return (f"The event is at {place}." if place else None), overview
+        if intent == "client":
+            company = f" ({proposal.client_company})" if proposal.client_company else ""
+            return f"The client is {proposal.client_name}{company}.", overview
+        if intent == "job_number":
+            return f"The job number is {proposal.job_number}.", overview
+        if intent == "status":
+            return f"The proposal status is {proposal.status}.", overview
+        return None, []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "questions": self.questions,
+                "served_without_llm": self.served,
+                "served_pct": round(100.0 * self.served / self.questions, 1) if self.questions else 0.0,
+                "by_intent": dict(self.by_intent),
+                "mean_us": round(self.seconds / self.questions * 1e6, 1) if self.questions else 0.0
+            }
+
+
+# Global structured answerer
+_structured_answerer: Optional[StructuredAnswerer] = None
+
+
+def get_structured_answerer() -> StructuredAnswerer:
+    """Get or create the global structured answerer"""
+    global _structured_answerer
+    if _structured_answerer is None:
+        _structured_answerer = StructuredAnswerer(min_confidence=settings.FAST_PATH_MIN_CONFIDENCE)
+    return _structured_answerer
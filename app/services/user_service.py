@@ -1,7 +1,13 @@
 # app/services/user_service.py
 from sqlalchemy.orm import Session
 from app.models.users import User, PreApprovedUser
+from app.database import SessionLocal
+from app.config import settings
+from app.core.cache import LRUCache
 from datetime import datetime
+from typing import Dict, Optional, Any
+import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,85 +16,189 @@ class UserValidationError(Exception):
     """Raised when user is not authorized"""
     pass
 
+_MISSING = object()
+
+class ApprovedUserCache:
+    """
+    Snapshot of active pre-approved users by email, with a short TTL
+
+    Keys are the email exactly as given, matching the exact lookup in
+    UserService. Unapproved emails are cached too (as None) so repeated
+    attempts from an unknown account don't hit the database on every request.
+
+    The cache is per process: invalidate() only clears the worker it runs
+    in; the others pick up changes once their entries expire (ttl_seconds).
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 5000):
+        self.cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, email: str) -> Any:
+        return self.cache.get(email, _MISSING)
+
+    def set(self, email: str, approved: Optional[Dict[str, Any]]):
+        self.cache.set(email, approved)
+
+    def invalidate(self, email: Optional[str] = None):
+        """Drop one email, or the whole cache after bulk changes to pre_approved_users"""
+        if email:
+            self.cache.pop(email)
+        else:
+            self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+class LastLoginRecorder:
+    """
+    Collects logins in memory and writes them in one periodic batch
+
+    The flush creates missing active_users rows, syncs profile fields from the
+    pre-approved record, and stamps last_login, all in a single transaction.
+    """
+
+    def __init__(self, session_factory=SessionLocal, interval_seconds: float = 30):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+
+    def record(self, cognito_data: dict, approved: Dict[str, Any]):
+        """Remember a login; later logins for the same user overwrite earlier ones"""
+        with self._lock:
+            self._pending[cognito_data["user_id"]] = {
+                "cognito_data": cognito_data,
+                "approved": approved,
+                "login_at": datetime.utcnow()
+            }
+
+    def flush(self) -> int:
+        """Write all pending logins; returns the number of users written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = self.session_factory()
+        try:
+            for user_id, login in pending.items():
+                self._apply_login(db, user_id, login)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush {len(pending)} logins: {e}")
+            with self._lock:
+                for user_id, login in pending.items():
+                    self._pending.setdefault(user_id, login)
+            return 0
+        finally:
+            db.close()
+
+        self.flushed += len(pending)
+        logger.info(f"Flushed last_login for {len(pending)} users")
+        return len(pending)
+
+    @staticmethod
+    def _apply_login(db: Session, user_id: str, login: Dict[str, Any]):
+        approved = login["approved"]
+        login_at = login["login_at"]
+
+        user = db.query(User).filter(User.user_id == user_id).first()
+        if user:
+            user.last_login = login_at
+            # Sync any updated info from pre-approved record
+            user.full_name = approved["full_name"] or user.full_name
+            user.company = approved["company"] or user.company
+            user.department = approved["department"] or user.department
+            user.roles = approved["roles"] or user.roles
+        else:
+            db.add(User(
+                user_id=user_id,
+                email=approved["email"],
+                full_name=approved["full_name"] or login["cognito_data"].get("full_name", ""),
+                company=approved["company"],
+                department=approved["department"],
+                roles=approved["roles"] or ["user"],
+                is_active=True,
+                last_login=login_at,
+                pre_approved_id=approved["id"]
+            ))
+
+        # Optional: Update pre-approved record with Cognito ID for tracking
+        if not approved["cognito_user_id"]:
+            pre_approved = db.query(PreApprovedUser).filter(
+                PreApprovedUser.id == approved["id"]
+            ).first()
+            if pre_approved and not pre_approved.cognito_user_id:
+                pre_approved.cognito_user_id = user_id
+                pre_approved.last_login = login_at
+
+    async def run(self):
+        """Flush loop, started from the application lifespan"""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the flush loop and write whatever is still pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self._pending), "flushed": self.flushed}
+
+
 class UserService:
     def __init__(self, db: Session):
         self.db = db
-    
-    def validate_and_get_user(self, cognito_data: dict) -> User:
-        """Check if user is pre-approved, then get or create session record"""
-        
-        email = cognito_data.get("email")
-        cognito_user_id = cognito_data.get("user_id")
-        
-        if not email:
-            raise UserValidationError("No email found in token")
-        
-        # Check pre-approved users table (read-only)
+
+    def get_approved_user(self, email: str) -> Optional[Dict[str, Any]]:
+        """Read-only snapshot of an active pre-approved user, or None"""
         pre_approved = self.db.query(PreApprovedUser).filter(
             PreApprovedUser.email == email,
             PreApprovedUser.is_active == True
         ).first()
-        
+
         if not pre_approved:
-            logger.warning(f"Unauthorized login attempt: {email}")
-            raise UserValidationError(f"User {email} is not authorized to access this system")
-        
-        # Check if active session exists
-        user = self.db.query(User).filter(
-            User.user_id == cognito_user_id
-        ).first()
-        
-        if user:
-            # Update existing session
-            user.last_login = datetime.utcnow()
-            # Sync any updated info from pre-approved record
-            user.full_name = pre_approved.full_name or user.full_name
-            user.company = pre_approved.company or user.company
-            user.department = pre_approved.department or user.department
-            user.roles = pre_approved.roles or user.roles
-            self.db.commit()
-            logger.info(f"Updated session for user: {email}")
-            return user
-        
-        # Create new session from pre-approved data
-        user = User(
-            user_id=cognito_user_id,
-            email=pre_approved.email,
-            full_name=pre_approved.full_name or cognito_data.get("full_name", ""),
-            company=pre_approved.company,
-            department=pre_approved.department,
-            roles=pre_approved.roles or ["user"],
-            is_active=True,
-            last_login=datetime.utcnow(),
-            pre_approved_id=pre_approved.id
-        )
-        
-        # Optional: Update pre-approved record with Cognito ID for tracking
-        if not pre_approved.cognito_user_id:
-            pre_approved.cognito_user_id = cognito_user_id
-            pre_approved.last_login = datetime.utcnow()
-        
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        
-        logger.info(f"Created session for pre-approved user: {email}")
-        return user
-    
+            return None
+
+        return {
+            "id": pre_approved.id,
+            "email": pre_approved.email,
+            "full_name": pre_approved.full_name,
+            "company": pre_approved.company,
+            "department": pre_approved.department,
+            "roles": pre_approved.roles,
+            "cognito_user_id": pre_approved.cognito_user_id
+        }
+
     def is_user_approved(self, email: str) -> bool:
         """Simple check if user is in approved list"""
         return self.db.query(PreApprovedUser).filter(
             PreApprovedUser.email == email,
             PreApprovedUser.is_active == True
         ).first() is not None
-    
+
     def get_user_by_email(self, email: str) -> User:
         """Get active user by email"""
         return self.db.query(User).filter(
             User.email == email,
             User.is_active == True
         ).first()
-    
+
     def deactivate_user_session(self, user_id: str) -> bool:
         """Deactivate user session"""
         user = self.db.query(User).filter(User.user_id == user_id).first()
@@ -96,4 +206,65 @@ class UserService:
             user.is_active = False
             self.db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+def _load_approved_user(email: str) -> Optional[Dict[str, Any]]:
+    with SessionLocal() as db:
+        return UserService(db).get_approved_user(email)
+
+
+async def authorize_user(cognito_data: dict) -> Dict[str, Any]:
+    """
+    Check a validated Cognito identity against the pre-approved list
+
+    Read-only on the request path: the approval lookup is cached and the
+    last_login/session upsert is deferred to the LastLoginRecorder flush.
+    Returns the request.state.user dict.
+    """
+    email = cognito_data.get("email")
+    if not email:
+        raise UserValidationError("No email found in token")
+
+    cache = get_approved_user_cache()
+    approved = cache.get(email)
+    if approved is _MISSING:
+        approved = await asyncio.to_thread(_load_approved_user, email)
+        cache.set(email, approved)
+
+    if not approved:
+        logger.warning(f"Unauthorized login attempt: {email}")
+        raise UserValidationError(f"User {email} is not authorized to access this system")
+
+    get_login_recorder().record(cognito_data, approved)
+
+    return {
+        "user_id": cognito_data.get("user_id"),
+        "email": approved["email"],
+        "full_name": approved["full_name"] or cognito_data.get("full_name", ""),
+        "roles": approved["roles"] or ["user"],
+        "company": approved["company"],
+        "department": approved["department"],
+        "is_active": True
+    }
+
+
+# Global instances
+_approved_user_cache: Optional[ApprovedUserCache] = None
+_login_recorder: Optional[LastLoginRecorder] = None
+
+
+def get_approved_user_cache() -> ApprovedUserCache:
+    """Get or create global pre-approved user cache"""
+    global _approved_user_cache
+    if _approved_user_cache is None:
+        _approved_user_cache = ApprovedUserCache(ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS)
+    return _approved_user_cache
+
+
+def get_login_recorder() -> LastLoginRecorder:
+    """Get or create global last_login recorder"""
+    global _login_recorder
+    if _login_recorder is None:
+        _login_recorder = LastLoginRecorder(interval_seconds=settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS)
+    return _login_recorder
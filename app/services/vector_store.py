@@ -0,0 +1,408 @@
+# app/services/vector_store.py
+"""
+Incrementally updatable per-proposal vector store
+
+Every chunk produced by RAGService.extract_proposal_content carries a stable
+chunk_key ("overview", "item:<uuid>", "labor:<uuid>", ...). The key maps to a
+64-bit FAISS id and the chunk text to a content hash, so re-syncing a
+proposal only re-embeds chunks that were added or whose text changed, and
+removes the ids of chunks that disappeared.
+
+Two representations, chosen by chunk count:
+
+- Compact (up to compact_max_chunks chunks, i.e. most proposals): the
+  proposal's normalized vectors are a row range of a VectorArena, one
+  contiguous float16/float32 matrix shared by all proposals in the process.
+  Search is an exact dot product over the range with an argpartition top-k.
+- FAISS: an IndexIDMap2 over IndexFlatL2, updated with remove_ids/add_with_ids.
+
+Either way relevance_score is a squared L2 distance (for normalized vectors,
+2 - 2 * cosine), and indexes are persisted in FAISS format.
+
+hybrid_search() fuses the vector ranking with a BM25 ranking over the same
+chunks (lexical_index.py), built lazily from the chunk text on first use.
+"""
+
+import hashlib
+import logging
+import threading
+import weakref
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_id(chunk_key: str) -> int:
+    """Stable non-negative int64 FAISS id for a chunk key"""
+    return int.from_bytes(hashlib.sha256(chunk_key.encode()).digest()[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def chunk_hash(chunk: Dict[str, Any], model_id: str = "") -> str:
+    """Hash of a chunk's text and the model that embeds it"""
+    return hashlib.sha256(f"{model_id}\0{chunk['content']}".encode()).hexdigest()[:16]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class VectorArena:
+    """
+    One contiguous matrix holding the vectors of many proposals
+
+    allocate() appends a row range and returns a handle; release() marks it
+    dead. Rows are never overwritten in place: growth and compaction (once
+    dead rows outnumber live ones) build a new matrix, so a view handed out
+    earlier stays valid for a search that is still using it.
+    """
+
+    def __init__(self, dim: int, dtype: Any = np.float16, initial_rows: int = 1024):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.initial_rows = initial_rows
+        self._data = np.zeros((initial_rows, dim), dtype=self.dtype)
+        self._used = 0
+        self._live = 0
+        self._segments: Dict[int, Tuple[int, int]] = {}  # handle -> (start, count)
+        self._next_handle = 0
+        self._lock = threading.Lock()
+        self.compactions = 0
+
+    def allocate(self, vectors: np.ndarray) -> int:
+        count = len(vectors)
+        with self._lock:
+            if self._used + count > len(self._data):
+                self._reallocate(max(len(self._data) * 3 // 2, self._live + count))
+            start = self._used
+            self._data[start:start + count] = vectors
+            self._used += count
+            self._live += count
+            handle = self._next_handle
+            self._next_handle += 1
+            self._segments[handle] = (start, count)
+            return handle
+
+    def release(self, handle: int):
+        with self._lock:
+            segment = self._segments.pop(handle, None)
+            if segment is None:
+                return
+            self._live -= segment[1]
+            dead = self._used - self._live
+            if dead > self._live and dead > self.initial_rows:
+                self._reallocate(max(int(self._live * 1.5), self.initial_rows))
+                self.compactions += 1
+
+    def _reallocate(self, rows: int):
+        """Copy live segments, in order, into a new matrix of `rows` rows"""
+        data = np.zeros((max(rows, self._live), self.dim), dtype=self.dtype)
+        offset = 0
+        for handle, (start, count) in sorted(self._segments.items(), key=lambda item: item[1][0]):
+            data[offset:offset + count] = self._data[start:start + count]
+            self._segments[handle] = (offset, count)
+            offset += count
+        self._data = data
+        self._used = offset
+
+    def view(self, handle: int) -> Optional[np.ndarray]:
+        """The segment's rows, or None once it has been released"""
+        with self._lock:
+            segment = self._segments.get(handle)
+            if segment is None:
+                return None
+            start, count = segment
+            return self._data[start:start + count]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "dtype": self.dtype.name,
+                "segments": len(self._segments),
+                "live_rows": self._live,
+                "dead_rows": self._used - self._live,
+                "capacity_rows": len(self._data),
+                "bytes": self._data.nbytes,
+                "compactions": self.compactions
+            }
+
+
+class ProposalVectorStore:
+    """Vectors (arena rows or a FAISS index) plus the chunks they were built from, keyed by FAISS id"""
+
+    def __init__(
+        self,
+        dim: int,
+        index: Any = None,
+        chunks: Optional[List[Dict[str, Any]]] = None,
+        model_id: str = "",
+        arena: Optional[VectorArena] = None,
+        compact_max_chunks: int = 0
+    ):
+        self.dim = dim
+        # Part of every chunk hash: vectors from another embedding backend
+        # (e.g. after switching to int8) count as changed and are re-embedded
+        self.model_id = model_id
+        self.arena = arena
+        self.compact_max_chunks = compact_max_chunks
+        self.index = None
+        # Compact representation: (arena handle, FAISS ids of its rows), swapped as one
+        self._compact: Optional[Tuple[int, np.ndarray]] = None
+        self._release: Optional[weakref.finalize] = None
+
+        self.chunks: Dict[int, Dict[str, Any]] = {}
+        for chunk in chunks or []:
+            self.chunks[chunk_id(chunk['chunk_key'])] = chunk
+        self.content_version: Optional[str] = None  # proposal_service.get_proposal_content_version
+        self.content_hash: Optional[str] = None  # index_store.chunks_content_hash of the indexed chunks
+        # (chunks dict it was built from, BM25 index); rebuilt once sync replaces the dict
+        self._lexical: Optional[Tuple[Dict[int, Dict[str, Any]], BM25Index]] = None
+
+        if index is not None and self._use_compact(index.ntotal):
+            ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+            self._set_compact(ids, self._reconstruct(index, ids))
+        elif index is not None:
+            self.index = index
+        elif not self._use_compact(0):
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def compact(self) -> bool:
+        return self.index is None
+
+    @property
+    def ntotal(self) -> int:
+        """Number of vectors in the index"""
+        if self.index is not None:
+            return self.index.ntotal
+        return len(self._compact[1]) if self._compact else 0
+
+    def _use_compact(self, count: int) -> bool:
+        return self.arena is not None and count <= self.compact_max_chunks
+
+    def chunk_list(self) -> List[Dict[str, Any]]:
+        return list(self.chunks.values())
+
+    def sync(self, chunks: List[Dict[str, Any]], embed: Callable[[List[str]], np.ndarray]) -> Dict[str, int]:
+        """
+        Bring the index in line with the proposal's current chunks
+
+        Returns counts of added, updated, removed and unchanged chunks; only
+        added and updated chunks are embedded.
+        """
+        current: Dict[int, Dict[str, Any]] = {}
+        for chunk in chunks:
+            chunk['content_hash'] = chunk_hash(chunk, self.model_id)
+            current[chunk_id(chunk['chunk_key'])] = chunk
+
+        removed = [cid for cid in self.chunks if cid not in current]
+        updated = [
+            cid for cid, chunk in current.items()
+            if cid in self.chunks and self.chunks[cid].get('content_hash') != chunk['content_hash']
+        ]
+        added = [cid for cid in current if cid not in self.chunks]
+        counts = {
+            "added": len(added),
+            "updated": len(updated),
+            "removed": len(removed),
+            "unchanged": len(current) - len(added) - len(updated)
+        }
+
+        if removed or updated or added:
+            to_embed = updated + added
+            embeddings = np.zeros((0, self.dim), dtype=np.float32)
+            if to_embed:
+                embeddings = np.asarray(embed([current[cid]['content'] for cid in to_embed]), dtype=np.float32)
+
+            if self._use_compact(len(current)) or self.index is None:
+                # Small proposals get fresh arena rows (a copy-on-write of a few
+                # hundred rows); a proposal outgrowing the arena moves to FAISS
+                fresh = set(to_embed)
+                kept = [cid for cid in current if cid not in fresh]
+                ids = np.array(kept + to_embed, dtype=np.int64)
+                vectors = np.vstack([self._vectors(kept), embeddings])
+                if self._use_compact(len(current)):
+                    self._set_compact(ids, vectors)
+                else:
+                    self.index = self._build_index(ids, vectors)
+                    self._drop_compact()
+            else:
+                # Copy-on-write: concurrent searches keep using the old index
+                index = faiss.clone_index(self.index)
+                stale = removed + updated
+                if stale:
+                    index.remove_ids(np.array(stale, dtype=np.int64))
+                if to_embed:
+                    index.add_with_ids(embeddings, np.array(to_embed, dtype=np.int64))
+                self.index = index
+
+        self.chunks = current
+        return counts
+
+    def _set_compact(self, ids: np.ndarray, vectors: np.ndarray):
+        # Rows go back to the arena when this store is dropped (LRU eviction)
+        # or when a later sync replaces them
+        handle = self.arena.allocate(normalize_rows(vectors))
+        previous = self._release
+        self._compact = (handle, ids)
+        self._release = weakref.finalize(self, self.arena.release, handle)
+        self.index = None
+        if previous is not None:
+            previous()
+
+    def _drop_compact(self):
+        if self._release is not None:
+            self._release()
+        self._compact = None
+        self._release = None
+
+    def _vectors(self, ids: List[int]) -> np.ndarray:
+        """Current vectors of the given chunk ids"""
+        if not ids:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self.index is not None:
+            return self._reconstruct(self.index, ids)
+        handle, row_ids = self._compact
+        rows = {int(cid): row for row, cid in enumerate(row_ids)}
+        return self.arena.view(handle)[[rows[int(cid)] for cid in ids]].astype(np.float32)
+
+    def chunk_vectors(self, chunk_keys: List[str]) -> np.ndarray:
+        """Stored vectors of the given chunks (e.g. for the global search index)"""
+        return self._vectors([chunk_id(key) for key in chunk_keys])
+
+    @staticmethod
+    def _reconstruct(index: Any, ids) -> np.ndarray:
+        if not len(ids):
+            return np.zeros((0, index.d), dtype=np.float32)
+        return np.vstack([index.reconstruct(int(cid)) for cid in ids])
+
+    def _build_index(self, ids: np.ndarray, vectors: np.ndarray) -> Any:
+        index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
+        if len(ids):
+            index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+        return index
+
+    def faiss_index(self) -> Any:
+        """FAISS form of the store, for persisting with the index store"""
+        if self.index is not None:
+            return self.index
+        if not self._compact:
+            return self._build_index(np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32))
+        handle, ids = self._compact
+        return self._build_index(ids, self.arena.view(handle).astype(np.float32))
+
+    def search(self, embedding: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Nearest chunks (copies, with relevance_score = squared L2 distance)"""
+        chunks = self.chunks
+        index = self.index
+        if index is None:
+            return self._search_compact(chunks, embedding, top_k)
+
+        distances, ids = index.search(embedding.reshape(1, -1).astype('float32'), top_k)
+        # FAISS pads with -1 when the index has fewer than top_k vectors
+        return [
+            dict(chunks[int(cid)], relevance_score=float(distance))
+            for cid, distance in zip(ids[0], distances[0])
+            if int(cid) in chunks
+        ]
+
+    def _search_compact(self, chunks, embedding: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        # A concurrent sync may release the rows between reading the handle
+        # and viewing them; the replacement is already in place by then
+        for _ in range(3):
+            compact = self._compact
+            if not compact or top_k <= 0 or not len(compact[1]):
+                return []
+            handle, ids = compact
+            vectors = self.arena.view(handle)
+            if vectors is not None:
+                break
+        else:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.sqrt(query @ query)), 1e-12)
+        scores = vectors.astype(np.float32, copy=False) @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            dict(chunks[int(ids[row])], relevance_score=max(0.0, 2.0 - 2.0 * float(scores[row])))
+            for row in top
+            if int(ids[row]) in chunks
+        ]
+
+    def lexical_index(self) -> BM25Index:
+        """BM25 index of the current chunks"""
+        chunks = self.chunks
+        lexical = self._lexical
+        if lexical is None or lexical[0] is not chunks:
+            lexical = (chunks, BM25Index((cid, chunk['content']) for cid, chunk in chunks.items()))
+            self._lexical = lexical
+        return lexical[1]
+
+    def hybrid_search(
+        self,
+        embedding: Optional[np.ndarray],
+        query: str,
+        top_k: int,
+        candidates: int = 20,
+        rrf_k: int = 60,
+        min_score_ratio: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Vector and BM25 rankings merged with reciprocal-rank fusion
+
+        Each ranking contributes its best `candidates` chunks. Chunks whose
+        fused score is below min_score_ratio of the best one are dropped even
+        within top_k, so a question matched exactly by one chunk (an item
+        number, a model name) doesn't get padded with weak neighbours.
+        Overlapping chunks (items inside their section) are left for
+        prompt_builder.pack_chunks to resolve. Results carry fusion_score and
+        lexical_score; relevance_score is the L2 distance and is only present
+        when the chunk was also a vector hit.
+        """
+        chunks = self.chunks
+        vector_hits = self.search(embedding, candidates) if embedding is not None else []
+        by_id = {chunk_id(chunk['chunk_key']): chunk for chunk in vector_hits}
+        lexical_hits = self.lexical_index().search(query, candidates)
+        lexical_scores = dict(lexical_hits)
+
+        fused = reciprocal_rank_fusion([list(by_id), [cid for cid, _ in lexical_hits]], rrf_k=rrf_k)
+        if not fused:
+            return []
+        threshold = fused[0][1] * min_score_ratio
+        results = []
+        for cid, score in fused[:top_k]:
+            if score < threshold:
+                break
+            chunk = by_id.get(cid) or chunks.get(cid)
+            if chunk is None:
+                continue
+            results.append(dict(chunk, fusion_score=score, lexical_score=lexical_scores.get(cid, 0.0)))
+        return results
+
+    def nbytes(self, chunk_overhead: int = 400) -> int:
+        """Approximate resident bytes: vectors, ids, chunk text and the BM25 index once built"""
+        itemsize = 4 if self.index is not None else self.arena.dtype.itemsize
+        vector_bytes = self.ntotal * (self.dim * itemsize + 8)
+        chunk_bytes = sum(len(chunk['content'].encode()) + chunk_overhead for chunk in self.chunks.values())
+        lexical_bytes = self._lexical[1].nbytes() if self._lexical else 0
+        return vector_bytes + chunk_bytes + lexical_bytes
@@ -18,6 +18,8 @@ from app.models.proposals import (
     Proposal, ProposalSection, ProposalLineItem,
     ProposalTimeline, ProposalLabor
 )
+from app.services.proposal_cache import invalidate_proposal_cache
+from app.services.rag_service import index_proposal_by_id
 
 def create_test_proposal(db):
     """Create a test proposal with comprehensive data for RAG testing"""
@@ -365,6 +367,8 @@ def create_test_proposal(db):
         db.add(labor)
 
     db.commit()
+    invalidate_proposal_cache(proposal.id)
+    print(f"✓ RAG index: {index_proposal_by_id(proposal.id)}")
     print("✓ Created complete test proposal with sections, items, timeline, and labor")
 
     return proposal
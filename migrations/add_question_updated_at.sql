@@ -0,0 +1,30 @@
+-- Migration: Add updated_at to proposal_questions table
+-- Created: 2026-10-17
+-- Description: Tracks the last change to a question so the proposal detail
+-- cache stamp notices edits that don't touch answered_at (status, priority)
+
+-- Add the updated_at column
+ALTER TABLE proposal_questions
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+
+-- Add comment for documentation
+COMMENT ON COLUMN proposal_questions.updated_at IS 'Last change to the question (set by the application on every update)';
+
+-- Backfill existing records from their latest known change
+UPDATE proposal_questions
+SET updated_at = COALESCE(answered_at, asked_at)
+WHERE updated_at IS NULL;
+
+-- Keep updated_at current for writes that bypass the ORM
+-- (update_updated_at_column() is created by scripts/create_proposal_schema.py)
+DROP TRIGGER IF EXISTS update_questions_updated_at ON proposal_questions;
+CREATE TRIGGER update_questions_updated_at
+    BEFORE UPDATE ON proposal_questions
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Verify the migration
+SELECT column_name, data_type, is_nullable, column_default
+FROM information_schema.columns
+WHERE table_name = 'proposal_questions'
+  AND column_name = 'updated_at';
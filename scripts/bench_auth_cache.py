@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request auth latency with the verified-token cache on and off
+---------------------------------------------------------------------------
+Signs a Cognito-shaped RS256 token with a throwaway key, then validates it
+repeatedly through CognitoProvider directly (cache off) and through
+VerifiedTokenCache (cache on), the same two paths ApprovedUserMiddleware takes.
+
+Usage: python scripts/bench_auth_cache.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt as jose_jwt
+
+from app.auth.cognito_provider import CognitoProvider
+from app.auth.token_cache import VerifiedTokenCache
+
+
+def build_provider_and_token():
+    """CognitoProvider with a preloaded signing key, plus a token signed by it"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+    provider = CognitoProvider()
+    provider.client_id = "bench-client"
+    provider.user_pool_id = "us-east-1_bench"
+    provider.key_store._keys = {"bench-kid": jwk.construct(public_pem, "RS256")}
+    provider.key_store._fetched_at = time.monotonic()
+
+    now = int(time.time())
+    token = jose_jwt.encode(
+        {
+            "sub": "11111111-2222-3333-4444-555555555555",
+            "email": "bench@example.com",
+            "aud": provider.client_id,
+            "iss": f"https://cognito-idp.{provider.region}.amazonaws.com/{provider.user_pool_id}",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_pem.decode(),
+        algorithm="RS256",
+        headers={"kid": "bench-kid"}
+    )
+    return provider, token
+
+
+async def time_requests(validate, token, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await validate(token)
+    return (time.perf_counter() - start) / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the verified-token cache")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    provider, token = build_provider_and_token()
+    cache = VerifiedTokenCache()
+
+    uncached = await time_requests(provider.validate_token, token, args.requests)
+    cached = await time_requests(
+        lambda t: cache.validate(t, provider.validate_token), token, args.requests
+    )
+
+    print("=" * 80)
+    print("AUTH LATENCY PER REQUEST")
+    print("=" * 80)
+    print(f"   Requests:        {args.requests}")
+    print(f"   Cache off:       {uncached * 1e6:10.1f} µs")
+    print(f"   Cache on:        {cached * 1e6:10.1f} µs")
+    print(f"   Speedup:         {uncached / cached:10.1f}x")
+    print(f"   Cache stats:     {cache.stats()}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: pure ASGI ApprovedUserMiddleware vs the old BaseHTTPMiddleware
+-----------------------------------------------------------------------------------
+Serves the same small app under uvicorn twice, once with each middleware,
+and drives it with concurrent httpx clients. Token validation and the
+pre-approved lookup are stubbed out so only middleware overhead is measured.
+
+Usage: python scripts/bench_auth_middleware.py [--requests 5000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth import sso_middleware
+from app.auth.sso_middleware import ApprovedUserMiddleware
+
+EXEMPT_PATHS = [
+    "/health", "/docs", "/redoc", "/openapi.json",
+    "/api/v1/debug/cors", "/api/v1/admin/approved-users", "/api/v1/admin/user-stats",
+    "/api/v1/proposal/access", "/api/v1/admin/send-proposal", "/api/v1/proposal/token-info",
+]
+
+
+async def stub_validate_token(token: str):
+    return {"user_id": "sub-1", "email": "bench@example.com", "exp": None}
+
+
+async def stub_authorize_user(cognito_data: dict):
+    return {"user_id": cognito_data["user_id"], "email": cognito_data["email"]}
+
+
+class LegacyApprovedUserMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware implementation, with the same stubs"""
+
+    def __init__(self, app, exempt_paths: list = None):
+        super().__init__(app)
+        self.exempt_paths = exempt_paths
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(path) for path in self.exempt_paths):
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Authorization header required")
+
+        cognito_data = await stub_validate_token(auth_header.split(" ")[1])
+        request.state.user = await stub_authorize_user(cognito_data)
+        return await call_next(request)
+
+
+def build_app(middleware_class) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/ping")
+    async def ping(request: Request):
+        return {"user": request.state.user["email"]}
+
+    app.add_middleware(middleware_class, exempt_paths=EXEMPT_PATHS)
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def drive(url: str, requests: int, concurrency: int) -> float:
+    headers = {"Authorization": "Bearer bench-token"}
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(headers=headers) as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get(url)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return requests / (time.perf_counter() - start)
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"uvicorn did not start on port {port}")
+
+
+def serve(middleware_class, port: int):
+    uvicorn.run(build_app(middleware_class), host="127.0.0.1", port=port, log_level="warning")
+
+
+def run_benchmark(name: str, middleware_class, paths, requests: int, concurrency: int):
+    """Serve the app from a separate uvicorn process so the client doesn't share its GIL"""
+    port = free_port()
+    server = multiprocessing.get_context("fork").Process(target=serve, args=(middleware_class, port), daemon=True)
+    server.start()
+
+    try:
+        wait_for_port(port)
+        for path in paths:
+            rps = asyncio.run(drive(f"http://127.0.0.1:{port}{path}", requests, concurrency))
+            print(f"   {name:<22} {path:<16} {rps:10.0f} req/s")
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auth middleware under uvicorn")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Stub out Cognito and the pre-approved lookup for the ASGI middleware
+    sso_middleware.authorize_user = stub_authorize_user
+
+    class StubbedApprovedUserMiddleware(ApprovedUserMiddleware):
+        def __init__(self, app, exempt_paths: list = None):
+            super().__init__(app, exempt_paths)
+            self.token_cache = None
+            self.cognito.validate_token = stub_validate_token
+
+    print("=" * 80)
+    print(f"AUTH MIDDLEWARE THROUGHPUT ({args.requests} requests, concurrency {args.concurrency})")
+    print("=" * 80)
+    paths = ["/health", "/api/v1/ping"]
+    run_benchmark("BaseHTTPMiddleware", LegacyApprovedUserMiddleware, paths, args.requests, args.concurrency)
+    run_benchmark("Pure ASGI", StubbedApprovedUserMiddleware, paths, args.requests, args.concurrency)
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
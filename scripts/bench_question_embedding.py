@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark question-embedding throughput with and without micro-batching
+-----------------------------------------------------------------------
+Fires bursts of concurrent questions at one worker and measures embeddings
+per second. "Per call" encodes every question on its own (one forward pass
+each, run on a thread so the event loop stays free); "Batched" goes through
+EmbeddingBatcher, which merges concurrent questions into one forward pass.
+
+Uses the real all-MiniLM-L6-v2 embedder when sentence-transformers is
+installed, otherwise a simulated one whose cost is a fixed per-call overhead
+plus a per-text cost (--simulated-call-ms, --simulated-text-ms), the shape of
+a transformer forward pass.
+
+Usage: python scripts/bench_question_embedding.py [--questions 256] [--concurrency 1 8 32 128]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.rag_service import RAGService
+
+
+class SimulatedEmbedder:
+    """Fixed per-forward-pass overhead plus a per-text cost, one pass at a time (like a CPU-bound model)"""
+
+    def __init__(self, call_ms: float, text_ms: float, dim: int = 384):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts, convert_to_numpy=True):
+        with self._lock:
+            time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        rows = [np.random.default_rng(abs(hash(text)) % 2**32).random(self.dim) for text in texts]
+        return np.array(rows, dtype=np.float32)
+
+
+def load_embedder(call_ms: float, text_ms: float):
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(RAGService.EMBEDDING_MODEL), "all-MiniLM-L6-v2"
+    except ImportError:
+        return SimulatedEmbedder(call_ms, text_ms), f"simulated ({call_ms} ms/call + {text_ms} ms/text)"
+
+
+QUESTIONS = [
+    "How many wireless microphones are included?",
+    "What is the total cost of the audio section?",
+    "When does load-in start?",
+    "Is there a projector in the breakout room?",
+    "Who is the technician on site?",
+    "What is the labor cost for strike?",
+    "Are LED uplights included in the general session?",
+    "What time does the event end?",
+]
+
+
+async def run_burst(embed, questions, concurrency: int) -> float:
+    """Embeddings per second with at most `concurrency` questions in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(question):
+        async with semaphore:
+            await embed(question)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in questions))
+    return len(questions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark question-embedding micro-batching")
+    parser.add_argument("--questions", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--simulated-call-ms", type=float, default=8.0)
+    parser.add_argument("--simulated-text-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    embedder, embedder_name = load_embedder(args.simulated_call_ms, args.simulated_text_ms)
+    # Distinct texts, so the batcher's duplicate folding doesn't flatter it
+    questions = [f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})" for i in range(args.questions)]
+
+    def encode(texts):
+        return embedder.encode(texts, convert_to_numpy=True)
+
+    async def per_call(question):
+        return (await asyncio.to_thread(encode, [question]))[0]
+
+    print("=" * 80)
+    print(f"QUESTION EMBEDDING THROUGHPUT ({args.questions} questions, embedder: {embedder_name})")
+    print(f"Batcher: max {args.max_batch_size} texts, {args.max_wait_ms} ms window")
+    print("=" * 80)
+    print(f"   {'Concurrency':>11}  {'Per call (q/s)':>15}  {'Batched (q/s)':>14}  {'Mean batch':>10}  {'Speedup':>8}")
+
+    for concurrency in args.concurrency:
+        batcher = EmbeddingBatcher(encode, args.max_batch_size, args.max_wait_ms)
+        unbatched = asyncio.run(run_burst(per_call, questions, concurrency))
+        batched = asyncio.run(run_burst(batcher.embed, questions, concurrency))
+        print(
+            f"   {concurrency:>11}  {unbatched:>15.1f}  {batched:>14.1f}  "
+            f"{batcher.stats()['mean_batch_size']:>10.1f}  {batched / unbatched:>7.1f}x"
+        )
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
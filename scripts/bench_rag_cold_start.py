@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start time-to-first-answer with and without the on-disk index store
+-----------------------------------------------------------------------------------
+Simulates a freshly started worker answering the first question on each of
+several proposals: the in-process vector store is empty, so the proposal's
+index either has to be embedded from scratch (no store) or is loaded from
+RAG_INDEX_DIR (store primed by another worker). The Claude call is excluded;
+this measures index availability plus retrieval.
+
+Uses the real all-MiniLM-L6-v2 embedder when sentence-transformers is
+installed, otherwise a simulated one costing --simulated-ms-per-text.
+
+Usage: python scripts/bench_rag_cold_start.py [--proposals 10] [--sections 30] [--items 8]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import faiss
+
+from app.core.cache import LRUCache
+from app.models.proposals import Proposal, ProposalSection, ProposalLineItem
+from app.services import rag_service as rag_module
+from app.services.rag_service import RAGService
+from app.services.index_store import FAISSIndexStore
+
+
+class SimulatedEmbedder:
+    """Deterministic embeddings with a fixed per-text encode cost"""
+
+    def __init__(self, ms_per_text: float, dim: int = 384):
+        self.ms_per_text = ms_per_text
+        self.dim = dim
+
+    def encode(self, texts, convert_to_numpy=True):
+        time.sleep(self.ms_per_text * len(texts) / 1000)
+        rows = [np.random.default_rng(abs(hash(text)) % 2**32).random(self.dim) for text in texts]
+        return np.array(rows, dtype=np.float32)
+
+
+def load_embedder(ms_per_text: float):
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(RAGService.EMBEDDING_MODEL), "all-MiniLM-L6-v2"
+    except ImportError:
+        return SimulatedEmbedder(ms_per_text), f"simulated ({ms_per_text} ms/text)"
+
+
+def build_proposal(sections: int, items: int) -> Proposal:
+    """Transient proposal graph; extract_proposal_content only reads attributes"""
+    proposal = Proposal(
+        id=uuid.uuid4(),
+        job_number=f"BENCH-{uuid.uuid4().hex[:6]}",
+        client_name="Acme Corporation",
+        start_date=date(2024, 12, 15),
+        end_date=date(2024, 12, 15),
+        status="draft",
+        total_cost=Decimal("25000.00"),
+    )
+    for s in range(sections):
+        section = ProposalSection(id=uuid.uuid4(), section_name=f"Section {s}", section_total=Decimal("800.00"))
+        for i in range(items):
+            section.items.append(ProposalLineItem(
+                id=uuid.uuid4(),
+                description=f"Item {s}.{i} wireless microphone kit",
+                quantity=2,
+                unit_price=Decimal("50.00"),
+                subtotal=Decimal("100.00"),
+            ))
+        proposal.sections.append(section)
+    return proposal
+
+
+def new_worker(embedder, store) -> RAGService:
+    service = RAGService(api_key="")
+    service.embedder = embedder
+    service.embedding_dim = 384
+    service.index_store = store
+    service.vector_stores = LRUCache()  # Empty per-process cache
+    return service
+
+
+def time_first_answers(proposals, embedder, store) -> float:
+    """Mean ms from an empty worker to retrieved context, per proposal"""
+    service = new_worker(embedder, store)
+    start = time.perf_counter()
+    for proposal in proposals:
+        service.ensure_vector_store(proposal, None)
+        service.retrieve_relevant_context(str(proposal.id), "How many wireless microphones are included?")
+    return (time.perf_counter() - start) * 1000 / len(proposals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG cold start with and without the index store")
+    parser.add_argument("--proposals", type=int, default=10)
+    parser.add_argument("--sections", type=int, default=30)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--simulated-ms-per-text", type=float, default=3.0)
+    args = parser.parse_args()
+
+    rag_module.faiss = faiss  # The module disables faiss when sentence-transformers is missing
+    embedder, embedder_name = load_embedder(args.simulated_ms_per_text)
+    proposals = [build_proposal(args.sections, args.items) for _ in range(args.proposals)]
+    chunks = 2 + args.sections * (args.items + 1)
+
+    print("=" * 80)
+    print(f"RAG COLD START ({args.proposals} proposals, {chunks} chunks each, embedder: {embedder_name})")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as directory:
+        no_store = time_first_answers(proposals, embedder, None)
+        print(f"   No index store (embed on first question)   {no_store:10.1f} ms/proposal")
+
+        # Another worker has already indexed these proposals
+        time_first_answers(proposals, embedder, FAISSIndexStore(directory))
+        with_store = time_first_answers(proposals, embedder, FAISSIndexStore(directory))
+        print(f"   Index store primed (load from disk)         {with_store:10.1f} ms/proposal")
+
+    print("-" * 80)
+    print(f"   Speedup: {no_store / with_store:.1f}x")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
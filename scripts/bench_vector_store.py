@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-proposal FAISS indexes against the shared NumPy arena
+-------------------------------------------------------------------
+Builds vector stores for many proposals with realistic chunk counts (a few
+dozen to a few hundred) in three layouts and reports resident memory and
+search latency:
+
+    faiss            one IndexIDMap2(IndexFlatL2) per proposal (previous layout)
+    compact float32  rows of one contiguous matrix, dot product + argpartition
+    compact float16  same, half-precision storage
+
+Each layout is built in a fresh child process so RSS deltas don't overlap.
+Embeddings are random unit vectors (no model needed); recall@5 of the
+compact layouts is measured against the FAISS results on the same queries.
+
+Usage: python scripts/bench_vector_store.py [--proposals 500] [--min-chunks 20] [--max-chunks 400]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.services.vector_store import ProposalVectorStore, VectorArena, normalize_rows
+
+DIM = 384
+TOP_K = 5
+
+LAYOUTS = {
+    "faiss": None,
+    "compact float32": np.float32,
+    "compact float16": np.float16,
+}
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def proposal_vectors(args):
+    rng = np.random.default_rng(args.seed)
+    sizes = rng.integers(args.min_chunks, args.max_chunks + 1, size=args.proposals)
+    return [normalize_rows(rng.standard_normal((size, DIM))) for size in sizes]
+
+
+def run_layout(layout, args, results):
+    proposals = proposal_vectors(args)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = [(int(rng.integers(len(proposals))), normalize_rows(rng.standard_normal(DIM)))
+               for _ in range(args.queries)]
+    dtype = LAYOUTS[layout]
+    arena = VectorArena(DIM, dtype=dtype) if dtype else None
+
+    baseline = rss_bytes()
+    stores = []
+    for p, vectors in enumerate(proposals):
+        store = ProposalVectorStore(DIM, arena=arena, compact_max_chunks=len(vectors) if arena else 0)
+        chunks = [{"chunk_key": f"{p}:{i}", "content": f"p{p} c{i}", "type": "line_item",
+                   "section": "Audio", "metadata": {}} for i in range(len(vectors))]
+        store.sync(chunks, lambda texts, vectors=vectors: vectors)
+        stores.append(store)
+    memory = rss_bytes() - baseline
+
+    latencies = []
+    hits = []
+    for p, query in queries:
+        start = time.perf_counter()
+        found = stores[p].search(query, TOP_K)
+        latencies.append(time.perf_counter() - start)
+        hits.append([chunk["chunk_key"] for chunk in found])
+
+    results[layout] = {
+        "memory": memory,
+        "estimated": sum(store.nbytes(chunk_overhead=0) for store in stores),
+        "mean_us": np.mean(latencies) * 1e6,
+        "p95_us": np.percentile(latencies, 95) * 1e6,
+        "hits": hits,
+        "chunks": sum(len(v) for v in proposals),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS vs compact NumPy vector stores")
+    parser.add_argument("--proposals", type=int, default=500)
+    parser.add_argument("--min-chunks", type=int, default=20)
+    parser.add_argument("--max-chunks", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    manager = multiprocessing.Manager()
+    results = manager.dict()
+    for layout in LAYOUTS:
+        process = multiprocessing.Process(target=run_layout, args=(layout, args, results))
+        process.start()
+        process.join()
+
+    chunks = results["faiss"]["chunks"]
+    print("=" * 80)
+    print(f"VECTOR STORE LAYOUTS ({args.proposals} proposals, {chunks} chunks, dim {DIM}, top-{TOP_K})")
+    print("=" * 80)
+    print(f"   {'Layout':<16} {'RSS delta':>10} {'Vectors+ids':>12} {'Mean search':>12} {'p95 search':>11} {'Recall@5':>9}")
+    reference = results["faiss"]["hits"]
+    for layout in LAYOUTS:
+        r = results[layout]
+        recall = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(reference, r["hits"])])
+        print(
+            f"   {layout:<16} {r['memory'] / 2**20:>7.1f} MB {r['estimated'] / 2**20:>9.1f} MB "
+            f"{r['mean_us']:>9.1f} us {r['p95_us']:>8.1f} us {recall:>9.3f}"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -184,7 +184,9 @@ CREATE TABLE IF NOT EXISTS proposal_questions (
     
     -- Internal tracking
     internal_notes TEXT,
-    requires_follow_up BOOLEAN DEFAULT FALSE
+    requires_follow_up BOOLEAN DEFAULT FALSE,
+
+    updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Temporary Access Links (for client viewing)
@@ -282,6 +284,12 @@ CREATE TRIGGER update_line_items_updated_at
     BEFORE UPDATE ON proposal_line_items
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_questions_updated_at ON proposal_questions;
+CREATE TRIGGER update_questions_updated_at
+    BEFORE UPDATE ON proposal_questions
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
 """
 
 def create_proposal_schema():
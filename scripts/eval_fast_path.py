@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Evaluate structured fast-path answering on real client questions
+----------------------------------------------------------------
+Runs every question in scripts/data_exports/proposal_questions.json through
+StructuredAnswerer against its proposal (from the JSON exports) and reports:
+
+    served     share of questions answered from proposal columns, no LLM call
+    by intent  how the served questions were answered
+    latency    mean / p95 extraction + templating time per question
+
+Questions below the confidence threshold are listed as fallbacks (they go to
+RAG + LLM). --show prints every served answer for review.
+
+Usage: python scripts/eval_fast_path.py [--min-confidence 0.8] [--show]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.config import settings
+from app.services.structured_answers import StructuredAnswerer
+from scripts.eval_retrieval import EXPORTS_DIR, load_exported_proposals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate structured fast-path answering")
+    parser.add_argument("--min-confidence", type=float, default=settings.FAST_PATH_MIN_CONFIDENCE)
+    parser.add_argument("--show", action="store_true", help="Print every served answer")
+    args = parser.parse_args()
+
+    proposals = {proposal.id: proposal for proposal in load_exported_proposals()}
+    questions = json.loads((EXPORTS_DIR / "proposal_questions.json").read_text())
+    answerer = StructuredAnswerer(min_confidence=args.min_confidence)
+
+    served, fallbacks, latencies = [], Counter(), []
+    for row in questions:
+        proposal = proposals.get(row["proposal_id"])
+        if proposal is None:
+            continue
+        start = time.perf_counter()
+        result = answerer.answer(row["question_text"], proposal)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        if result:
+            served.append((row["question_text"], result))
+        else:
+            fallbacks[row["question_text"].strip()] += 1
+
+    stats = answerer.stats()
+    print("=" * 80)
+    print(f"STRUCTURED FAST PATH ({stats['questions']} questions, {len(proposals)} proposals, "
+          f"min confidence {args.min_confidence:g})")
+    print("=" * 80)
+    print(f"   Served without LLM: {stats['served_without_llm']}/{stats['questions']} "
+          f"({stats['served_pct']:.1f}%)")
+    print(f"   Latency: mean {np.mean(latencies):.0f} µs, p95 {np.percentile(latencies, 95):.0f} µs")
+    print()
+    print("   By intent:")
+    for intent, count in sorted(stats["by_intent"].items(), key=lambda entry: -entry[1]):
+        print(f"      {intent:<22} {count:>4}")
+    print()
+    print("   Fallbacks to RAG + LLM (distinct questions):")
+    for question, count in fallbacks.most_common():
+        print(f"      {count:>3} x {question[:70]}")
+
+    if args.show:
+        print()
+        print("   Served answers:")
+        for question, result in served:
+            print(f"      Q: {question}")
+            print(f"      A [{result['intent']}, {result['confidence']}]: {result['answer'][:200]}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Evaluate RAG retrieval: vector-only vs hybrid BM25 + vector (RRF)
+-----------------------------------------------------------------
+Generates labelled questions from each proposal's own rows (item names and
+numbers, job number, labor tasks, timeline events, pricing lines), retrieves
+context the way answer_question does, and reports per retrieval mode:
+
+    recall     share of questions whose answer-bearing chunk is in the context
+    MRR        mean reciprocal rank of the first answer-bearing chunk
+    chunks     mean chunks put in the prompt
+    tokens     mean / largest context tokens in the prompt, and the mean's change vs vector top-k
+
+A line item's answer is in its own chunk and in its section's chunk; both
+count. --max-tokens packs the hybrid context the way the answer prompt does
+(prompt_builder.pack_chunks) under each budget. Tokens are counted with
+tiktoken's cl100k_base when available (close to, not identical to, Claude's
+tokenizer), otherwise as characters / 4.
+
+Proposals come from the database (the seeded ones), or from the JSON
+exports in scripts/data_exports with --source exports. The embedder is the
+configured RAG backend; --embedder hashing uses a bag-of-words stand-in when
+no model is installed (its vector numbers are not representative).
+
+Usage:
+    python scripts/eval_retrieval.py                      # all proposals in the database
+    python scripts/eval_retrieval.py --source exports
+    python scripts/eval_retrieval.py --proposal 302946 --top-k 5 --ratios 0.5,0.6
+    python scripts/eval_retrieval.py --top-k 10 --max-tokens 0,800,1500,3000
+"""
+
+import argparse
+import json
+import sys
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.proposals import Proposal
+from app.services.embedders import load_embedder
+from app.services.lexical_index import tokenize
+from app.services.proposal_service import load_proposal_graph, proposal_identifier_filter
+from app.services import prompt_builder
+from app.services.prompt_builder import TOKEN_ENCODING, format_context_chunks, pack_chunks
+from app.services.rag_service import RAGService
+from app.services.vector_store import ProposalVectorStore
+
+EXPORTS_DIR = Path(__file__).parent / "data_exports"
+
+
+class HashingEmbedder:
+    """Bag-of-words feature hashing (no model needed); only a stand-in for smoke runs"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_numpy=True):
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in tokenize(text):
+                rows[row, zlib.crc32(term.encode()) % self.dim] += 1.0
+        return rows / np.clip(np.linalg.norm(rows, axis=1, keepdims=True), 1e-12, None)
+
+
+def token_counter():
+    name = f"tiktoken {TOKEN_ENCODING}" if prompt_builder._get_encoding() is not None else "characters / 4"
+    return prompt_builder.count_tokens, name
+
+
+def load_exported_proposals():
+    """Proposal graphs from the JSON exports, as plain objects extract_proposal_content can read"""
+    tables = {
+        name: [SimpleNamespace(**row) for row in json.loads((EXPORTS_DIR / f"{name}.json").read_text())]
+        for name in ("proposals", "proposal_sections", "proposal_line_items", "proposal_timeline", "proposal_labor")
+    }
+    by_proposal = defaultdict(lambda: defaultdict(list))
+    for name, rows in tables.items():
+        for row in rows:
+            if name != "proposals":
+                by_proposal[row.proposal_id][name].append(row)
+    for item in tables["proposal_line_items"]:
+        item.quantity = item.quantity or 1
+    for section in tables["proposal_sections"]:
+        section.items = sorted(
+            (item for item in tables["proposal_line_items"] if item.section_id == section.id),
+            key=lambda item: item.display_order or 0
+        )
+
+    proposals = []
+    for proposal in tables["proposals"]:
+        related = by_proposal[proposal.id]
+        proposal.sections = sorted(related["proposal_sections"], key=lambda section: section.display_order or 0)
+        proposal.timeline = related["proposal_timeline"]
+        proposal.labor = related["proposal_labor"]
+        proposal.total_cost = proposal.total_cost or 0
+        proposals.append(proposal)
+    return proposals
+
+
+def load_database_proposals(identifier=None):
+    db = SessionLocal()
+    try:
+        query = db.query(Proposal.id)
+        if identifier:
+            query = query.filter(proposal_identifier_filter(identifier))
+        return [load_proposal_graph(db, str(proposal_id)) for (proposal_id,) in query.all()]
+    finally:
+        db.close()
+
+
+def labelled_questions(proposal):
+    """(question, answer-bearing chunk keys) pairs generated from the proposal's rows"""
+    questions = [
+        (f"Who is the client on job {proposal.job_number}?", {"overview"}),
+        ("Which venue is the event at?", {"overview"}),
+        ("What is the tax amount?", {"pricing"}),
+        ("What is the grand total?", {"pricing"}),
+    ]
+
+    by_description = defaultdict(set)
+    by_number = defaultdict(set)
+    for section in proposal.sections:
+        for item in section.items:
+            keys = {f"item:{item.id}", f"section:{section.id}"}
+            by_description[item.description].update(keys)
+            if item.item_number:
+                by_number[item.item_number].update(keys)
+    for description, keys in by_description.items():
+        questions.append((f"How many {description} are included?", keys))
+        questions.append((f"What is the price of the {description}?", keys))
+    for number, keys in by_number.items():
+        questions.append((f"Is item {number} in the quote?", keys))
+
+    by_task = defaultdict(set)
+    for labor in proposal.labor:
+        by_task[(labor.task_name, str(labor.labor_date))].add(f"labor:{labor.id}")
+    for (task, labor_date), keys in by_task.items():
+        questions.append((f"What are the hours for the {task} on {labor_date}?", keys))
+
+    by_title = defaultdict(set)
+    for event in proposal.timeline:
+        by_title[event.title].add(f"timeline:{event.id}")
+    for title, keys in by_title.items():
+        questions.append((f"What time is {title}?", keys))
+    return questions
+
+
+def evaluate(stores, questions, embeddings, mode, top_k, count_tokens, ratio=0.0, max_tokens=0):
+    hits, reciprocal_ranks, chunk_counts, token_counts = [], [], [], []
+    for (proposal_id, question, gold), embedding in zip(questions, embeddings):
+        store = stores[proposal_id]
+        if mode == "vector":
+            chunks = store.search(embedding, top_k)
+        else:
+            chunks = store.hybrid_search(
+                embedding, question, top_k,
+                candidates=settings.RAG_HYBRID_CANDIDATES, rrf_k=settings.RAG_RRF_K, min_score_ratio=ratio
+            )
+        if max_tokens:
+            chunks = pack_chunks(chunks, max_tokens)[0]
+        ranks = [rank for rank, chunk in enumerate(chunks, start=1) if chunk['chunk_key'] in gold]
+        hits.append(bool(ranks))
+        reciprocal_ranks.append(1.0 / ranks[0] if ranks else 0.0)
+        chunk_counts.append(len(chunks))
+        token_counts.append(count_tokens(format_context_chunks(chunks)))
+    return {
+        "recall": float(np.mean(hits)),
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "chunks": float(np.mean(chunk_counts)),
+        "tokens": float(np.mean(token_counts)),
+        "peak": int(max(token_counts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate vector vs hybrid RAG retrieval")
+    parser.add_argument("--source", choices=["db", "exports"], default="db")
+    parser.add_argument("--proposal", help="Job number or UUID of a single proposal (db source)")
+    parser.add_argument("--embedder", choices=["model", "hashing"], default="model")
+    parser.add_argument("--top-k", type=int, default=settings.RAG_CONTEXT_TOP_K)
+    parser.add_argument("--ratios", default="0.5,0.6,0.7", help="RAG_HYBRID_MIN_SCORE_RATIO values to try")
+    parser.add_argument("--max-tokens", default=f"0,{settings.RAG_CONTEXT_MAX_TOKENS}",
+                        help="RAG_CONTEXT_MAX_TOKENS budgets to pack hybrid context into (0 = unpacked)")
+    args = parser.parse_args()
+
+    if args.embedder == "hashing":
+        embedder, embedder_name = HashingEmbedder(), "hashing stand-in"
+    else:
+        embedder = load_embedder(settings.EMBEDDING_BACKEND, RAGService.EMBEDDING_MODEL,
+                                 onnx_dir=settings.EMBEDDING_ONNX_DIR)
+        embedder_name = f"{RAGService.EMBEDDING_MODEL} ({settings.EMBEDDING_BACKEND})"
+    count_tokens, tokenizer_name = token_counter()
+
+    proposals = load_exported_proposals() if args.source == "exports" else load_database_proposals(args.proposal)
+    proposals = [proposal for proposal in proposals if proposal is not None]
+    if not proposals:
+        print("❌ No proposals found (seed the database, or use --source exports)")
+        sys.exit(1)
+
+    extractor = RAGService.__new__(RAGService)  # Only extract_proposal_content is used
+    stores, questions = {}, []
+    for proposal in proposals:
+        proposal_id = str(proposal.id)
+        store = ProposalVectorStore(384)
+        store.sync(extractor.extract_proposal_content(proposal, None), embedder.encode)
+        stores[proposal_id] = store
+        questions += [(proposal_id, question, gold) for question, gold in labelled_questions(proposal)]
+    embeddings = embedder.encode([question for _, question, _ in questions])
+
+    modes = [("vector", 0.0, 0), ("hybrid", 0.0, 0)] + [
+        ("hybrid", float(ratio), 0) for ratio in args.ratios.split(",") if ratio
+    ] + [
+        ("hybrid", 0.0, int(budget)) for budget in args.max_tokens.split(",") if budget and int(budget)
+    ]
+    results = [
+        (mode, ratio, budget, evaluate(stores, questions, embeddings, mode, args.top_k, count_tokens, ratio, budget))
+        for mode, ratio, budget in modes
+    ]
+    baseline = results[0][3]["tokens"]
+
+    print("=" * 80)
+    print(f"RETRIEVAL EVALUATION ({len(proposals)} proposals, {len(questions)} questions, top-{args.top_k})")
+    print(f"Embedder: {embedder_name}   Tokens: {tokenizer_name}")
+    print("=" * 80)
+    print(f"   {'Mode':<30} {'Recall':>7} {'MRR':>6} {'Chunks':>7} {'Tokens':>7} {'Peak':>6} {'vs vector':>10}")
+    for mode, ratio, budget, r in results:
+        name = mode if not ratio else f"{mode} (cut < {ratio:g} x best)"
+        name = name if not budget else f"{mode} (packed <= {budget} tokens)"
+        change = (r["tokens"] - baseline) / baseline * 100 if baseline else 0.0
+        print(f"   {name:<30} {r['recall']:>7.3f} {r['mrr']:>6.3f} {r['chunks']:>7.2f} "
+              f"{r['tokens']:>7.0f} {r['peak']:>6} {change:>+9.1f}%")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Export all-MiniLM-L6-v2 to ONNX (fp32 + int8) for the ONNX embedding backends
+---------------------------------------------------------------------------
+Writes model.onnx, model_int8.onnx and tokenizer.json to EMBEDDING_ONNX_DIR
+(or --output). Only this export needs torch + transformers; the API then runs
+with EMBEDDING_BACKEND=onnx or onnx-int8 on onnxruntime + tokenizers alone.
+
+The int8 model uses dynamic quantization (int8 weights, activations quantized
+at runtime), which suits CPU-only instances. After exporting, check recall
+against the PyTorch model with:
+
+    pytest tests/test_embedders.py
+
+Usage:
+    pip install torch transformers onnx onnxruntime tokenizers
+    python scripts/export_onnx_embedder.py [--output ./models/all-MiniLM-L6-v2-onnx]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.services.embedders import ONNX_MODEL_FILES, load_embedder
+from app.services.rag_service import RAGService
+
+HF_MODEL = f"sentence-transformers/{RAGService.EMBEDDING_MODEL}"
+
+
+def export_fp32(output: Path):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL)
+    model = AutoModel.from_pretrained(HF_MODEL).eval()
+    tokenizer.save_pretrained(output)  # Writes tokenizer.json (fast tokenizer)
+
+    sample = tokenizer(["An example sentence"], return_tensors="pt")
+    inputs = (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"])
+    dynamic = {0: "batch", 1: "tokens"}
+    torch.onnx.export(
+        model,
+        inputs,
+        str(output / ONNX_MODEL_FILES["onnx"]),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": dynamic,
+            "attention_mask": dynamic,
+            "token_type_ids": dynamic,
+            "last_hidden_state": dynamic,
+        },
+        opset_version=14,
+    )
+
+
+def export_int8(output: Path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(output / ONNX_MODEL_FILES["onnx"]),
+        str(output / ONNX_MODEL_FILES["onnx-int8"]),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the RAG embedding model to ONNX")
+    parser.add_argument("--output", default=settings.EMBEDDING_ONNX_DIR)
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 80)
+    print(f"EXPORTING {HF_MODEL} TO {output}")
+    print("=" * 80)
+
+    export_fp32(output)
+    print(f"✅ {ONNX_MODEL_FILES['onnx']}")
+    export_int8(output)
+    print(f"✅ {ONNX_MODEL_FILES['onnx-int8']}")
+
+    for backend, filename in ONNX_MODEL_FILES.items():
+        size_mb = (output / filename).stat().st_size / 1024 / 1024
+        embedder = load_embedder(backend, RAGService.EMBEDDING_MODEL, onnx_dir=str(output))
+        shape = embedder.encode(["How many wireless microphones are included?"]).shape
+        print(f"   {backend:<10} {filename:<18} {size_mb:6.1f} MB  output {shape}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy import create_engine, text
 from app.config import settings
+from app.services.proposal_cache import invalidate_proposal_cache
+from app.services.rag_service import index_proposal_by_id
 
 
 def load_json_file(filepath):
@@ -394,6 +396,18 @@ def import_proposal_data(engine, json_data, job_number, dry_run=True):
 
         print(f"✅ Added {labor_added} labor items")
 
+        # Bump updated_at so cached payloads in running workers see a new version
+        conn.execute(
+            text("UPDATE proposals SET updated_at = :now WHERE id = :proposal_id"),
+            {"now": datetime.utcnow(), "proposal_id": proposal_id}
+        )
+
+    invalidate_proposal_cache(proposal_id)
+
+    # Embed now so the first question on this proposal doesn't have to
+    changes = index_proposal_by_id(proposal_id)
+    print(f"🔎 RAG index: {changes if changes is not None else 'skipped (embedder unavailable)'}")
+
     print()
     print("=" * 120)
     print("✅ SUCCESSFULLY IMPORTED:")
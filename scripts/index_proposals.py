@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Batch-index proposals for RAG question answering
+------------------------------------------------
+Embeds every proposal's chunks and saves the FAISS indexes to RAG_INDEX_DIR,
+where the API workers pick them up. Already-indexed proposals whose content
+hasn't changed are skipped without embedding; changed ones only re-embed the
+chunks that changed.
+
+Usage:
+    python scripts/index_proposals.py                   # all proposals
+    python scripts/index_proposals.py --proposal 302946 # one proposal (job number or UUID)
+    python scripts/index_proposals.py --status draft --limit 50
+    python scripts/index_proposals.py --rebuild         # drop stored indexes first
+
+Afterwards the cross-proposal search index snapshot in SEARCH_INDEX_DIR is
+brought up to date from the stored indexes (changed proposals only), so API
+workers start with it instead of rebuilding.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import desc
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.proposals import Proposal
+from app.services.proposal_service import proposal_identifier_filter
+from app.services.rag_service import get_rag_service, index_proposal_by_id
+from app.services.search_index import GlobalSearchIndex, SearchIndexRefresher
+
+
+def select_proposals(args):
+    db = SessionLocal()
+    try:
+        query = db.query(Proposal.id, Proposal.job_number)
+        if args.proposal:
+            query = query.filter(proposal_identifier_filter(args.proposal))
+        if args.status:
+            query = query.filter(Proposal.status == args.status)
+        query = query.order_by(desc(Proposal.created_at))
+        if args.limit:
+            query = query.limit(args.limit)
+        return query.all()
+    finally:
+        db.close()
+
+
+def update_search_index(rag_service):
+    index = GlobalSearchIndex(
+        rag_service.embedding_dim,
+        model_id=rag_service.embedding_model_id,
+        ivf_min_vectors=settings.SEARCH_INDEX_IVF_MIN_VECTORS,
+        nprobe=settings.SEARCH_INDEX_NPROBE
+    )
+    index.load(settings.SEARCH_INDEX_DIR)
+    refresher = SearchIndexRefresher(index, settings.SEARCH_INDEX_DIR, 0, index_store=rag_service.index_store)
+    t0 = time.perf_counter()
+    counts = refresher.run_once()
+    if counts is None:
+        print("❌ Search index not updated (see log)")
+        return
+    stats = index.stats()
+    print(f"Search index: {stats['vectors']} chunks of {stats['proposals']} proposals ({stats['type']})")
+    print(f"   Proposals updated: {counts['updated']}, removed: {counts['removed']} "
+          f"({time.perf_counter() - t0:.1f}s) -> {settings.SEARCH_INDEX_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed proposals and persist their RAG indexes")
+    parser.add_argument("--proposal", help="Job number or UUID of a single proposal")
+    parser.add_argument("--status", help="Only proposals with this status")
+    parser.add_argument("--limit", type=int, help="Index at most this many (newest first)")
+    parser.add_argument("--rebuild", action="store_true", help="Delete stored indexes before indexing")
+    args = parser.parse_args()
+
+    rag_service = get_rag_service()
+    if not rag_service.embedder:
+        print("❌ Embedding model not available (pip install sentence-transformers faiss-cpu)")
+        sys.exit(1)
+    if not rag_service.index_store:
+        print("⚠️  RAG_INDEX_DIR is not set: indexes will not be persisted for the API workers")
+
+    proposals = select_proposals(args)
+
+    print("=" * 80)
+    print(f"INDEXING {len(proposals)} PROPOSALS")
+    print(f"Index directory: {settings.RAG_INDEX_DIR or '(none)'}")
+    print("=" * 80)
+
+    totals = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    failed = []
+    started = time.perf_counter()
+
+    for position, (proposal_id, job_number) in enumerate(proposals, start=1):
+        if args.rebuild:
+            rag_service.clear_cache(str(proposal_id))
+
+        t0 = time.perf_counter()
+        changes = index_proposal_by_id(proposal_id)
+        elapsed = time.perf_counter() - t0
+
+        prefix = f"[{position:>{len(str(len(proposals)))}}/{len(proposals)}] {job_number:<12}"
+        if changes is None:
+            failed.append(job_number)
+            print(f"{prefix} ❌ failed ({elapsed:.1f}s)")
+            continue
+
+        for key in totals:
+            totals[key] += changes[key]
+        print(
+            f"{prefix} +{changes['added']} ~{changes['updated']} -{changes['removed']} "
+            f"={changes['unchanged']}  ({elapsed:.1f}s)"
+        )
+
+    print("=" * 80)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    print(f"   Chunks embedded: {totals['added'] + totals['updated']} "
+          f"(added {totals['added']}, updated {totals['updated']})")
+    print(f"   Chunks removed: {totals['removed']}, unchanged: {totals['unchanged']}")
+    if failed:
+        print(f"   Failed: {', '.join(failed)}")
+    if settings.SEARCH_INDEX_ENABLED and settings.SEARCH_INDEX_DIR and rag_service.index_store:
+        print("=" * 80)
+        update_search_index(rag_service)
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from app.config import settings
+from app.services.proposal_cache import invalidate_proposal_cache
+from app.services.rag_service import index_proposal_by_id
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -263,6 +265,8 @@ def seed_great_debates_proposal():
             logger.info(f"✓ Created {len(timeline_events)} timeline events")
             
             conn.commit()
+            invalidate_proposal_cache(proposal_id)
+            logger.info(f"✓ RAG index: {index_proposal_by_id(proposal_id)}")
             logger.info("\n✅ Successfully seeded proposal 302946 - Great Debates in Solid Tumors!")
             logger.info(f"Total Cost: $209,886.87")
             logger.info(f"Product Total: $150,670.25 (after $98,494.75 discount)")
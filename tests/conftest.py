@@ -0,0 +1,31 @@
+"""Shared fixtures: an in-memory SQLite database with the proposal tables"""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from tests import helpers
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory bound to a fresh in-memory proposal database"""
+    engine = helpers.create_proposal_engine()
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seed_proposal():
+    """Factory that inserts a proposal with N sections and returns its id"""
+    return helpers.seed_proposal
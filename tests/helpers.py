@@ -0,0 +1,99 @@
+"""Test helpers: the proposal tables on SQLite and a seeded proposal"""
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import create_engine, ARRAY
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from app.models.users import Base
+from app.models.proposals import (
+    Proposal, ProposalSection, ProposalLineItem,
+    ProposalTimeline, ProposalLabor, ProposalQuestion
+)
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(element, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_sqlite(element, compiler, **kw):
+    """SQLite has no ARRAY type; the timeline table only needs to exist for these tests"""
+    return "JSON"
+
+
+PROPOSAL_TABLES = [
+    Proposal.__table__,
+    ProposalSection.__table__,
+    ProposalLineItem.__table__,
+    ProposalTimeline.__table__,
+    ProposalLabor.__table__,
+    ProposalQuestion.__table__,
+]
+
+
+def create_proposal_engine():
+    """
+    In-memory SQLite engine with the proposal tables
+
+    One shared connection usable from any thread, since run_db, the test
+    client and the answer queue run queries off the test's thread.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=PROPOSAL_TABLES)
+    return engine
+
+
+def seed_proposal(db, job_number: str, section_count: int, items_per_section: int = 3) -> uuid.UUID:
+    """Insert a proposal with N sections, one labor row and one pending question; returns its id"""
+    proposal = Proposal(
+        id=uuid.uuid4(),
+        job_number=job_number,
+        client_name="Acme Corporation",
+        start_date=date(2024, 12, 15),
+        end_date=date(2024, 12, 15),
+        total_cost=Decimal("1000.00"),
+    )
+    db.add(proposal)
+    for s in range(section_count):
+        section = ProposalSection(
+            id=uuid.uuid4(),
+            proposal_id=proposal.id,
+            section_name=f"Section {s}",
+            display_order=section_count - s,
+        )
+        db.add(section)
+        for i in range(items_per_section):
+            db.add(ProposalLineItem(
+                id=uuid.uuid4(),
+                section_id=section.id,
+                proposal_id=proposal.id,
+                description=f"Item {s}.{i}",
+                unit_price=Decimal("10.00"),
+                subtotal=Decimal("10.00"),
+                display_order=items_per_section - i,
+            ))
+    db.add(ProposalLabor(
+        id=uuid.uuid4(),
+        proposal_id=proposal.id,
+        task_name="Audio Tech",
+        labor_date=date(2024, 12, 15),
+        start_time=datetime(2024, 12, 15, 8).time(),
+        end_time=datetime(2024, 12, 15, 17).time(),
+        hourly_rate=Decimal("75.00"),
+        subtotal=Decimal("675.00"),
+    ))
+    db.add(ProposalQuestion(
+        id=uuid.uuid4(),
+        proposal_id=proposal.id,
+        question_text="What is the total cost?",
+    ))
+    proposal_id = proposal.id
+    db.commit()
+    db.expunge_all()
+    return proposal_id
@@ -0,0 +1,107 @@
+"""Tests for the semantic answer cache"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.answer_cache import SemanticAnswerCache, normalize_question
+from app.services.rag_service import RAGService
+from app.models.proposals import Proposal, ProposalSection
+
+RESULT = {"answer": "$1,000.00", "method": "rag", "confidence": 0.9, "sources": []}
+
+
+def test_normalized_text_hits_exactly():
+    cache = SemanticAnswerCache()
+    cache.set("p1", "v1", "What's the total cost?", RESULT, tokens=120)
+
+    hit = cache.get("p1", "v1", "  whats the TOTAL cost ")
+
+    assert normalize_question("What's the total cost?") == "whats the total cost"
+    assert hit["answer"] == "$1,000.00"
+    assert hit["cache"] == "exact"
+    assert cache.stats()["llm_tokens_saved"] == 120
+
+
+def test_similar_embedding_hits_above_threshold():
+    cache = SemanticAnswerCache(similarity_threshold=0.9)
+    cache.set("p1", "v1", "what is the total cost", RESULT, embedding=np.array([1.0, 0.0, 0.0]), tokens=50)
+
+    near = cache.get("p1", "v1", "how much does this whole package cost", embedding=np.array([0.95, 0.2, 0.0]))
+    far = cache.get("p1", "v1", "when does load-in start for the crew", embedding=np.array([0.2, 1.0, 0.0]))
+
+    assert near["cache"] == "semantic"
+    assert far is None
+    assert cache.stats()["semantic_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_near_miss_questions_do_not_share_answers():
+    cache = SemanticAnswerCache()
+    cache.set("p1", "v1", "What is the setup time on day 1?", RESULT, embedding=np.array([1.0, 0.0, 0.0]))
+    cache.set("p1", "v1", "setup time day 1", RESULT, embedding=np.array([0.0, 1.0, 0.0]))
+
+    other_day = cache.get("p1", "v1", "What is the setup time on day 2?", embedding=np.array([1.0, 0.01, 0.0]))
+    short = cache.get("p1", "v1", "setup time day one", embedding=np.array([0.0, 1.0, 0.01]))
+    same_day = cache.get("p1", "v1", "What time is setup on day 1?", embedding=np.array([1.0, 0.01, 0.0]))
+
+    assert other_day is None
+    assert short is None
+    assert same_day["cache"] == "semantic"
+    assert cache.stats()["misses"] == 2
+
+
+def test_new_content_version_drops_answers():
+    cache = SemanticAnswerCache()
+    cache.set("p1", "v1", "total cost", RESULT)
+
+    assert cache.get("p1", "v2", "total cost") is None
+    assert cache.get("p1", "v1", "total cost") is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_answers_are_scoped_to_proposal_and_mode():
+    cache = SemanticAnswerCache()
+    cache.set("p1", "v1", "total cost", RESULT)
+
+    assert cache.get("p2", "v1", "total cost") is None
+    assert cache.get("p1", "v1", "total cost", use_rag=False) is None
+
+    cache.invalidate("p1")
+    assert cache.get("p1", "v1", "total cost") is None
+
+
+def test_answer_question_reuses_cached_answer(db, seed_proposal, monkeypatch):
+    proposal_id = seed_proposal(db, "JOB-CACHE", section_count=1)
+    calls = []
+
+    async def create(model, max_tokens, messages):
+        calls.append(messages)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="It costs $1,000.00")],
+            usage=SimpleNamespace(input_tokens=300, output_tokens=20)
+        )
+
+    async def run():
+        service = RAGService(api_key="")
+        service.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        service.answer_cache = SemanticAnswerCache()
+        proposal = db.get(Proposal, proposal_id)
+        first = await service.answer_question("What is the total cost?", proposal, db, fast_path=False)
+        second = await service.answer_question("what is the total cost", proposal, db, fast_path=False)
+
+        db.query(ProposalSection).update({ProposalSection.updated_at: datetime(2030, 1, 1)})
+        db.commit()
+        third = await service.answer_question("What is the total cost?", proposal, db, fast_path=False)
+        return service, first, second, third
+
+    service, first, second, third = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert "cache" not in first
+    assert second["cache"] == "exact"
+    assert second["answer"] == first["answer"]
+    assert "cache" not in third
+    assert service.answer_cache.stats()["llm_tokens_saved"] == 320
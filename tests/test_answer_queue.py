@@ -0,0 +1,147 @@
+"""Tests for background auto-answering"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.models.proposals import ProposalQuestion
+from app.services import answer_queue as answer_queue_module
+from app.services.answer_queue import AnswerQueue, ANSWERED, FAILED, QUEUED, SKIPPED
+from tests.helpers import seed_proposal
+
+
+class FakeRAGService:
+    client = object()
+    embedder = object()
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+        self.indexed = []
+
+    def ensure_vector_store(self, proposal, db, embed=True):
+        self.indexed.append((threading.get_ident(), embed))
+        return True
+
+    async def wait_until_ready(self, timeout=None):
+        return True
+
+    def try_structured_answer(self, question, proposal):
+        return None
+
+    async def answer_question(self, question, proposal, db, use_rag=True, embed_chunks=None, fast_path=True):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return {"answer": "error", "method": "error", "reasoning": "overloaded"}
+        assert embed_chunks is False
+        return {"answer": f"{len(proposal.sections)} sections", "method": "rag"}
+
+
+@pytest.fixture(autouse=True)
+def no_payload_cache(monkeypatch):
+    monkeypatch.setattr(answer_queue_module, "ainvalidate_proposal_cache", lambda proposal_id=None: asyncio.sleep(0))
+
+
+def pending_question_id(factory):
+    with factory() as db:
+        seed_proposal(db, "JOB-Q", 2)
+        return db.query(ProposalQuestion.id).scalar()
+
+
+def run_queue(factory, rag, question_id, answer_first=None):
+    async def run():
+        queue = AnswerQueue(session_factory=factory, workers=2, retry_backoff_seconds=0)
+        queue.start()
+        if answer_first:
+            answer_first()
+        assert queue.enqueue(question_id)
+        await asyncio.wait_for(queue._queue.join(), timeout=5)
+        await queue.stop()
+        return queue
+
+    return asyncio.run(run())
+
+
+def test_question_is_answered_after_retry(session_factory, monkeypatch):
+    rag = FakeRAGService(failures=1)
+    monkeypatch.setattr(answer_queue_module, "get_rag_service", lambda: rag)
+    question_id = pending_question_id(session_factory)
+
+    queue = run_queue(session_factory, rag, question_id)
+
+    assert queue.get_job(question_id)["state"] == ANSWERED
+    assert queue.get_job(question_id)["attempts"] == 2
+    with session_factory() as db:
+        question = db.get(ProposalQuestion, question_id)
+        assert question.status == "answered"
+        assert question.answer_text == "2 sections"
+        assert question.ai_generated is True
+    # Indexed (with embedding) once per attempt, never on the event loop's thread
+    assert [embed for _, embed in rag.indexed] == [True, True]
+    assert threading.get_ident() not in {thread for thread, _ in rag.indexed}
+
+
+def test_gives_up_after_max_attempts(session_factory, monkeypatch):
+    rag = FakeRAGService(failures=10)
+    monkeypatch.setattr(answer_queue_module, "get_rag_service", lambda: rag)
+    question_id = pending_question_id(session_factory)
+
+    queue = run_queue(session_factory, rag, question_id)
+
+    assert queue.get_job(question_id)["state"] == FAILED
+    assert rag.calls == 3
+    with session_factory() as db:
+        assert db.get(ProposalQuestion, question_id).status == "pending"
+
+
+def test_human_answer_is_not_overwritten(session_factory, monkeypatch):
+    rag = FakeRAGService()
+    monkeypatch.setattr(answer_queue_module, "get_rag_service", lambda: rag)
+    question_id = pending_question_id(session_factory)
+
+    def answer_by_hand():
+        with session_factory() as db:
+            question = db.get(ProposalQuestion, question_id)
+            question.status = "answered"
+            question.answer_text = "Answered by sales"
+            db.commit()
+
+    queue = run_queue(session_factory, rag, question_id, answer_first=answer_by_hand)
+
+    assert queue.get_job(question_id)["state"] == SKIPPED
+    with session_factory() as db:
+        assert db.get(ProposalQuestion, question_id).answer_text == "Answered by sales"
+
+
+def test_enqueue_requires_running_queue():
+    assert AnswerQueue().enqueue("anything") is False
+
+
+def test_requeue_only_takes_questions_creation_would_queue(session_factory, monkeypatch):
+    rag = FakeRAGService()
+
+    async def classify_question(question):
+        # Auto-answerable, but flagged for a human rather than the AI
+        return {"should_auto_answer": True, "use_ai": "total cost" in question}
+
+    rag.classify_question = classify_question
+    monkeypatch.setattr(answer_queue_module, "get_rag_service", lambda: rag)
+    question_id = pending_question_id(session_factory)
+    with session_factory() as db:
+        proposal_id = db.query(ProposalQuestion.proposal_id).scalar()
+        db.add(ProposalQuestion(proposal_id=proposal_id, question_text="Can we get a discount?"))
+        db.commit()
+
+    async def run():
+        queue = AnswerQueue(session_factory=session_factory, workers=1)
+        queue._queue = asyncio.Queue()  # Running, but no workers draining it
+        queue._tasks = [asyncio.create_task(asyncio.sleep(60))]
+        requeued = await queue.requeue_pending(max_age_minutes=5)
+        await queue.stop()
+        return queue, requeued
+
+    queue, requeued = asyncio.run(run())
+
+    assert requeued == 1
+    assert queue.get_job(question_id)["state"] == QUEUED
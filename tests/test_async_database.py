@@ -0,0 +1,48 @@
+"""Tests for running query code against sync and async sessions"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.database import async_database_url, run_db
+from app.models.users import Base
+from app.services.proposal_service import get_proposal_detail, list_proposals
+from tests.helpers import PROPOSAL_TABLES, seed_proposal
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@host:5432/db", "postgresql+asyncpg://u:p@host:5432/db"),
+    ("postgres://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("postgresql+psycopg2://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("sqlite:///./local.db", "sqlite+aiosqlite:///./local.db"),
+])
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_run_db_with_sync_session(db):
+    # run_db hands sync sessions to the threadpool
+    seed_proposal(db, "JOB-SYNC", 2)
+    result = asyncio.run(run_db(db, list_proposals, 0, 10, None))
+
+    assert result["total_count"] == 1
+    assert result["proposals"][0]["job_number"] == "JOB-SYNC"
+
+
+def test_run_db_with_async_session():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=PROPOSAL_TABLES))
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await db.run_sync(seed_proposal, "JOB-ASYNC", 3)
+            detail = await run_db(db, get_proposal_detail, "JOB-ASYNC")
+        await engine.dispose()
+        return detail
+
+    detail = asyncio.run(run())
+
+    assert detail["eventDetails"]["jobNumber"] == "JOB-ASYNC"
+    assert len(detail["sections"]) == 3
@@ -0,0 +1,142 @@
+"""Tests for batch answering of pending questions"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.proposals import ProposalQuestion
+from app.services import batch_answering, rag_service
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.batch_answering import BatchRequestError, answer_question_batch
+from app.services.rag_service import RAGService
+
+
+class FakeMessages:
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, model, max_tokens, messages):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=f"Answer {self.calls}")],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=10)
+        )
+
+
+def add_question(db, proposal_id, text, status="pending"):
+    question = ProposalQuestion(id=uuid.uuid4(), proposal_id=proposal_id, question_text=text, status=status)
+    db.add(question)
+    db.commit()
+    return question.id
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = RAGService(api_key="")
+    service.answer_cache = SemanticAnswerCache()
+    service.client = SimpleNamespace(messages=FakeMessages())
+    monkeypatch.setattr(batch_answering, "get_rag_service", lambda: service)
+    monkeypatch.setattr(batch_answering, "ainvalidate_proposal_cache", lambda proposal_id=None: asyncio.sleep(0))
+    return service
+
+
+def test_batch_groups_deduplicates_and_saves(db, seed_proposal, service):
+    first = seed_proposal(db, "JOB-B1", 1)
+    second = seed_proposal(db, "JOB-B2", 1)
+    parking = [add_question(db, first, "Is parking included?") for _ in range(2)]
+    crew = add_question(db, second, "Who runs the show on site?")
+    done = add_question(db, second, "Already handled", status="answered")
+    total = db.query(ProposalQuestion.id).filter_by(proposal_id=first, question_text="What is the total cost?").scalar()
+    missing = uuid.uuid4()
+
+    summary = asyncio.run(answer_question_batch(
+        db, question_ids=[*parking, crew, total, done, missing], concurrency=2
+    ))
+
+    assert (summary["proposals"], summary["questions"], summary["saved"]) == (2, 4, 4)
+    assert summary["llm_answers"] == 2 and service.client.messages.calls == 2  # Duplicate asked once
+    assert {s["reason"] for s in summary["skipped"]} == {"status is answered", "not found"}
+    by_id = {r["question_id"]: r for r in summary["results"]}
+    assert by_id[str(total)]["method"] == "structured"
+    assert by_id[str(parking[0])]["ai_answer"] == by_id[str(parking[1])]["ai_answer"]
+    assert by_id[str(crew)]["job_number"] == "JOB-B2"
+
+    db.expire_all()
+    for question_id in (*parking, crew, total):
+        question = db.get(ProposalQuestion, question_id)
+        assert question.status == "answered" and question.ai_generated
+    assert db.get(ProposalQuestion, done).answer_text is None
+
+
+def test_batch_of_a_proposals_pending_questions_is_bounded(db, seed_proposal, service):
+    proposal_id = seed_proposal(db, "JOB-B3", 1)
+    for n in range(6):
+        add_question(db, proposal_id, f"Can the crew start at {n}am?")
+
+    summary = asyncio.run(answer_question_batch(db, proposal_identifier="JOB-B3", auto_save=False, concurrency=2))
+
+    assert summary["questions"] == 7 and summary["saved"] == 0
+    assert service.client.messages.max_active <= 2
+    assert db.query(ProposalQuestion).filter_by(status="pending").count() == 7
+
+    with pytest.raises(BatchRequestError) as error:
+        asyncio.run(answer_question_batch(db, proposal_identifier="JOB-NONE"))
+    assert error.value.status_code == 404
+
+
+def test_questions_past_the_time_budget_stay_pending(db, seed_proposal, service):
+    proposal_id = seed_proposal(db, "JOB-B4", 1)
+    question_ids = [add_question(db, proposal_id, f"Can the crew start at {n}am?") for n in range(3)]
+
+    summary = asyncio.run(answer_question_batch(db, question_ids=question_ids, time_budget_seconds=1e-9))
+
+    assert (summary["questions"], summary["saved"], summary["llm_answers"]) == (0, 0, 0)
+    assert {s["reason"] for s in summary["skipped"]} == {"batch time budget exceeded"}
+    assert service.client.messages.calls == 0
+    assert db.query(ProposalQuestion).filter_by(status="pending").count() == 4
+
+
+def test_answers_running_past_the_time_budget_are_cut_off(db, seed_proposal, service):
+    proposal_id = seed_proposal(db, "JOB-B6", 1)
+    quick = add_question(db, proposal_id, "Is parking included?")
+    slow = add_question(db, proposal_id, "Can the crew start at 6am?")
+    create = service.client.messages.create
+
+    async def slow_create(model, max_tokens, messages):
+        if "6am" in messages[0]["content"]:
+            await asyncio.sleep(5)
+        return await create(model, max_tokens, messages)
+
+    service.client.messages.create = slow_create
+    summary = asyncio.run(answer_question_batch(
+        db, question_ids=[quick, slow], concurrency=2, time_budget_seconds=0.2
+    ))
+
+    assert summary["elapsed_seconds"] < 2
+    assert [r["question_id"] for r in summary["results"]] == [str(quick)]
+    assert summary["skipped"] == [{"question_id": str(slow), "reason": "batch time budget exceeded"}]
+    db.expire_all()
+    assert db.get(ProposalQuestion, slow).status == "pending"
+
+
+def test_concurrent_answers_do_not_use_the_session(db, seed_proposal, service, monkeypatch):
+    proposal_id = seed_proposal(db, "JOB-B5", 1)
+    question_ids = [add_question(db, proposal_id, f"Can the crew start at {n}am?") for n in range(3)]
+    in_answers = []
+    monkeypatch.setattr(rag_service, "get_proposal_content_version", lambda *args: in_answers.append(args))
+    monkeypatch.setattr(service, "ensure_vector_store", lambda *args: in_answers.append(args))
+
+    first = asyncio.run(answer_question_batch(db, question_ids=question_ids, auto_save=False, concurrency=3))
+    again = asyncio.run(answer_question_batch(db, question_ids=question_ids, auto_save=False, concurrency=3))
+
+    assert in_answers == []
+    assert first["llm_answers"] == 3 and service.client.messages.calls == 3
+    assert again["llm_answers"] == 0  # Served from the answer cache under the batch's content version
@@ -0,0 +1,50 @@
+"""Tests for the in-process LRU cache"""
+
+from app.core.cache import LRUCache
+
+
+def test_evicts_least_recently_used_by_count():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicts_to_byte_budget():
+    cache = LRUCache(max_entries=100, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.get("a")
+    cache.set("c", "zzzz")
+
+    assert "b" not in cache
+    assert cache.bytes == 8
+    assert cache.stats()["bytes"] == 8
+
+
+def test_byte_accounting_on_replace_pop_and_clear():
+    cache = LRUCache(max_bytes=100, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    assert cache.bytes == 2
+
+    cache.set("b", "yyy")
+    cache.pop("a")
+    assert cache.bytes == 3
+
+    cache.clear()
+    assert cache.bytes == 0
+
+
+def test_oversized_entry_is_kept_alone():
+    cache = LRUCache(max_bytes=5, sizeof=len)
+    cache.set("a", "xx")
+    cache.set("b", "yyyyyyyy")
+
+    assert "a" not in cache
+    assert cache.get("b") == "yyyyyyyy"
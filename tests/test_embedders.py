@@ -0,0 +1,124 @@
+"""Tests for the pluggable embedding backends"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.models.proposals import ProposalSection, ProposalLineItem, ProposalTimeline, ProposalLabor
+from app.services.embedders import embedding_model_id, load_embedder, mean_pool_normalize
+from app.services.rag_service import RAGService
+
+QUESTIONS = [
+    "How many wireless microphones are included?",
+    "What speakers are in the audio package?",
+    "How much does the video section cost?",
+    "Is there a projector?",
+    "What lighting fixtures are provided?",
+    "When is load-in and setup?",
+    "When does strike and load-out happen?",
+    "What is the grand total?",
+    "What is the tax amount?",
+    "How many hours is the audio engineer working?",
+    "Who is the client?",
+    "Where is the event?",
+]
+
+
+def test_mean_pool_ignores_padding_and_normalizes():
+    tokens = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+
+    pooled = mean_pool_normalize(tokens, mask)
+
+    assert pooled.shape == (1, 2)
+    assert pooled[0] == pytest.approx([1.0, 0.0])
+
+
+def test_int8_indexes_are_kept_apart():
+    assert embedding_model_id("all-MiniLM-L6-v2", "sentence-transformers") == "all-MiniLM-L6-v2"
+    assert embedding_model_id("all-MiniLM-L6-v2", "onnx") == "all-MiniLM-L6-v2"
+    assert embedding_model_id("all-MiniLM-L6-v2", "onnx-int8") == "all-MiniLM-L6-v2:int8"
+    with pytest.raises(ValueError):
+        load_embedder("tensorflow", "all-MiniLM-L6-v2")
+
+
+class RecordingSession:
+    """Collects the rows create_test_data.py adds (its ARRAY columns don't bind on SQLite)"""
+
+    def __init__(self):
+        self.added = []
+
+    def query(self, *entities):
+        return self
+
+    def filter_by(self, **criteria):
+        return self
+
+    def first(self):
+        return None
+
+    def add(self, row):
+        self.added.append(row)
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        pass
+
+
+def proposal_chunks(monkeypatch):
+    """Chunks of the create_test_data.py and test_rag_system.py proposals"""
+    import create_test_data
+    from test_rag_system import create_mock_proposal
+
+    monkeypatch.setattr(create_test_data, "invalidate_proposal_cache", lambda proposal_id: None)
+    monkeypatch.setattr(create_test_data, "index_proposal_by_id", lambda proposal_id: None)
+    session = RecordingSession()
+    proposal = create_test_data.create_test_proposal(session)
+
+    rows = lambda model: [row for row in session.added if isinstance(row, model)]
+    for section in rows(ProposalSection):
+        section.items = [item for item in rows(ProposalLineItem) if item.section_id == section.id]
+    proposal.sections = rows(ProposalSection)
+    proposal.timeline = rows(ProposalTimeline)
+    proposal.labor = rows(ProposalLabor)
+
+    service = RAGService.__new__(RAGService)  # Only extract_proposal_content is used
+    chunks = service.extract_proposal_content(proposal, None)
+    chunks += service.extract_proposal_content(create_mock_proposal(), None)
+    return [chunk["content"] for chunk in chunks]
+
+
+def top_k(chunk_vectors: np.ndarray, question_vectors: np.ndarray, k: int) -> np.ndarray:
+    distances = ((question_vectors[:, None, :] - chunk_vectors[None, :, :]) ** 2).sum(axis=2)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("backend, min_cosine, min_recall", [
+    ("onnx", 0.999, 1.0),
+    ("onnx-int8", 0.97, 0.9),
+])
+def test_onnx_backends_match_reference_recall(monkeypatch, backend, min_cosine, min_recall):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    if not os.path.isdir(settings.EMBEDDING_ONNX_DIR):
+        pytest.skip(f"No ONNX export at {settings.EMBEDDING_ONNX_DIR} (scripts/export_onnx_embedder.py)")
+
+    chunks = proposal_chunks(monkeypatch)
+    reference = load_embedder("sentence-transformers", RAGService.EMBEDDING_MODEL)
+    candidate = load_embedder(backend, RAGService.EMBEDDING_MODEL, onnx_dir=settings.EMBEDDING_ONNX_DIR)
+
+    reference_chunks = reference.encode(chunks)
+    candidate_chunks = candidate.encode(chunks)
+    cosine = (reference_chunks * candidate_chunks).sum(axis=1)
+    assert cosine.min() >= min_cosine
+
+    k = 5
+    expected = top_k(reference_chunks, reference.encode(QUESTIONS), k)
+    actual = top_k(candidate_chunks, candidate.encode(QUESTIONS), k)
+    recall = np.mean([len(set(e) & set(a)) / k for e, a in zip(expected, actual)])
+    assert recall >= min_recall
@@ -0,0 +1,60 @@
+"""Tests for async micro-batching of question embeddings"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_calls_share_one_encode():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed("q" * n) for n in range(1, 11)))
+
+    results = asyncio.run(run())
+
+    assert len(encoder.calls) == 1
+    assert [row[0] for row in results] == list(range(1, 11))
+    assert batcher.stats()["mean_batch_size"] == 10
+
+
+def test_full_batch_flushes_without_waiting_and_duplicates_encode_once():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=4, max_wait_ms=10_000)
+
+    async def run():
+        texts = ["a", "bb", "a", "ccc", "dddd", "ee", "ee", "f"]
+        return await asyncio.wait_for(asyncio.gather(*(batcher.embed(t) for t in texts)), timeout=2)
+
+    results = asyncio.run(run())
+
+    assert encoder.calls == [["a", "bb", "ccc"], ["dddd", "ee", "f"]]
+    assert [row[0] for row in results] == [1, 2, 1, 3, 4, 2, 2, 1]
+
+
+def test_encode_errors_reach_every_caller_and_loops_can_change():
+    def failing(texts):
+        raise RuntimeError("model unavailable")
+
+    batcher = EmbeddingBatcher(failing, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+    batcher.encode = RecordingEncoder()
+    assert asyncio.run(batcher.embed("abc"))[0] == pytest.approx(3.0)
@@ -0,0 +1,78 @@
+"""Tests for the shared embedding sidecar and its client"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingClient, EmbeddingServer
+
+
+class RecordingModel:
+    """Deterministic encoder that records the size of every batch"""
+
+    def __init__(self, dim: int = 8, delay: float = 0.02):
+        self.dim = dim
+        self.delay = delay
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        return np.array([[len(text)] * self.dim for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    model = RecordingModel()
+    server = EmbeddingServer(str(tmp_path / "embed.sock"), model, max_batch_size=64, max_wait_ms=20)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=5)
+    yield server, model
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+def test_concurrent_requests_share_batches(sidecar):
+    server, model = sidecar
+    client = EmbeddingClient(server.socket_path)
+
+    def encode(i):
+        texts = ["x" * (i + 1), "y" * (i + 2)]
+        return i, client.encode(texts)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(encode, range(32)))
+
+    for i, embeddings in results:
+        assert embeddings.shape == (2, 8)
+        assert embeddings[0][0] == i + 1 and embeddings[1][0] == i + 2
+    assert sum(model.batches) == 64
+    assert len(model.batches) < 32
+    assert server.stats()["requests"] == 32
+    assert client.stats()["server"]["texts"] == 64
+
+
+def test_falls_back_to_local_model_when_sidecar_is_down(tmp_path):
+    local = RecordingModel(delay=0)
+    client = EmbeddingClient(str(tmp_path / "missing.sock"), load_fallback=lambda: local, retry_seconds=60)
+
+    embeddings = client.encode(["abc"])
+    client.encode(["de"])
+
+    assert embeddings.shape == (1, 8) and embeddings[0][0] == 3
+    assert local.batches == [1, 1]
+    assert client.failures == 1  # Socket not retried during the cooldown
+    assert client.stats()["using_fallback"]
+
+
+def test_without_fallback_errors_propagate(tmp_path):
+    client = EmbeddingClient(str(tmp_path / "missing.sock"))
+    with pytest.raises(OSError):
+        client.encode(["abc"])
@@ -0,0 +1,96 @@
+"""Tests for the on-disk FAISS index store"""
+
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app.core.cache import LRUCache
+from app.models.proposals import Proposal
+from app.services.index_store import FAISSIndexStore, chunks_content_hash
+from app.services import rag_service
+from app.services.rag_service import RAGService
+
+CHUNKS = [
+    {"content": "Grand Total: $1000", "type": "pricing", "section": "Pricing", "metadata": {}},
+    {"content": "Section: Audio", "type": "section", "section": "Audio", "metadata": {}},
+]
+
+
+class CountingEmbedder:
+    """Deterministic stand-in for SentenceTransformer"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.texts_encoded = 0
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.texts_encoded += len(texts)
+        rows = [np.random.default_rng(zlib.crc32(text.encode())).random(self.dim) for text in texts]
+        return np.array(rows, dtype=np.float32)
+
+
+def build_index(chunks):
+    embeddings = CountingEmbedder().encode([c["content"] for c in chunks])
+    index = faiss.IndexFlatL2(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+
+def test_round_trip_and_prune(tmp_path):
+    store = FAISSIndexStore(str(tmp_path))
+    old_hash = chunks_content_hash(CHUNKS[:1], "model")
+    new_hash = chunks_content_hash(CHUNKS, "model")
+
+    store.save("p1", old_hash, build_index(CHUNKS[:1]), CHUNKS[:1])
+    store.save("p1", new_hash, build_index(CHUNKS), CHUNKS)
+
+    index, chunks = store.load("p1", new_hash)
+    assert index.ntotal == 2
+    assert chunks == CHUNKS
+    assert store.load("p1", old_hash) is None
+    assert sorted(p.name for p in (tmp_path / "p1").iterdir()) == [
+        f"{new_hash}.chunks.json", f"{new_hash}.faiss"
+    ]
+
+
+def test_content_hash_tracks_text_and_model():
+    assert chunks_content_hash(CHUNKS, "a") == chunks_content_hash([dict(c) for c in CHUNKS], "a")
+    assert chunks_content_hash(CHUNKS, "a") != chunks_content_hash(CHUNKS, "b")
+    assert chunks_content_hash(CHUNKS, "a") != chunks_content_hash(CHUNKS[::-1], "a")
+
+
+def test_fresh_worker_loads_index_instead_of_embedding(tmp_path, db, seed_proposal, monkeypatch):
+    monkeypatch.setattr(rag_service, "faiss", faiss)
+    proposal_id = seed_proposal(db, "JOB-INDEX", section_count=2)
+    proposal = db.get(Proposal, proposal_id)
+
+    def new_worker():
+        service = RAGService(api_key="")
+        service.embedder = CountingEmbedder()
+        service.embedding_dim = 384
+        service.index_store = FAISSIndexStore(str(tmp_path))
+        service.vector_stores = LRUCache()
+        return service
+
+    first = new_worker()
+    assert first.ensure_vector_store(proposal, db)
+    assert first.embedder.texts_encoded > 0
+
+    second = new_worker()
+    assert second.ensure_vector_store(proposal, db)
+    assert second.embedder.texts_encoded == 0
+    store = second.vector_stores.get(str(proposal_id))
+    assert store.ntotal == len(store)
+    assert second.retrieve_relevant_context(str(proposal_id), "total cost", top_k=2)
+
+    # The request path reads the stored index even while an embedding pass holds the lock
+    third = new_worker()
+    holder = threading.Thread(target=third._index_lock.acquire)
+    holder.start()
+    holder.join()
+    assert third.ensure_vector_store(proposal, db, embed=False)
+    assert third.embedder.texts_encoded == 0
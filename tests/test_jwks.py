@@ -0,0 +1,83 @@
+"""Tests for the JWKS key store"""
+
+import asyncio
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk
+
+from app.auth.jwks import JWKSKeyStore
+
+
+def make_jwk(kid: str) -> dict:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    key = jwk.construct(public_pem, "RS256").to_dict()
+    key.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return key
+
+
+class FakeCognito:
+    """Stands in for the JWKS HTTP fetch, counting round trips"""
+
+    def __init__(self, *kids):
+        self.keys = [make_jwk(kid) for kid in kids]
+        self.calls = 0
+
+    def install(self, store: JWKSKeyStore):
+        async def fetch():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            store._keys = {k["kid"]: jwk.construct(k, "RS256") for k in self.keys}
+            store._fetched_at = asyncio.get_running_loop().time()
+            store.fetch_count += 1
+        store._fetch = fetch
+
+
+def test_keys_are_constructed_once_and_reused():
+    store = JWKSKeyStore("https://example.invalid/jwks.json")
+    cognito = FakeCognito("key-1")
+    cognito.install(store)
+
+    async def run():
+        first = await store.get_key("key-1")
+        second = await store.get_key("key-1")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first is second
+    assert cognito.calls == 1
+
+
+def test_unknown_kid_refetches_once_for_concurrent_callers():
+    store = JWKSKeyStore("https://example.invalid/jwks.json", refetch_interval_seconds=30)
+    cognito = FakeCognito("key-1")
+    cognito.install(store)
+
+    async def run():
+        await store.get_key("key-1")
+        store._last_fetch_attempt -= 60  # The rate limit window has passed
+        cognito.keys.append(make_jwk("key-2"))
+        return await asyncio.gather(*[store.get_key("key-2") for _ in range(20)])
+
+    keys = asyncio.run(run())
+
+    assert all(key is not None for key in keys)
+    assert cognito.calls == 2
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    store = JWKSKeyStore("https://example.invalid/jwks.json", refetch_interval_seconds=60)
+    cognito = FakeCognito("key-1")
+    cognito.install(store)
+
+    async def run():
+        await store.get_key("key-1")
+        return [await store.get_key("forged-kid") for _ in range(5)]
+
+    assert asyncio.run(run()) == [None] * 5
+    assert cognito.calls == 1
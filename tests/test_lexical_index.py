@@ -0,0 +1,78 @@
+"""Tests for BM25 keyword retrieval and hybrid (RRF) search"""
+
+from types import SimpleNamespace
+
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from app.services.rag_service import RAGService
+from app.services.vector_store import ProposalVectorStore
+from tests.test_index_store import CountingEmbedder
+
+ITEMS = [
+    ("item:1", "- Shure SM-58 Vocal Microphone\n  Item Number: AUD-1058\n  Quantity: 4"),
+    ("item:2", "- Shure ULXD Wireless Microphone System\n  Item Number: AUD-2210\n  Quantity: 2"),
+    ("item:3", "- 12\" Powered Speakers\n  Item Number: SPK-12\n  Quantity: 6"),
+    ("item:4", "- Fast Fold Screen and Projector Package\n  Item Number: VID-0905\n  Quantity: 1"),
+]
+
+
+def chunks():
+    result = [
+        {"chunk_key": key, "content": text, "type": "line_item", "section": "Audio", "metadata": {}}
+        for key, text in ITEMS
+    ]
+    result.append({
+        "chunk_key": "section:audio", "type": "section", "section": "Audio", "metadata": {},
+        "content": "Section: Audio\nItems:\n" + "\n".join(text for _, text in ITEMS[:3])
+    })
+    return result
+
+
+def test_tokenize_joins_compound_model_numbers():
+    assert tokenize("Shure SM-58 speakers") == ["shure", "sm58", "sm", "58", "speaker"]
+    assert "sm58" in tokenize("Do you have an SM58?")
+    assert "the" not in tokenize("What is the total?")
+
+
+def test_bm25_ranks_exact_identifier_first():
+    index = BM25Index((position, text) for position, (_, text) in enumerate(ITEMS))
+
+    assert index.search("Is item SPK-12 included?", 3)[0][0] == 2
+    assert index.search("How many SM58 mics?", 3)[0][0] == 0
+    assert index.search("catering menu", 3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], rrf_k=60)
+
+    assert [doc for doc, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+
+
+def test_hybrid_search_finds_item_numbers_vectors_miss():
+    embedder = CountingEmbedder()  # Random vectors: the vector ranking is noise
+    store = ProposalVectorStore(384)
+    store.sync(chunks(), embedder.encode)
+    question = "What is the quantity for item VID-0905?"
+
+    hybrid = store.hybrid_search(embedder.encode([question])[0], question, top_k=3)
+
+    found = {chunk["chunk_key"]: chunk for chunk in hybrid}
+    assert "item:4" in found
+    assert found["item:4"]["lexical_score"] == max(chunk["lexical_score"] for chunk in hybrid)
+    assert len(hybrid) <= 3
+
+
+def test_lexical_only_hits_have_no_relevance():
+    embedder = CountingEmbedder()
+    store = ProposalVectorStore(384)
+    store.sync(chunks(), embedder.encode)
+    question = "What is the quantity for item VID-0905?"
+
+    hybrid = store.hybrid_search(None, question, top_k=3)
+    result = RAGService(api_key="")._finish_answer({
+        'question': question, 'context_chunks': hybrid, 'prompt_tokens': 100, 'reason': '',
+        'content_version': None, 'proposal_id': 'p1', 'question_embedding': None, 'use_rag': True
+    }, "One", SimpleNamespace(input_tokens=100, output_tokens=5))
+
+    assert hybrid and all("relevance_score" not in chunk for chunk in hybrid)
+    assert [source["relevance"] for source in result["sources"]] == [None] * len(result["sources"])
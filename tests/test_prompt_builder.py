@@ -0,0 +1,82 @@
+"""Tests for token-budgeted prompt assembly"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.proposals import Proposal
+from app.services import prompt_builder, rag_service
+from app.services.prompt_builder import PromptBuilder, chunk_tokens, format_chunk, pack_chunks
+
+
+@pytest.fixture(autouse=True)
+def character_tokens(monkeypatch):
+    """Count tokens as characters / 4 so budgets don't depend on the tiktoken download"""
+    monkeypatch.setattr(prompt_builder, "_encoding", None)
+    monkeypatch.setattr(prompt_builder, "_encoding_failed", True)
+    chunk_tokens.cache_clear()
+    yield
+    chunk_tokens.cache_clear()
+
+
+def chunk(key, content):
+    return {"chunk_key": key, "section": "Audio", "type": "line_item", "content": content}
+
+
+def test_pack_deduplicates_and_respects_budget():
+    mic = chunk("item:1", "Item: Wireless Microphone x 4 @ $100.00 = $400.00")
+    speaker = chunk("item:2", "Item: Powered Speaker x 2 @ $125.00 = $250.00")
+    section = chunk("section:1", f"Section: Audio\n{mic['content']}\n{speaker['content']}")
+    big = chunk("section:2", "Section: Video\n" + "Item: LED wall panel x 1 @ $50.00 = $50.00\n" * 40)
+
+    # The section replaces its already packed item and takes its place; its other item is then skipped
+    packed, used = pack_chunks([mic, big, section, speaker], max_tokens=200)
+    assert [c["chunk_key"] for c in packed] == ["section:1"]
+    assert used == chunk_tokens(format_chunk(section)) <= 200
+
+    # Without room for the section, the item stays and the section is dropped
+    budget = chunk_tokens(format_chunk(mic)) + 5
+    assert [c["chunk_key"] for c in pack_chunks([mic, section], budget)[0]] == ["item:1"]
+
+    # An over-budget best chunk is truncated rather than leaving the prompt without context
+    packed, used = pack_chunks([big, mic], max_tokens=60)
+    assert packed[0]["truncated"] and packed[0]["content"].startswith("Section: Video")
+    assert used <= 60
+
+
+def test_answer_question_packs_context_and_records_input_tokens(db, seed_proposal, monkeypatch):
+    proposal = db.get(Proposal, seed_proposal(db, "JOB-BUDGET", 3))
+    builder = PromptBuilder(max_context_tokens=60)
+    monkeypatch.setattr(rag_service, "get_prompt_builder", lambda: builder)
+    monkeypatch.setattr(rag_service.settings, "ANSWER_CACHE_ENABLED", False)
+    prompts = []
+
+    async def create(model, max_tokens, messages):
+        prompts.append(messages[0]["content"])
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="Three items")],
+            usage=SimpleNamespace(input_tokens=240, output_tokens=12)
+        )
+
+    service = rag_service.RAGService(api_key="")
+    service.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    service.embedder = object()
+    service.ensure_vector_store = lambda proposal, db, embed=True: True
+    service.embed_question_batched = lambda question: asyncio.sleep(0)
+    sections = sorted(proposal.sections, key=lambda section: section.section_name)
+    service.retrieve_relevant_context = lambda proposal_id, question, question_embedding=None: [
+        chunk(f"section:{section.id}", f"Section: {section.section_name}\n" + "\n".join(
+            f"Item: {item.description}" for item in section.items
+        ))
+        for section in sections
+    ]
+
+    result = asyncio.run(service.answer_question("Which items are in section 1?", proposal, db, fast_path=False))
+
+    assert result["input_tokens"] == 240
+    assert "Section: Section 0" in prompts[0] and "Section: Section 2" not in prompts[0]
+    stats = builder.stats()
+    assert stats["mean_chunks_retrieved"] == 3 and stats["mean_chunks_packed"] < 3
+    assert stats["mean_context_tokens"] <= 60
+    assert (stats["answers"], stats["mean_input_tokens"]) == (1, 240.0)
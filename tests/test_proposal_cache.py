@@ -0,0 +1,129 @@
+"""Tests for the versioned proposal payload cache"""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+from app.models.proposals import ProposalLabor, ProposalLineItem, ProposalQuestion, ProposalTimeline
+from app.services import proposal_cache
+from app.services.proposal_cache import ProposalPayloadCache, ainvalidate_proposal_cache
+from app.services.proposal_service import (
+    get_proposal_content_version, get_proposal_detail, get_proposal_detail_async, get_proposal_stamp
+)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ProposalPayloadCache(max_entries=8, ttl_seconds=60)
+    monkeypatch.setattr(proposal_cache, "_proposal_cache", cache)
+    return cache
+
+
+def test_second_read_is_served_from_cache(db, seed_proposal, cache):
+    seed_proposal(db, "JOB-2024-001", section_count=3)
+
+    first = get_proposal_detail(db, "JOB-2024-001")
+    second = get_proposal_detail(db, "JOB-2024-001")
+
+    assert second == first
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["local_hits"] == 1
+
+
+def test_answering_a_question_changes_the_version(db, seed_proposal, cache):
+    seed_proposal(db, "JOB-2024-001", section_count=1)
+    get_proposal_detail(db, "JOB-2024-001")
+
+    question = db.query(ProposalQuestion).first()
+    question.answer_text = "$1,000.00"
+    question.status = "answered"
+    question.answered_at = datetime.utcnow()
+    db.commit()
+
+    payload = get_proposal_detail(db, "JOB-2024-001")
+
+    assert payload["questions"][0]["answer_text"] == "$1,000.00"
+    assert cache.stats()["stale"] == 1
+
+
+def test_invalidate_drops_entry(db, seed_proposal, cache):
+    proposal_id = seed_proposal(db, "JOB-2024-001", section_count=1)
+    get_proposal_detail(db, "JOB-2024-001")
+
+    cache.invalidate(str(proposal_id))
+    get_proposal_detail(db, "JOB-2024-001")
+
+    assert cache.stats()["misses"] == 2
+    assert get_proposal_detail(db, "MISSING") is None
+
+
+def test_child_writes_change_the_stamp(db, seed_proposal):
+    proposal_id = seed_proposal(db, "JOB-2024-001", section_count=2)
+    stamps = [get_proposal_stamp(db, "JOB-2024-001")[1]]
+
+    db.delete(db.query(ProposalLineItem).first())
+    db.commit()
+    stamps.append(get_proposal_stamp(db, "JOB-2024-001")[1])
+
+    db.add(ProposalTimeline(proposal_id=proposal_id, event_date=date(2024, 12, 15), title="Load in"))
+    db.commit()
+    stamps.append(get_proposal_stamp(db, "JOB-2024-001")[1])
+
+    db.delete(db.query(ProposalLabor).first())
+    db.commit()
+    stamps.append(get_proposal_stamp(db, "JOB-2024-001")[1])
+
+    assert len(set(stamps)) == 4
+
+
+def test_async_detail_matches_sync(db, seed_proposal, cache):
+    proposal_id = seed_proposal(db, "JOB-2024-001", section_count=2)
+
+    payload = asyncio.run(get_proposal_detail_async(db, "JOB-2024-001"))
+    assert payload == get_proposal_detail(db, "JOB-2024-001")
+    assert asyncio.run(get_proposal_detail_async(db, "MISSING")) is None
+
+    asyncio.run(ainvalidate_proposal_cache(proposal_id))
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_content_version_covers_child_edits_but_not_questions(db, seed_proposal):
+    proposal_id = seed_proposal(db, "JOB-2024-001", section_count=2)
+    versions = [get_proposal_content_version(db, proposal_id)]
+
+    db.query(ProposalLabor).first().hourly_rate = 90
+    db.commit()
+    versions.append(get_proposal_content_version(db, proposal_id))
+
+    db.delete(db.query(ProposalLineItem).first())
+    db.commit()
+    versions.append(get_proposal_content_version(db, proposal_id))
+
+    question = db.query(ProposalQuestion).first()
+    question.status = "answered"
+    question.answered_at = datetime.utcnow()
+    db.commit()
+
+    assert len(set(versions)) == 3
+    assert get_proposal_content_version(db, proposal_id) == versions[-1]
+
+
+def test_question_status_and_priority_edits_change_the_stamp(db, seed_proposal, cache):
+    seed_proposal(db, "JOB-2024-001", section_count=1)
+    get_proposal_detail(db, "JOB-2024-001")
+    stamps = [get_proposal_stamp(db, "JOB-2024-001")[1]]
+
+    db.query(ProposalQuestion).first().priority = "urgent"
+    db.commit()
+    stamps.append(get_proposal_stamp(db, "JOB-2024-001")[1])
+
+    db.query(ProposalQuestion).first().status = "resolved"
+    db.commit()
+    stamps.append(get_proposal_stamp(db, "JOB-2024-001")[1])
+
+    payload = get_proposal_detail(db, "JOB-2024-001")
+
+    assert len(set(stamps)) == 3
+    assert payload["questions"][0]["priority"] == "urgent"
+    assert payload["questions"][0]["status"] == "resolved"
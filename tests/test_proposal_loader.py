@@ -0,0 +1,57 @@
+"""Query-count regression tests for the proposal graph loader"""
+
+import uuid
+
+from sqlalchemy import event
+
+from app.services.proposal_service import load_proposal_graph, serialize_proposal_detail
+
+
+def count_queries(db, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def load_and_serialize(db, identifier):
+    proposal = load_proposal_graph(db, identifier)
+    payload = serialize_proposal_detail(proposal)
+    db.expunge_all()
+    return payload
+
+
+def test_query_count_is_constant_as_sections_grow(db, seed_proposal):
+    seed_proposal(db, "SMALL-001", section_count=2)
+    seed_proposal(db, "LARGE-001", section_count=40)
+
+    small = count_queries(db, lambda: load_and_serialize(db, "SMALL-001"))
+    large = count_queries(db, lambda: load_and_serialize(db, "LARGE-001"))
+
+    assert small == large
+    assert large <= 6
+
+
+def test_graph_is_ordered_and_complete(db, seed_proposal):
+    proposal_id = seed_proposal(db, "JOB-2024-001", section_count=3, items_per_section=2)
+
+    payload = load_and_serialize(db, str(proposal_id))
+
+    assert payload["eventDetails"]["jobNumber"] == "JOB-2024-001"
+    assert [s["title"] for s in payload["sections"]] == ["Section 2", "Section 1", "Section 0"]
+    assert [i["description"] for i in payload["sections"][0]["items"]] == ["Item 2.1", "Item 2.0"]
+    assert len(payload["labor"]) == 1
+    assert len(payload["questions"]) == 1
+
+
+def test_unknown_identifier_returns_none(db):
+    assert load_proposal_graph(db, "DOES-NOT-EXIST") is None
+    assert load_proposal_graph(db, str(uuid.uuid4())) is None
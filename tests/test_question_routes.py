@@ -0,0 +1,68 @@
+"""Tests for the question write and ask-ai routes"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import questions
+from app.database import get_db
+from app.models.proposals import ProposalQuestion
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.rag_service import RAGService
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    async def create(model, max_tokens, messages):
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="Yes, parking is included.")],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=8)
+        )
+
+    service = RAGService(api_key="")
+    service.answer_cache = SemanticAnswerCache()
+    service.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    service.embedder_status = "unavailable"
+    monkeypatch.setattr(questions, "get_rag_service", lambda: service)
+    monkeypatch.setattr(questions, "ENABLE_RAG_AUTO_ANSWER", False)
+
+    app = FastAPI()
+    app.include_router(questions.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_create_and_answer_question(db, seed_proposal, client):
+    seed_proposal(db, "JOB-Q1", 1)
+
+    created = client.post("/proposals/JOB-Q1/questions", json={
+        "item_id": "", "item_name": "Parking", "section_name": "General", "question": "Is parking included?"
+    })
+    assert created.status_code == 200 and created.json()["status"] == "pending"
+    question_id = created.json()["id"]
+
+    answered = client.post(f"/questions/{question_id}/answer", json={"answer": "Yes"})
+    assert answered.status_code == 200
+    assert (answered.json()["status"], answered.json()["answer"]) == ("answered", "Yes")
+
+    assert client.post("/proposals/JOB-NONE/questions", json={
+        "item_id": "", "item_name": "", "section_name": "", "question": "?"
+    }).status_code == 404
+    assert client.post("/questions/not-a-uuid/answer", json={"answer": "Yes"}).status_code == 400
+
+
+def test_ai_answer_and_ask_ai(db, seed_proposal, client):
+    seed_proposal(db, "JOB-Q2", 1)
+    question_id = str(db.query(ProposalQuestion.id).filter_by(question_text="What is the total cost?").scalar())
+
+    saved = client.post(f"/questions/{question_id}/ai-answer", json={"auto_save": True})
+    assert saved.status_code == 200
+    assert saved.json()["method"] == "structured" and saved.json()["current_status"] == "answered"
+
+    asked = client.post("/proposals/JOB-Q2/questions/ask-ai", json={"question": "Is parking included?"})
+    assert asked.status_code == 200
+    assert asked.json()["answer"] == "Yes, parking is included." and asked.json()["job_number"] == "JOB-Q2"
+
+    assert client.post("/proposals/JOB-NONE/questions/ask-ai", json={"question": "?"}).status_code == 404
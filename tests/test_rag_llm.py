@@ -0,0 +1,117 @@
+"""Tests for the RAG service's concurrency-limited, coalescing Claude calls"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rag_service import RAGService
+
+
+class FakeMessages:
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+
+    async def create(self, model, max_tokens, messages):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        return SimpleNamespace(content=[SimpleNamespace(text=f"re: {messages[0]['content']}")])
+
+
+def make_service(max_concurrency: int = 4, delay: float = 0.05):
+    async def build():
+        service = RAGService(api_key="")
+        service.llm_semaphore = asyncio.Semaphore(max_concurrency)
+        service.client = SimpleNamespace(messages=FakeMessages(delay))
+        return service
+    return asyncio.run(build())
+
+
+def test_identical_prompts_share_one_call():
+    service = make_service()
+
+    async def run():
+        return await asyncio.gather(*[service.complete("same prompt") for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert service.client.messages.calls == 1
+    assert service.coalesced_calls == 4
+    assert {r.content[0].text for r in results} == {"re: same prompt"}
+    assert service._inflight == {}
+
+
+def test_semaphore_bounds_upstream_concurrency():
+    service = make_service(max_concurrency=2)
+
+    async def run():
+        await asyncio.gather(*[service.complete(f"prompt {i}") for i in range(6)])
+
+    asyncio.run(run())
+
+    assert service.client.messages.calls == 6
+    assert service.client.messages.max_active == 2
+
+
+def test_cancelling_one_waiter_keeps_shared_call():
+    service = make_service()
+
+    async def run():
+        first = asyncio.create_task(service.complete("prompt"))
+        second = asyncio.create_task(service.complete("prompt"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    result = asyncio.run(run())
+
+    assert result.content[0].text == "re: prompt"
+    assert service.client.messages.cancelled == 0
+
+
+def test_cancelling_all_waiters_cancels_upstream():
+    service = make_service()
+
+    async def run():
+        task = asyncio.create_task(service.complete("prompt"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert service.client.messages.cancelled == 1
+    assert service._inflight == {}
+
+
+def test_upstream_errors_reach_every_waiter():
+    service = make_service()
+
+    async def fail(model, max_tokens, messages):
+        await asyncio.sleep(0.01)
+        raise TimeoutError("upstream timed out")
+
+    service.client.messages.create = fail
+
+    async def run():
+        return await asyncio.gather(*[service.complete("prompt") for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, TimeoutError) for r in results)
@@ -0,0 +1,143 @@
+"""Tests for streamed AI answers (ask-ai over SSE)"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import questions
+from app.database import get_db
+from app.models.proposals import Proposal
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.rag_service import RAGService
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for part in self.parts:
+            await asyncio.sleep(0)
+            yield part
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=120, output_tokens=len(self.parts)))
+
+
+class SlowStream(FakeStream):
+    @property
+    async def text_stream(self):
+        for part in self.parts:
+            await asyncio.sleep(0.05)
+            yield part
+
+
+def streaming_service(parts):
+    service = RAGService(api_key="")
+    service.answer_cache = SemanticAnswerCache()
+    service.client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **kwargs: FakeStream(parts)))
+    service.embedder_status = "unavailable"  # No retrieval: the basic-information prompt
+    return service
+
+
+def test_stream_answer_yields_tokens_then_result(db, seed_proposal):
+    proposal = db.get(Proposal, seed_proposal(db, "JOB-STREAM", 1))
+    service = streaming_service(["The setup ", "starts at ", "8am."])
+
+    async def collect(question):
+        return [event async for event in service.stream_answer(question, proposal, db)]
+
+    events = asyncio.run(collect("When does the crew arrive for setup?"))
+
+    assert [event["text"] for event in events[:-1]] == ["The setup ", "starts at ", "8am."]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["answer"] == "The setup starts at 8am." and events[-1]["input_tokens"] == 120
+
+    # The fast path answers in one event without a stream
+    events = asyncio.run(collect("What is the total cost?"))
+    assert [event["type"] for event in events] == ["token", "done"]
+    assert events[-1]["method"] == "structured"
+
+    stats = service.stream_stats()
+    assert (stats["streams"], stats["streams_without_llm"]) == (1, 1)
+    assert stats["first_token_p95_ms"] is not None
+
+
+def test_slow_consumer_does_not_hold_an_llm_slot(db, seed_proposal):
+    proposal = db.get(Proposal, seed_proposal(db, "JOB-SLOW", 1))
+    service = streaming_service(["Doors ", "open ", "at 6pm."])
+
+    async def run():
+        service.llm_semaphore = asyncio.Semaphore(1)
+        events = service.stream_answer("When do the doors open for guests?", proposal, db)
+        first = await events.__anext__()
+        for _ in range(10):  # Let the pump read the rest of the upstream stream
+            await asyncio.sleep(0)
+        locked_while_reading = service.llm_semaphore.locked()
+        rest = [event async for event in events]
+        return first, locked_while_reading, rest
+
+    first, locked_while_reading, rest = asyncio.run(run())
+
+    assert first == {"type": "token", "text": "Doors "}
+    assert not locked_while_reading
+    assert rest[-1]["answer"] == "Doors open at 6pm."
+
+
+def test_identical_streams_share_one_call_and_repeats_hit_the_cache(db, seed_proposal):
+    proposal = db.get(Proposal, seed_proposal(db, "JOB-SHARE", 1))
+    service = streaming_service(["Parking ", "is included."])
+    opened = []
+    service.client.messages.stream = lambda **kwargs: opened.append(kwargs) or SlowStream(["Parking ", "is included."])
+
+    async def collect(question):
+        return [event async for event in service.stream_answer(question, proposal, db)]
+
+    async def run():
+        together = await asyncio.gather(*(collect("Is parking included?") for _ in range(2)))
+        again = await collect("Is parking included?")
+        return together, again
+
+    together, again = asyncio.run(run())
+
+    assert len(opened) == 1
+    assert [events[-1]["answer"] for events in together] == ["Parking is included."] * 2
+    assert service.coalesced_calls == 1
+    assert again[-1]["cache"] == "exact"
+
+
+def test_ask_ai_stream_endpoint_emits_sse(db, seed_proposal, monkeypatch):
+    # The test client runs the app on another thread
+    seed_proposal(db, "JOB-SSE", 1)
+    service = streaming_service(["Yes, ", "it is."])
+    monkeypatch.setattr(questions, "get_rag_service", lambda: service)
+    app = FastAPI()
+    app.include_router(questions.router)
+    app.dependency_overrides[get_db] = lambda: db
+
+    with TestClient(app).stream(
+        "POST", "/proposals/JOB-SSE/questions/ask-ai/stream", json={"question": "Is parking included?"}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.read().decode()
+
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in body.strip().split("\n\n")
+    ]
+    assert [kind for kind, _ in events] == ["token", "token", "done"]
+    assert "".join(data["text"] for kind, data in events if kind == "token") == "Yes, it is."
+    done = events[-1][1]
+    assert done["answer"] == "Yes, it is." and done["job_number"] == "JOB-SSE"
+    assert done["method"] == "simple" and done["confidence"] == 0.7
@@ -0,0 +1,67 @@
+"""Tests for the background warm-up of the RAG embedder"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.models.proposals import Proposal
+from app.services import rag_service
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.rag_service import RAGService
+from tests.test_index_store import CountingEmbedder
+
+
+class FakeMessages:
+    def __init__(self):
+        self.prompts = []
+
+    async def create(self, model, max_tokens, messages):
+        self.prompts.append(messages[0]["content"])
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="The total is $1,000")],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=10)
+        )
+
+
+def test_questions_degrade_to_basic_prompt_until_embedder_is_ready(db, seed_proposal, monkeypatch):
+    release = threading.Event()
+    embedder = CountingEmbedder()
+
+    def slow_embedder(self):
+        release.wait(timeout=5)
+        return embedder
+
+    monkeypatch.setattr(RAGService, "_create_embedder", slow_embedder)
+    proposal = db.get(Proposal, seed_proposal(db, "JOB-WARM", 2))
+
+    async def run():
+        service = RAGService(api_key="", warm_up_in_background=True)
+        service.answer_cache = SemanticAnswerCache()
+        service.client = SimpleNamespace(messages=FakeMessages())
+        assert service.readiness()["status"] == "loading"
+
+        early = await service.answer_question("What does the audio section include?", proposal, db)
+
+        release.set()
+        assert await service.wait_until_ready(timeout=5)
+        return service, early
+
+    service, early = asyncio.run(run())
+
+    assert early["method"] == "simple"
+    assert "Basic proposal information" in service.client.messages.prompts[0]
+    assert service.answer_cache.stats()["proposals"] == 0  # Degraded answer isn't cached
+    assert service.readiness()["status"] == "ready"
+    assert service.embedder is embedder
+    assert embedder.texts_encoded == 1  # Warm-up encode
+
+
+def test_readiness_before_and_after_startup(monkeypatch):
+    monkeypatch.setattr(rag_service, "_rag_service", None)
+    assert rag_service.get_rag_readiness() == {"status": "not_started"}
+
+    monkeypatch.setattr(RAGService, "_create_embedder", lambda self: None)
+    service = rag_service.start_rag_warmup()
+    assert asyncio.run(service.wait_until_ready(timeout=5))
+    assert rag_service.get_rag_readiness()["status"] == "unavailable"
+    assert rag_service.get_rag_service() is service
@@ -0,0 +1,127 @@
+"""Tests for the cross-proposal search index"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app.core.cache import LRUCache
+from app.models.proposals import Proposal, ProposalLineItem
+from app.services import rag_service, search_index
+from app.services.index_store import FAISSIndexStore
+from app.services.rag_service import RAGService
+from app.services.search_index import GlobalSearchIndex, attach_chunks
+from tests.test_index_store import CountingEmbedder
+
+
+def new_worker(tmp_path):
+    service = RAGService(api_key="")
+    service.embedder = CountingEmbedder()
+    service.index_store = FAISSIndexStore(str(tmp_path / "rag"))
+    service.vector_stores = LRUCache()
+    return service
+
+
+def test_refresh_is_incremental_and_filters_apply(tmp_path, db, seed_proposal, monkeypatch):
+    monkeypatch.setattr(rag_service, "faiss", faiss)
+    acme = seed_proposal(db, "JOB-ACME", 2)
+    other = seed_proposal(db, "JOB-OTHER", 2)
+    other_proposal = db.get(Proposal, other)
+    other_proposal.client_name = "Globex"
+    other_proposal.status = "confirmed"
+    other_proposal.start_date = other_proposal.end_date = date(2025, 6, 1)
+    db.commit()
+
+    service = new_worker(tmp_path)
+    for proposal_id in (acme, other):
+        service.index_proposal(db.get(Proposal, proposal_id), db)
+
+    index = GlobalSearchIndex(384, model_id=service.embedding_model_id)
+    counts = index.refresh(db, service.index_store)
+    assert counts["updated"] == 2
+    assert index.ntotal == sum(len(hashes) for hashes in index.chunk_hashes.values())
+
+    # Unchanged proposals aren't re-read
+    assert index.refresh(db, service.index_store)["updated"] == 0
+
+    # An edited line item swaps just its chunk and its section's summary chunk
+    item = db.query(ProposalLineItem).filter_by(proposal_id=acme).first()
+    item.description = "LED video wall 12x7"
+    db.commit()
+    service.index_proposal(db.get(Proposal, acme), db)
+    counts = index.refresh(db, service.index_store)
+    assert (counts["updated"], counts["added"], counts["removed_chunks"]) == (1, 2, 2)
+
+    chunks = service.index_store.load_latest(str(acme))[2]
+    edited = next(chunk for chunk in chunks if chunk["chunk_key"] == f"item:{item.id}")
+    query = service.embed_question(edited["content"])
+    hits = index.search(query, 5)
+    assert hits[0][:2] == (str(acme), edited["chunk_key"])
+
+    assert {pid for pid, _, _ in index.search(query, 50, client="globex")} == {str(other)}
+    assert {pid for pid, _, _ in index.search(query, 50, status="confirmed,draft")} == {str(other)}
+    assert {pid for pid, _, _ in index.search(query, 50, date_to=date(2025, 1, 1))} == {str(acme)}
+    assert index.search(query, 50, date_from=date(2026, 1, 1)) == []
+
+    results = attach_chunks(index, hits, limit=1, index_store=service.index_store)
+    assert [r["job_number"] for r in results] == ["JOB-ACME"]
+    assert "LED video wall" in (results[0]["matches"][0]["content"] or "")
+
+    db.delete(db.get(Proposal, other))
+    db.commit()
+    assert index.refresh(db, service.index_store)["removed"] == 1
+    assert set(index.proposals) == {str(acme)}
+
+
+def test_ivf_rebuild_and_snapshot_round_trip(tmp_path):
+    rng = np.random.default_rng(3)
+    index = GlobalSearchIndex(32, model_id="m", ivf_min_vectors=2000, nprobe=8)
+    vectors = {}
+    for p in range(50):
+        chunks = [{"chunk_key": f"item:{i}", "content": f"p{p} item {i}"} for i in range(60)]
+        vectors[str(p)] = rng.standard_normal((60, 32)).astype(np.float32)
+        index.upsert(
+            str(p), {"status": "draft" if p % 2 else "confirmed"}, f"hash{p}", chunks,
+            lambda keys, v=vectors[str(p)]: v[[int(key.split(":")[1]) for key in keys]]
+        )
+
+    assert not index.ivf
+    query = vectors["7"][3]
+    exact = index.search(query, 10)
+    assert exact[0][:2] == ("7", "item:3")
+
+    assert index.maybe_rebuild()
+    assert index.ivf and index.ntotal == 3000
+    assert index.search(query, 10)[0][:2] == ("7", "item:3")
+    filtered = index.search(query, 10, status="confirmed")
+    assert len(filtered) == 10 and all(int(pid) % 2 == 0 for pid, _, _ in filtered)
+
+    assert index.save(str(tmp_path))
+    assert not index.save(str(tmp_path))  # Same content: nothing written
+
+    loaded = GlobalSearchIndex(32, model_id="m", nprobe=8)
+    assert loaded.load(str(tmp_path))
+    assert loaded.ivf and loaded.ntotal == 3000
+    assert [hit[:2] for hit in loaded.search(query, 10)] == [hit[:2] for hit in index.search(query, 10)]
+
+    loaded.remove("7")
+    assert loaded.ntotal == 2940
+    assert all(pid != "7" for pid, _, _ in loaded.search(query, 10))
+
+    assert not GlobalSearchIndex(32, model_id="other").load(str(tmp_path))
+
+
+def test_indexing_updates_the_live_search_index(tmp_path, db, seed_proposal, monkeypatch):
+    monkeypatch.setattr(rag_service, "faiss", faiss)
+    service = new_worker(tmp_path)
+    live = GlobalSearchIndex(384, model_id=service.embedding_model_id)
+    monkeypatch.setattr(search_index, "_search_index", live)
+
+    proposal_id = seed_proposal(db, "JOB-LIVE", 1)
+    service.index_proposal(db.get(Proposal, proposal_id), db)
+
+    assert live.proposals[str(proposal_id)]["job_number"] == "JOB-LIVE"
+    assert live.ntotal == len(live.chunk_hashes[str(proposal_id)])
+    assert live.refresh(db, service.index_store)["updated"] == 0  # Already current
@@ -0,0 +1,92 @@
+"""Tests for the ASGI authentication middleware"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.auth import sso_middleware
+from app.auth.sso_middleware import ApprovedUserMiddleware, compile_prefix_pattern
+from app.services.user_service import UserValidationError
+
+EXEMPT_PATHS = ["/health", "/api/v1/admin/approved-users", "/api/v1/proposal/access"]
+
+
+def whoami(request: Request):
+    return JSONResponse({"user": getattr(request.state, "user", None)})
+
+
+def stream(request: Request):
+    return StreamingResponse(iter([b"chunk-1\n", b"chunk-2\n"]), media_type="text/plain")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def authorize(cognito_data):
+        if cognito_data["email"] != "planner@example.com":
+            raise UserValidationError(f"User {cognito_data['email']} is not authorized to access this system")
+        return {"user_id": cognito_data["user_id"], "email": cognito_data["email"]}
+
+    async def validate_token(token):
+        if token == "bad":
+            raise ValueError("Invalid token")
+        return {"user_id": "sub-1", "email": f"{token}@example.com", "exp": None}
+
+    monkeypatch.setattr(sso_middleware, "authorize_user", authorize)
+
+    app = Starlette(routes=[
+        Route("/health", whoami),
+        Route("/api/v1/whoami", whoami),
+        Route("/api/v1/stream", stream),
+    ])
+    app.add_middleware(ApprovedUserMiddleware, exempt_paths=EXEMPT_PATHS)
+    client = TestClient(app)
+    client.get("/health")  # Build the middleware stack
+    middleware = client.app.middleware_stack.app
+    middleware.token_cache = None
+    middleware.cognito.validate_token = validate_token
+    return client
+
+
+@pytest.mark.parametrize("path", [
+    "/health", "/healthz", "/api/v1/admin/approved-users?x=1", "/api/v1/proposal/access/abc", "/api/v1/x"
+])
+def test_pattern_matches_startswith_semantics(path):
+    path = path.split("?")[0]
+    pattern = compile_prefix_pattern(EXEMPT_PATHS)
+    assert bool(pattern.match(path)) == any(path.startswith(p) for p in EXEMPT_PATHS)
+
+
+def test_exempt_path_skips_auth(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"user": None}
+
+
+def test_missing_header_is_401(client):
+    response = client.get("/api/v1/whoami")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Authorization header required"}
+
+
+def test_invalid_token_is_401(client):
+    response = client.get("/api/v1/whoami", headers={"Authorization": "Bearer bad"})
+    assert response.status_code == 401
+
+
+def test_unapproved_user_is_403(client):
+    response = client.get("/api/v1/whoami", headers={"Authorization": "Bearer stranger"})
+    assert response.status_code == 403
+
+
+def test_approved_user_is_on_request_state(client):
+    response = client.get("/api/v1/whoami", headers={"Authorization": "Bearer planner"})
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "planner@example.com"
+
+
+def test_streaming_response_passes_through(client):
+    response = client.get("/api/v1/stream", headers={"Authorization": "Bearer planner"})
+    assert response.text == "chunk-1\nchunk-2\n"
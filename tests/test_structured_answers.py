@@ -0,0 +1,89 @@
+"""Tests for structured fast-path answering"""
+
+import asyncio
+from decimal import Decimal
+
+from app.models.proposals import Proposal
+from app.services.rag_service import RAGService
+from app.services.structured_answers import StructuredAnswerer
+
+
+def name_rows(db, proposal_id):
+    proposal = db.get(Proposal, proposal_id)
+    proposal.venue_name = "Marriott Marquis"
+    proposal.tax_amount = Decimal("80.00")
+    audio, video = sorted(proposal.sections, key=lambda section: section.section_name)
+    audio.section_name, audio.section_total = "Audio", Decimal("420.00")
+    video.section_name = "Video"
+    audio.items[0].description, audio.items[0].quantity = "Wireless Handheld Microphone", 4
+    video.items[0].description = "Laser Projector 10,000 Lumens"
+    db.commit()
+    return proposal
+
+
+def test_factual_questions_are_answered_from_columns(db, seed_proposal):
+    proposal = name_rows(db, seed_proposal(db, "JOB-FAST", 2))
+    answerer = StructuredAnswerer(min_confidence=0.8)
+
+    def ask(question):
+        result = answerer.answer(question, proposal)
+        return result and (result["intent"], result["answer"])
+
+    assert ask("What is the total cost?") == ("total_cost", "The total cost of the proposal is $1,000.00 (tax $80.00).")
+    assert ask("When is the event?") == ("event_date", "The event is on Sunday, December 15, 2024.")
+    assert ask("where is the venue") == ("venue", "The event is at Marriott Marquis.")
+    assert ask("What is the Audio section total?") == ("section_total", "The Audio section totals $420.00.")
+    assert ask("How many wireless handheld microphones?") == (
+        "item_quantity", "The proposal includes 4 x Wireless Handheld Microphone (Audio)."
+    )
+    assert ask("Is there a projector?")[0] == "item_included"
+
+    # Judgement, changes, policies and multi-part questions go to the LLM
+    for question in ("Why 4 microphones?", "Can we change the date?", "What is your cancellation policy?",
+                     "What is the total? and when is setup?", "what is this"):
+        assert ask(question) is None
+
+    stats = answerer.stats()
+    assert (stats["questions"], stats["served_without_llm"]) == (11, 6)
+    assert stats["by_intent"]["total_cost"] == 1
+
+
+def test_keywords_alone_do_not_answer_proposal_questions(db, seed_proposal):
+    proposal = name_rows(db, seed_proposal(db, "JOB-KEYWORD", 2))
+    answerer = StructuredAnswerer(min_confidence=0.8)
+
+    # Each names an intent's keyword but asks something else about it
+    for question in (
+        "How many hours of labor?",
+        "What is the labor rate for a stagehand?",
+        "What is the venue's wifi password?",
+        "Is the venue confirmed?",
+        "What is the status of the shipment?",
+        "What date is setup?",
+        "What is the tax rate?",
+        "Is tax included?",
+    ):
+        assert answerer.answer(question, proposal) is None, question
+
+    # The same intents asked as a whole are still answered
+    assert answerer.answer("What is the labor total?", proposal)["intent"] == "labor_total"
+    assert answerer.answer("What's the proposal status?", proposal)["intent"] == "status"
+    assert answerer.answer("What is the total cost with tax", proposal)["intent"] == "total_cost"
+
+
+def test_answer_question_skips_the_llm_for_factual_questions(db, seed_proposal):
+    proposal = name_rows(db, seed_proposal(db, "JOB-NOLLM", 2))
+    service = RAGService(api_key="")  # No client: only the fast path can answer
+
+    async def run():
+        return (
+            await service.answer_question("What is the tax amount?", proposal, db),
+            await service.answer_question("What does the Video section include?", proposal, db),
+            await service.answer_question("Why do we need a projector?", proposal, db),
+        )
+
+    tax, video, why = asyncio.run(run())
+
+    assert (tax["method"], tax["answer"]) == ("structured", "The tax amount is $80.00.")
+    assert video["intent"] == "section_items" and "Laser Projector" in video["answer"]
+    assert why["method"] == "error"
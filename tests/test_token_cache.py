@@ -0,0 +1,44 @@
+"""Tests for the verified-token cache"""
+
+import asyncio
+import time
+
+from app.auth.token_cache import VerifiedTokenCache
+
+
+def make_validator(exp_offset: float):
+    calls = []
+
+    async def validate(token):
+        calls.append(token)
+        return {"user_id": "sub-1", "email": "user@example.com", "exp": time.time() + exp_offset}
+
+    return validate, calls
+
+
+def test_repeat_token_skips_verification():
+    cache = VerifiedTokenCache(max_entries=10)
+    validate, calls = make_validator(exp_offset=3600)
+
+    async def run():
+        for _ in range(5):
+            await cache.validate("token-a", validate)
+
+    asyncio.run(run())
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 4
+
+
+def test_expired_claims_are_not_cached():
+    cache = VerifiedTokenCache(max_entries=10)
+    validate, calls = make_validator(exp_offset=-1)
+
+    async def run():
+        await cache.validate("token-a", validate)
+        await cache.validate("token-a", validate)
+
+    asyncio.run(run())
+
+    assert len(calls) == 2
+    assert "token-a" not in cache.cache
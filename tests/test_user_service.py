@@ -0,0 +1,107 @@
+"""Tests for cached pre-approved authorization and batched last_login writes"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.users import Base, PreApprovedUser, User
+from app.services import user_service
+from app.services.user_service import (
+    ApprovedUserCache, LastLoginRecorder, UserValidationError, authorize_user
+)
+
+COGNITO_DATA = {"user_id": "cognito-sub-1", "email": "planner@example.com", "full_name": "Pat Planner"}
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine, tables=[PreApprovedUser.__table__, User.__table__])
+    factory = sessionmaker(bind=engine)
+
+    with factory() as db:
+        db.add(PreApprovedUser(
+            id="pre-1",
+            email="planner@example.com",
+            full_name="Pat Planner",
+            company="Pinnacle Live",
+            roles=["user"],
+            is_active=True
+        ))
+        db.commit()
+
+    monkeypatch.setattr(user_service, "SessionLocal", factory)
+    monkeypatch.setattr(user_service, "_approved_user_cache", ApprovedUserCache(ttl_seconds=60))
+    monkeypatch.setattr(user_service, "_login_recorder", LastLoginRecorder(session_factory=factory))
+    yield factory
+    engine.dispose()
+
+
+def count_writes(factory, fn):
+    writes = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    engine = factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return writes
+
+
+def test_request_path_does_not_write(session_factory):
+    async def run():
+        for _ in range(3):
+            user = await authorize_user(COGNITO_DATA)
+        return user
+
+    writes = count_writes(session_factory, lambda: asyncio.run(run()))
+
+    assert writes == []
+    assert user_service.get_approved_user_cache().stats()["hits"] == 2
+
+
+def test_unapproved_email_is_rejected_and_cached(session_factory):
+    async def run():
+        for _ in range(2):
+            with pytest.raises(UserValidationError):
+                await authorize_user({"user_id": "x", "email": "stranger@example.com"})
+
+    asyncio.run(run())
+
+    assert user_service.get_approved_user_cache().stats()["misses"] == 1
+
+
+def test_flush_creates_session_and_stamps_pre_approved(session_factory):
+    asyncio.run(authorize_user(COGNITO_DATA))
+
+    assert user_service.get_login_recorder().flush() == 1
+
+    with session_factory() as db:
+        user = db.query(User).filter(User.user_id == "cognito-sub-1").one()
+        pre_approved = db.query(PreApprovedUser).filter(PreApprovedUser.id == "pre-1").one()
+        assert user.company == "Pinnacle Live"
+        assert user.last_login is not None
+        assert pre_approved.cognito_user_id == "cognito-sub-1"
+
+
+def test_email_is_matched_exactly(session_factory):
+    async def run():
+        with pytest.raises(UserValidationError):
+            await authorize_user({**COGNITO_DATA, "email": "PLANNER@example.com"})
+        return await authorize_user(COGNITO_DATA)
+
+    assert asyncio.run(run())["email"] == "planner@example.com"
+    cache = user_service.get_approved_user_cache()
+    assert cache.get("PLANNER@example.com") is None and cache.get("planner@example.com") is not None
@@ -0,0 +1,183 @@
+"""Tests for incremental per-proposal re-indexing"""
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app.core.cache import LRUCache
+from app.models.proposals import Proposal, ProposalLabor, ProposalLineItem
+from app.services import rag_service
+from app.services.rag_service import RAGService
+from app.services.vector_store import ProposalVectorStore, VectorArena, chunk_id, normalize_rows
+from tests.test_index_store import CountingEmbedder
+
+
+def chunk(key, content):
+    return {"chunk_key": key, "content": content, "type": "line_item", "section": "Audio", "metadata": {}}
+
+
+def test_sync_embeds_only_changed_chunks():
+    embedder = CountingEmbedder(dim=8)
+    store = ProposalVectorStore(8)
+
+    first = store.sync([chunk("a", "mic"), chunk("b", "speaker"), chunk("c", "mixer")], embedder.encode)
+    assert first == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+
+    second = store.sync([chunk("a", "mic"), chunk("b", "two speakers"), chunk("d", "cables")], embedder.encode)
+    assert second == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert embedder.texts_encoded == 5
+    assert store.index.ntotal == 3
+    assert chunk_id("c") not in store.chunks
+
+    hit = store.search(embedder.encode(["two speakers"])[0], top_k=1)
+    assert hit[0]["chunk_key"] == "b"
+    assert hit[0]["relevance_score"] == pytest.approx(0.0, abs=1e-4)
+
+
+def test_sync_copies_read_only_index():
+    embedder = CountingEmbedder(dim=8)
+    original = ProposalVectorStore(8)
+    original.sync([chunk("a", "mic")], embedder.encode)
+    loaded = ProposalVectorStore(8, index=original.index, chunks=original.chunk_list())
+
+    loaded.sync([chunk("a", "mic"), chunk("b", "speaker")], embedder.encode)
+
+    assert loaded.index is not original.index
+    assert original.index.ntotal == 1
+    assert loaded.index.ntotal == 2
+
+
+def test_switching_embedding_backend_reembeds_everything():
+    embedder = CountingEmbedder(dim=8)
+    fp32 = ProposalVectorStore(8, model_id="all-MiniLM-L6-v2")
+    fp32.sync([chunk("a", "mic"), chunk("b", "speaker")], embedder.encode)
+
+    int8 = ProposalVectorStore(8, index=fp32.index, chunks=fp32.chunk_list(), model_id="all-MiniLM-L6-v2:int8")
+    changes = int8.sync([chunk("a", "mic"), chunk("b", "speaker")], embedder.encode)
+
+    assert changes == {"added": 0, "updated": 2, "removed": 0, "unchanged": 0}
+
+
+def test_row_changes_trigger_incremental_reindex(db, seed_proposal, monkeypatch):
+    monkeypatch.setattr(rag_service, "faiss", faiss)
+    proposal_id = seed_proposal(db, "JOB-REINDEX", section_count=2, items_per_section=2)
+    proposal = db.get(Proposal, proposal_id)
+
+    service = RAGService(api_key="")
+    service.embedder = CountingEmbedder()
+    service.embedding_dim = 384
+    service.index_store = None
+    service.vector_stores = LRUCache()
+
+    assert service.ensure_vector_store(proposal, db)
+    initial = service.embedder.texts_encoded
+
+    # Unchanged rows: nothing to do
+    assert service.ensure_vector_store(proposal, db)
+    assert service.embedder.texts_encoded == initial
+
+    # Labor rows carry no updated_at; the commit hook marks the proposal stale
+    labor = db.query(ProposalLabor).filter(ProposalLabor.proposal_id == proposal_id).one()
+    labor.task_name = "Video Tech"
+    db.commit()
+    assert rag_service.is_proposal_stale(str(proposal_id))
+
+    assert service.ensure_vector_store(proposal, db)
+    assert service.embedder.texts_encoded == initial + 1
+    assert not rag_service.is_proposal_stale(str(proposal_id))
+
+    # Editing one line item re-embeds the item and its section chunk
+    item = db.query(ProposalLineItem).filter(ProposalLineItem.proposal_id == proposal_id).first()
+    item.description = "Wireless handheld microphone"
+    db.commit()
+
+    assert service.ensure_vector_store(proposal, db)
+    assert service.embedder.texts_encoded == initial + 3
+    store = service.vector_stores.get(str(proposal_id))
+    assert store.ntotal == len(store)
+
+
+def test_request_path_never_embeds(db, seed_proposal, monkeypatch):
+    monkeypatch.setattr(rag_service, "faiss", faiss)
+    proposal_id = seed_proposal(db, "JOB-PRECOMPUTED", section_count=2)
+    proposal = db.get(Proposal, proposal_id)
+
+    service = RAGService(api_key="")
+    service.embedder = CountingEmbedder()
+    service.embedding_dim = 384
+    service.index_store = None
+    service.vector_stores = LRUCache()
+    scheduled = []
+    monkeypatch.setattr(service, "schedule_indexing", scheduled.append)
+
+    # Not indexed yet: nothing is embedded inline, indexing goes to the background
+    assert not service.ensure_vector_store(proposal, db, embed=False)
+    assert service.embedder.texts_encoded == 0
+    assert scheduled == [str(proposal_id)]
+
+    # What the write-time hook / background thread does
+    assert service.index_proposal(proposal, db)["added"] > 0
+    embedded = service.embedder.texts_encoded
+    assert service.ensure_vector_store(proposal, db, embed=False)
+
+    # After an edit the outdated index keeps serving until the background pass
+    item = db.query(ProposalLineItem).filter(ProposalLineItem.proposal_id == proposal_id).first()
+    item.description = "Line array speaker"
+    db.commit()
+
+    assert service.ensure_vector_store(proposal, db, embed=False)
+    assert service.embedder.texts_encoded == embedded
+    assert scheduled == [str(proposal_id)] * 2
+
+
+def test_compact_store_matches_faiss_ranking():
+    embedder = CountingEmbedder(dim=8)
+    embed = lambda texts: normalize_rows(embedder.encode(texts))  # MiniLM output is unit-length
+    chunks = [chunk(f"k{i}", f"item number {i}") for i in range(40)]
+    flat = ProposalVectorStore(8)
+    compact = ProposalVectorStore(8, arena=VectorArena(8, dtype=np.float32), compact_max_chunks=100)
+    flat.sync([dict(c) for c in chunks], embed)
+    compact.sync([dict(c) for c in chunks], embed)
+
+    query = embed(["item number 7"])[0]
+    assert compact.compact and not flat.compact
+    assert [c["chunk_key"] for c in compact.search(query, 5)] == [c["chunk_key"] for c in flat.search(query, 5)]
+    assert compact.search(query, 1)[0]["relevance_score"] == pytest.approx(flat.search(query, 1)[0]["relevance_score"], abs=1e-5)
+
+    # Round-trips through the FAISS form used for persistence
+    reloaded = ProposalVectorStore(8, index=compact.faiss_index(), chunks=compact.chunk_list(),
+                                   arena=compact.arena, compact_max_chunks=100)
+    assert reloaded.compact and reloaded.ntotal == 40
+    assert reloaded.search(query, 1)[0]["chunk_key"] == "k7"
+
+
+def test_store_moves_to_faiss_when_it_outgrows_the_arena():
+    embedder = CountingEmbedder(dim=8)
+    arena = VectorArena(8, initial_rows=4)
+    store = ProposalVectorStore(8, arena=arena, compact_max_chunks=3)
+
+    store.sync([chunk("a", "mic"), chunk("b", "speaker")], embedder.encode)
+    assert store.compact and arena.stats()["live_rows"] == 2
+
+    store.sync([chunk("a", "mic"), chunk("b", "speaker"), chunk("c", "mixer"), chunk("d", "cable")], embedder.encode)
+    assert not store.compact and store.index.ntotal == 4
+    assert arena.stats()["live_rows"] == 0
+    assert embedder.texts_encoded == 4  # a and b were carried over, not re-embedded
+
+
+def test_arena_reclaims_rows_of_dropped_stores():
+    embedder = CountingEmbedder(dim=8)
+    arena = VectorArena(8, initial_rows=4)
+    stores = [ProposalVectorStore(8, arena=arena, compact_max_chunks=10) for _ in range(6)]
+    for i, store in enumerate(stores):
+        store.sync([chunk(f"{i}-{n}", f"text {i} {n}") for n in range(3)], embedder.encode)
+    survivor = stores[-1]
+    query = embedder.encode(["text 5 1"])[0]
+
+    del store, stores[:-1]  # e.g. LRU eviction
+
+    stats = arena.stats()
+    assert stats["live_rows"] == 3 and stats["segments"] == 1
+    assert stats["compactions"] >= 1
+    assert survivor.search(query, 1)[0]["chunk_key"] == "5-1"